@@ -11,7 +11,7 @@ from allauth.account.adapter import DefaultAccountAdapter
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
 from django.template.loader import render_to_string
-from mailjet_rest import Client
+from mailer.outbox import queue_email
 
 logger = logging.getLogger(__name__)
 
@@ -51,30 +51,19 @@ def _get_provider_display_name(sociallogin):
 
 
 def _send_mailjet_email(to_email, to_name, subject, text_body, html_body):
-    """Send an email via Mailjet REST API."""
-    mailjet = Client(
-        auth=(settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET),
-        version='v3.1',
+    """Queue an email for delivery via Mailjet (see ``mailer.outbox``)."""
+    email = queue_email(
+        to_email=to_email,
+        to_name=to_name,
+        subject=subject,
+        text_part=text_body,
+        html_part=html_body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        from_name="Arpan Sahu",
+        custom_id=to_email,
     )
-    data = {
-        'Messages': [{
-            "From": {
-                "Email": settings.DEFAULT_FROM_EMAIL,
-                "Name": "Arpan Sahu",
-            },
-            "To": [{
-                "Email": to_email,
-                "Name": to_name,
-            }],
-            "Subject": subject,
-            "TextPart": text_body,
-            "HTMLPart": html_body,
-            "CustomID": to_email,
-        }]
-    }
-    result = mailjet.send.create(data=data)
-    logger.info("Mailjet send result for %s: %s", to_email, result.status_code)
-    return result
+    logger.info("Queued email for %s", to_email)
+    return email
 
 
 class CustomAccountAdapter(DefaultAccountAdapter):
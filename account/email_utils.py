@@ -1,13 +1,11 @@
 from django.conf import settings
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from mailjet_rest import Client
-
-mailjet = Client(auth=(settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET), version='v3.1')
+from mailer.outbox import queue_email
 
 
 def send_password_reset_email(user, reset_url):
-    """Send password reset email using MailJet"""
+    """Queue a password reset email for delivery via MailJet"""
     
     html_message = render_to_string(template_name='registration/password_reset_email.html', context={
         'user': user,
@@ -34,26 +32,15 @@ def send_password_reset_email(user, reset_url):
     {settings.PROTOCOL}://{settings.DOMAIN}
     """
 
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "admin@arpansahu.space",
-                    "Name": "Arpan Sahu"
-                },
-                "To": [
-                    {
-                        "Email": user.email,
-                        "Name": user.username
-                    }
-                ],
-                "Subject": "Password Reset Request - Arpan Sahu",
-                "TextPart": text_message,
-                "HTMLPart": html_message,
-                "CustomID": f"password_reset_{user.pk}"
-            }
-        ]
-    }
-    result = mailjet.send.create(data=data)
-    print(f"Password reset email sent to {user.email}")
-    return result
+    email = queue_email(
+        to_email=user.email,
+        to_name=user.username,
+        subject="Password Reset Request - Arpan Sahu",
+        text_part=text_message,
+        html_part=html_message,
+        from_email="admin@arpansahu.space",
+        from_name="Arpan Sahu",
+        custom_id=f"password_reset_{user.pk}",
+    )
+    print(f"Password reset email queued for {user.email}")
+    return email
@@ -13,8 +13,7 @@ from django.template import loader
 
 UserModel = get_user_model()
 
-from django.conf import settings
-from mailjet_rest import Client
+from mailer.outbox import queue_email
 
 import logging
 
@@ -324,32 +323,17 @@ class PasswordResetForm(forms.Form):
         if html_email_template_name is not None:
             html_email = loader.render_to_string(html_email_template_name, context)
 
-        mailjet = Client(auth=(settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET), version='v3.1')
-        data = {
-            'Messages': [
-                {
-                    "From": {
-                        "Email": "admin@arpansahu.space",
-                        "Name": "Great Chat"
-                    },
-                    "To": [
-                        {
-                            "Email": to_email,
-                            "Name": user.username
-                        }
-                    ],
-                    "Subject": subject,
-                    "TextPart": body,
-                    "HTMLPart": body,
-                    "CustomID": f"{user.email}"
-                }
-            ]
-        }
-        result = mailjet.send.create(data=data)
-        if result:
-            print(f"Mail Send Successfully {result}")
-        else:
-            print(f"Mail Send Failed {result}")
+        queue_email(
+            to_email=to_email,
+            to_name=user.username,
+            subject=subject,
+            text_part=body,
+            html_part=body,
+            from_email="admin@arpansahu.space",
+            from_name="Great Chat",
+            custom_id=f"{user.email}",
+        )
+        print(f"Mail queued for {to_email}")
 
     def get_users(self, email):
         """Given an email or username, return matching user(s) who should receive a reset.
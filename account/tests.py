@@ -349,53 +349,46 @@ class TestErrorHandlerViews:
 class TestSendMailAccountActivate:
     """Tests for send_mail_account_activate function."""
 
-    def test_send_mail_account_activate_calls_mailjet(self, test_user, mocker):
-        """Test activation email is sent via MailJet."""
+    def test_send_mail_account_activate_queues_email(self, test_user):
+        """Test activation email is queued in the outbox."""
         from account import views as account_views
-        mock_result = mocker.MagicMock()
-        mock_result.status_code = 200
-        mock_send = mocker.MagicMock()
-        mock_send.create.return_value = mock_result
-        mocker.patch.object(account_views.mailjet, 'send', mock_send)
+        from mailer.models import OutboundEmail
 
-        result = account_views.send_mail_account_activate(test_user.email, test_user)
-        mock_send.create.assert_called_once()
-        assert result == mock_result
+        account_views.send_mail_account_activate(test_user.email, test_user)
+        email = OutboundEmail.objects.get()
+        assert email.to_email == test_user.email
+        assert email.custom_id == f'account_activation_{test_user.pk}'
+        assert 'activate' in email.text_part
 
 
 class TestSendWelcomeEmail:
     """Tests for send_welcome_email function."""
 
-    def test_send_welcome_email_calls_mailjet(self, test_user, mocker):
-        """Test welcome email is sent via MailJet."""
+    def test_send_welcome_email_queues_once(self, test_user):
+        """Test welcome email is queued once per user."""
         from account import views as account_views
-        mock_result = mocker.MagicMock()
-        mock_result.status_code = 200
-        mock_send = mocker.MagicMock()
-        mock_send.create.return_value = mock_result
-        mocker.patch.object(account_views.mailjet, 'send', mock_send)
+        from mailer.models import OutboundEmail
 
-        result = account_views.send_welcome_email(test_user.email, test_user)
-        mock_send.create.assert_called_once()
-        assert result == mock_result
+        account_views.send_welcome_email(test_user.email, test_user)
+        account_views.send_welcome_email(test_user.email, test_user)
+        assert OutboundEmail.objects.get().subject == 'Welcome to Arpan Sahu!'
 
 
 class TestSendPasswordResetEmail:
     """Tests for send_password_reset_email function."""
 
-    def test_send_password_reset_email_calls_mailjet(self, test_user, mocker):
-        """Test password reset email is sent via MailJet."""
+    def test_send_password_reset_email_queues_email(self, test_user):
+        """Test password reset email is queued and delivered by the outbox."""
         from account import email_utils
-        mock_result = mocker.MagicMock()
-        mock_result.status_code = 200
-        mock_send = mocker.MagicMock()
-        mock_send.create.return_value = mock_result
-        mocker.patch.object(email_utils.mailjet, 'send', mock_send)
+        from mailer.outbox import send_queued
+        from mailer.transports import LocmemTransport
 
-        result = email_utils.send_password_reset_email(
+        email_utils.send_password_reset_email(
             test_user,
             'http://localhost:8000/account/password_reset_confirm/uid/token/'
         )
-        mock_send.create.assert_called_once()
-        assert result == mock_result
+        transport = LocmemTransport()
+        transport.outbox.clear()
+        assert send_queued(transport=transport) == (1, 0)
+        assert transport.outbox[0]['To'] == [{'Email': test_user.email, 'Name': test_user.username}]
 
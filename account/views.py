@@ -22,13 +22,12 @@ from django.contrib.auth.views import PasswordContextMixin
 
 from account.models import Account
 from account.token import account_activation_token
+from comments.unread import get_unread_count
 
 DOMAIN = settings.DOMAIN
 PROTOCOL = settings.PROTOCOL
 
-from mailjet_rest import Client
-
-mailjet = Client(auth=(settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET), version='v3.1')
+from mailer.outbox import queue_email
 
 
 # Create your views here.
@@ -91,29 +90,18 @@ def send_mail_account_activate(reciever_email, user, SUBJECT="Confirm Your Email
     {PROTOCOL}://{DOMAIN}
     """
 
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "admin@arpansahu.space",
-                    "Name": "Arpan Sahu"
-                },
-                "To": [
-                    {
-                        "Email": reciever_email,
-                        "Name": user.username
-                    }
-                ],
-                "Subject": SUBJECT,
-                "TextPart": text_message,
-                "HTMLPart": html_message,
-                "CustomID": f"account_activation_{user.pk}"
-            }
-        ]
-    }
-    result = mailjet.send.create(data=data)
-    print(f"Account activation email sent to {reciever_email}")
-    return result
+    email = queue_email(
+        to_email=reciever_email,
+        to_name=user.username,
+        subject=SUBJECT,
+        text_part=text_message,
+        html_part=html_message,
+        from_email="admin@arpansahu.space",
+        from_name="Arpan Sahu",
+        custom_id=f"account_activation_{user.pk}",
+    )
+    print(f"Account activation email queued for {reciever_email}")
+    return email
 
 
 def send_welcome_email(reciever_email, user):
@@ -142,29 +130,20 @@ def send_welcome_email(reciever_email, user):
     {PROTOCOL}://{DOMAIN}
     """
 
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "admin@arpansahu.space",
-                    "Name": "Arpan Sahu"
-                },
-                "To": [
-                    {
-                        "Email": reciever_email,
-                        "Name": user.username
-                    }
-                ],
-                "Subject": "Welcome to Arpan Sahu!",
-                "TextPart": text_message,
-                "HTMLPart": html_message,
-                "CustomID": f"welcome_email_{user.pk}"
-            }
-        ]
-    }
-    result = mailjet.send.create(data=data)
-    print(f"Welcome email sent to {reciever_email}")
-    return result
+    # Keyed on the user, so a second activation never sends a second welcome
+    email = queue_email(
+        to_email=reciever_email,
+        to_name=user.username,
+        subject="Welcome to Arpan Sahu!",
+        text_part=text_message,
+        html_part=html_message,
+        from_email="admin@arpansahu.space",
+        from_name="Arpan Sahu",
+        custom_id=f"welcome_email_{user.pk}",
+        idempotency_key=f"welcome_email_{user.pk}",
+    )
+    print(f"Welcome email queued for {reciever_email}")
+    return email
 
 
 def activate(request, uidb64, token):
@@ -307,14 +286,8 @@ class AccountView(View):
         context["account"] = request.user
         context['account_form'] = form
         context['social_providers'] = self._get_social_context(request.user)
-        # Add unread notification count
-        try:
-            from blog.models import Notification
-            context['unread_notification_count'] = Notification.objects.filter(
-                recipient=request.user, is_read=False
-            ).count()
-        except Exception:
-            context['unread_notification_count'] = 0
+        # Unread notification count (cached per user)
+        context['unread_notification_count'] = get_unread_count(request.user)
         return render(request, 'account/account.html', context)
 
     def post(self, request, *args, **kwargs):
@@ -0,0 +1,49 @@
+import os
+from urllib.parse import urlsplit
+
+from ckeditor_uploader.backends import PillowBackend
+from ckeditor_uploader.forms import SearchForm
+from ckeditor_uploader.views import get_files_browse_urls
+from django.conf import settings
+from django.shortcuts import render
+
+from .images import is_variant_file, schedule_variants
+
+
+class VariantsPillowBackend(PillowBackend):
+    """CKEditor's Pillow backend that also builds responsive variants of uploads."""
+
+    def save_as(self, filepath):
+        saved_path = super().save_as(filepath)
+        if self.is_image:
+            schedule_variants(saved_path)
+        return saved_path
+
+
+def browse(request):
+    """
+    CKEditor's "Browse server" dialog without the responsive variants.
+
+    Same as ``ckeditor_uploader.views.browse``, which only hides ``*_thumb``
+    files, but also drops ``*.wNNN.*`` variants and ``.variants.json``
+    manifests so each upload is listed once.
+    """
+    files = [
+        entry for entry in get_files_browse_urls(request.user)
+        if not is_variant_file(urlsplit(entry['src']).path)
+    ]
+    if request.method == 'POST':
+        form = SearchForm(request.POST)
+        if form.is_valid():
+            query = form.cleaned_data.get('q', '').lower()
+            files = [entry for entry in files if query in entry['visible_filename'].lower()]
+    else:
+        form = SearchForm()
+
+    context = {
+        'show_dirs': getattr(settings, 'CKEDITOR_BROWSE_SHOW_DIRS', False),
+        'dirs': sorted({os.path.dirname(entry['src']) for entry in files}, reverse=True),
+        'files': files,
+        'form': form,
+    }
+    return render(request, 'ckeditor/browse.html', context)
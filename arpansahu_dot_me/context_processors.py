@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 from django.conf import settings
 
+from comments.unread import get_unread_count
+
 
 def adsense_settings(request):
     """
@@ -9,3 +13,21 @@ def adsense_settings(request):
         'GOOGLE_ADSENSE_CLIENT_ID': settings.GOOGLE_ADSENSE_CLIENT_ID,
         'GOOGLE_ADSENSE_ENABLED': settings.GOOGLE_ADSENSE_ENABLED,
     }
+
+
+def unread_notifications(request):
+    """
+    Unread notification count for the header badge (cached per user).
+
+    Passed as a (memoised) callable so templates that don't show it never
+    touch the cache.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    @lru_cache(maxsize=None)
+    def unread_count():
+        return get_unread_count(user)
+
+    return {'unread_notification_count': unread_count}
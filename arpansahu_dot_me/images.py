@@ -0,0 +1,216 @@
+"""
+Responsive image variants.
+
+For a JPEG/PNG ``photo.jpg`` this writes, next to the original in the same
+storage backend:
+
+* ``photo.jpg.w480.jpg``, ``photo.jpg.w960.jpg``, ... resized copies (never
+  upscaled)
+* ``photo.jpg.w480.webp`` / ``photo.jpg.w480.avif``, ... modern encodings of
+  each width, including the full width
+* ``photo.jpg.variants.json`` listing them with the source checksum
+
+Names keep the source extension, so ``photo.jpg`` and ``photo.png`` in one
+directory never overwrite each other's variants.
+
+Variants are built for:
+
+* blog featured images and CKEditor uploads, on upload (``schedule_variants``)
+* the portfolio images in ``static/images``, at image build time with
+  ``generate_image_variants --static``; ``collectstatic`` then ships them
+  with the originals
+
+A file whose checksum matches its manifest is skipped, so re-running costs
+one manifest read. The ``responsive_image`` template tag reads the manifest
+through the cache to emit ``srcset``.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import transaction
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (480, 960, 1600)))
+VARIANT_FORMATS = tuple(
+    fmt for fmt in getattr(settings, 'IMAGE_VARIANT_FORMATS', ('avif', 'webp')) if features.check(fmt)
+)
+VARIANTS_ASYNC = getattr(settings, 'IMAGE_VARIANTS_ASYNC', True)
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+MANIFEST_SUFFIX = '.variants.json'
+MANIFEST_TIMEOUT = 60 * 60 * 24
+
+PIL_FORMATS = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP', 'avif': 'AVIF'}
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 6},
+    'AVIF': {'quality': 60},
+}
+CONTENT_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}  # Preference order for <source>
+
+_VARIANT_RE = re.compile(r'\.(jpe?g|png)\.w\d+\.(jpe?g|png|webp|avif)$', re.IGNORECASE)
+
+
+def is_variant_source(name):
+    """True for JPEG/PNG originals (not for variants generated from them)."""
+    return name.lower().endswith(SOURCE_EXTENSIONS) and not _VARIANT_RE.search(name)
+
+
+def is_variant_file(name):
+    """True for generated variants and manifests, which listings should hide."""
+    return bool(_VARIANT_RE.search(name)) or name.endswith(MANIFEST_SUFFIX)
+
+
+def variant_name(name, width, extension):
+    return f'{name}.w{width}.{extension}'
+
+
+def manifest_name(name):
+    return f'{name}{MANIFEST_SUFFIX}'
+
+
+def _cache_key(alias, name):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f'images:variants:{alias}:{digest}'
+
+
+def _replace(storage, name, content):
+    # Media storage never overwrites (it would rename), so delete first
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def _encode(image, fmt):
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def read_manifest(storage, name):
+    """Return the stored manifest for ``name`` or None."""
+    try:
+        with storage.open(manifest_name(name)) as handle:
+            return json.loads(handle.read())
+    except (OSError, ValueError):
+        return None
+
+
+def generate_variants(storage, name, data=None, alias=None, force=False):
+    """
+    Write resized and re-encoded variants of ``name`` next to it.
+
+    Args:
+        storage: storage holding the original (variants go to the same one)
+        name: storage name of the original
+        data: original bytes if already at hand
+        alias: ``STORAGES`` alias used to key the manifest cache
+        force: rebuild even if the manifest matches the source
+
+    Returns:
+        dict or None: the manifest, or None if ``name`` is not a still JPEG/PNG
+    """
+    if not is_variant_source(name):
+        return None
+    if data is None:
+        with storage.open(name) as handle:
+            data = handle.read()
+    checksum = hashlib.md5(data).hexdigest()
+    existing = read_manifest(storage, name)
+    if existing and existing.get('source') == checksum and not force:
+        return existing
+
+    image = Image.open(BytesIO(data))
+    if getattr(image, 'is_animated', False):
+        return None
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    width, height = image.size
+    original_extension = os.path.splitext(name)[1].lstrip('.').lower()
+
+    variants = {original_extension: [], **{fmt: [] for fmt in VARIANT_FORMATS}}
+    for target in sorted({w for w in VARIANT_WIDTHS if w < width} | {width}):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS
+        )
+        for extension in variants:
+            if extension == original_extension and target == width:
+                variants[extension].append([target, name])  # The original itself
+                continue
+            variant = variant_name(name, target, extension)
+            _replace(storage, variant, _encode(resized, PIL_FORMATS[extension]))
+            variants[extension].append([target, variant])
+
+    manifest = {'source': checksum, 'width': width, 'height': height, 'variants': variants}
+    _replace(storage, manifest_name(name), json.dumps(manifest).encode())
+    if alias:
+        cache.set(_cache_key(alias, name), manifest, timeout=MANIFEST_TIMEOUT)
+    return manifest
+
+
+def get_variants(alias, name):
+    """Return the manifest for ``name`` in storage ``alias`` (cached), or None."""
+    key = _cache_key(alias, name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = read_manifest(storages[alias], name) or {}
+        cache.set(key, manifest, timeout=MANIFEST_TIMEOUT)
+    return manifest or None
+
+
+@functools.lru_cache(maxsize=None)
+def get_static_variants(name):
+    """
+    Return the manifest for static file ``name``, or None.
+
+    Read through the staticfiles finders, i.e. from the source tree baked into
+    the image, so it never touches remote static storage. Static files only
+    change with a new image, so the result is kept for the process lifetime.
+    """
+    path = finders.find(manifest_name(name))
+    if not path:
+        return None
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _generate_quietly(alias, name):
+    try:
+        generate_variants(storages[alias], name, alias=alias)
+    except Exception:
+        logger.exception('Could not build image variants for %s', name)
+
+
+def schedule_variants(name, alias='default'):
+    """
+    Build variants for ``name`` once the current transaction commits.
+
+    Runs in a background thread unless ``IMAGE_VARIANTS_ASYNC`` is off;
+    ``generate_image_variants`` rebuilds anything that was missed.
+    """
+    if not name or not is_variant_source(name):
+        return
+    if not VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _generate_quietly(alias, name))
+        return
+    transaction.on_commit(lambda: threading.Thread(
+        target=_generate_quietly, args=(alias, name), name='image-variants', daemon=True
+    ).start())
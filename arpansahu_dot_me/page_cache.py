@@ -0,0 +1,145 @@
+"""
+Full-page cache for anonymous visitors.
+
+``cache_anonymous_page(section)`` stores the rendered HTML of a GET request
+in the default cache (Redis in production), keyed on the host, the path,
+the normalised query string and three version counters:
+
+* a per-path version, bumped by ``purge_paths`` (every query variant of the
+  path, e.g. ``?page=2``, goes with it)
+* a section version, bumped by ``purge_section`` for a group of pages that
+  render the same data (e.g. every blog listing embeds the sidebar)
+* a global version, bumped by ``purge_all``
+
+A hit costs two cache reads and no database or template work. Authenticated
+users, non-GET requests, requests carrying flash messages and non-200
+responses always bypass the cache.
+
+The CSRF token is punched out of cached pages: while rendering, the
+``page_cache_csrf`` context processor replaces ``csrf_token`` with a
+placeholder, and every response (hit or miss) substitutes the visitor's own
+token, so pages with forms (home, about) remain cacheable.
+"""
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 15)
+GLOBAL_VERSION_KEY = 'page:version'
+CSRF_PLACEHOLDER = 'PAGE-CACHE-CSRF-TOKEN'
+
+# Page sections that are purged together
+SECTION_SITE = 'site'
+SECTION_BLOG = 'blog'
+
+_REQUEST_FLAG = '_page_cache_active'
+
+
+def _digest(value):
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+def _path_version_key(path):
+    return f'page:path:{_digest(path)}'
+
+
+def _section_version_key(section):
+    return f'page:section:{section}'
+
+
+def _normalised_query(request):
+    return urlencode(sorted(request.GET.lists()), doseq=True)
+
+
+def _page_key(request, section):
+    path = request.path
+    version_keys = [GLOBAL_VERSION_KEY, _section_version_key(section), _path_version_key(path)]
+    versions = cache.get_many(version_keys)
+    return 'page:{}:{}:{}:{}'.format(
+        section,
+        '.'.join(str(versions.get(key, 0)) for key in version_keys),
+        _digest(request.get_host() + path),
+        _digest(_normalised_query(request)),
+    )
+
+
+def _is_cacheable_request(request):
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def _with_csrf_token(request, content):
+    if CSRF_PLACEHOLDER.encode() not in content:
+        return content
+    return content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+
+
+def cache_anonymous_page(section):
+    """Serve the decorated view from the page cache for anonymous GET requests."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_key(request, section)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(_with_csrf_token(request, content), content_type=content_type)
+                response['X-Page-Cache'] = 'HIT'
+                return response
+
+            setattr(request, _REQUEST_FLAG, True)
+            response = view_func(request, *args, **kwargs)
+            if response.streaming:
+                return response
+            if response.status_code == 200 and not response.cookies:
+                cache.set(key, (response.content, response['Content-Type']), timeout=PAGE_CACHE_TIMEOUT)
+                response['X-Page-Cache'] = 'MISS'
+            response.content = _with_csrf_token(request, response.content)
+            return response
+        return wrapper
+    return decorator
+
+
+def page_cache_csrf(request):
+    """Context processor: render a placeholder CSRF token into cached pages."""
+    if getattr(request, _REQUEST_FLAG, False):
+        return {'csrf_token': CSRF_PLACEHOLDER}
+    return {}
+
+
+def _bump(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def purge_paths(*paths):
+    """Drop every cached variant of the given URL paths."""
+    for path in set(filter(None, paths)):
+        _bump(_path_version_key(path))
+
+
+def purge_section(section):
+    """Drop every cached page of ``section``."""
+    _bump(_section_version_key(section))
+
+
+def purge_all():
+    """Drop every cached page."""
+    _bump(GLOBAL_VERSION_KEY)
@@ -0,0 +1,70 @@
+"""
+Cache-backed rate limiting for the OTP and contact endpoints.
+
+Each rule allows ``limit`` hits per ``window`` seconds using a sliding
+window counter: hits are counted in fixed buckets with atomic
+``cache.incr`` and the previous bucket is weighted by how much of it still
+overlaps the window. Counting happens before the check, so concurrent
+requests can never both slip under the limit, and rejected requests never
+reach the database.
+
+Limits can be overridden with ``settings.RATE_LIMITS``::
+
+    RATE_LIMITS = {'otp:ip': (20, 60 * 60)}
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_RATE_LIMITS = {
+    'otp:email': (5, 60 * 60 * 24),  # OTPs per address per day
+    'otp:ip': (20, 60 * 60),
+    'contact:ip': (10, 60 * 60),
+}
+RATE_LIMITS = {**DEFAULT_RATE_LIMITS, **getattr(settings, 'RATE_LIMITS', {})}
+
+# nginx overwrites X-Real-IP with the connecting address, so it cannot be spoofed
+CLIENT_IP_HEADER = getattr(settings, 'RATE_LIMIT_IP_HEADER', 'HTTP_X_REAL_IP')
+
+
+def client_ip(request):
+    """Return the client address as seen by the reverse proxy."""
+    return request.META.get(CLIENT_IP_HEADER) or request.META.get('REMOTE_ADDR', '')
+
+
+def _bucket_key(rule, identifier, bucket):
+    return f'ratelimit:{rule}:{identifier}:{bucket}'
+
+
+def _incr(key, timeout):
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:  # Expired between add and incr
+        cache.add(key, 1, timeout=timeout)
+        return 1
+
+
+def hit(rule, identifier, now=None):
+    """
+    Count one request against ``rule`` for ``identifier``.
+
+    Returns:
+        bool: True if the request is within the limit
+    """
+    limit, window = RATE_LIMITS[rule]
+    now = time.time() if now is None else now
+    bucket, elapsed = divmod(now, window)
+    bucket = int(bucket)
+
+    current = _incr(_bucket_key(rule, identifier, bucket), timeout=window * 2)
+    previous = cache.get(_bucket_key(rule, identifier, bucket - 1), 0)
+    return previous * (1 - elapsed / window) + current <= limit
+
+
+def reset(rule, identifier):
+    """Forget the counts for ``identifier`` (e.g. from the admin or tests)."""
+    _limit, window = RATE_LIMITS[rule]
+    bucket = int(time.time() // window)
+    cache.delete_many([_bucket_key(rule, identifier, bucket - 1), _bucket_key(rule, identifier, bucket)])
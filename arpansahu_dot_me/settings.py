@@ -43,6 +43,9 @@ MAIL_JET_API_SECRET = config('MAIL_JET_API_SECRET')
 MAIL_JET_EMAIL_ADDRESS = config('MAIL_JET_EMAIL_ADDRESS')
 MY_EMAIL_ADDRESS = config('MY_EMAIL_ADDRESS')
 
+# Email outbox: transport used by the send_queued_emails worker
+MAILER_TRANSPORT = 'mailer.transports.MailjetTransport'
+
 # Domain and Protocol Configuration
 if DEBUG:
     DOMAIN = config('DOMAIN', default='localhost:8000')
@@ -99,6 +102,7 @@ INSTALLED_APPS = [
     'resume',
     'blog',
     'comments',  # Universal comment system
+    'mailer',  # Email outbox (queued Mailjet sends)
     
     # third party apps
     'ckeditor',
@@ -117,6 +121,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'check_service_health.middleware.HealthCheckMiddleware',  # Probes skip host checks/redirects
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -153,6 +158,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'arpansahu_dot_me.context_processors.adsense_settings',
+                'arpansahu_dot_me.context_processors.unread_notifications',
+                'arpansahu_dot_me.page_cache.page_cache_csrf',
             ],
         },
     },
@@ -444,6 +451,14 @@ SOCIALACCOUNT_ADAPTER = 'account.adapter.CustomSocialAccountAdapter'
 
 OTP_EXPIRY_TIME = 60
 
+# Related posts: top-N neighbours precomputed by blog.related
+BLOG_RELATED_POSTS_COUNT = 5
+BLOG_RELATED_POSTS_USE_TFIDF = True
+
+# Full-page cache for anonymous visitors (arpansahu_dot_me.page_cache)
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 15  # seconds; pages are also purged when content changes
+
 # Security Settings for Production
 if not DEBUG:
     SECURE_HSTS_SECONDS = 31536000  # 1 year
@@ -559,7 +574,7 @@ LOGGING = {
 
 # CKEditor Configuration
 CKEDITOR_UPLOAD_PATH = "blog/uploads/"
-CKEDITOR_IMAGE_BACKEND = "pillow"
+CKEDITOR_IMAGE_BACKEND = "arpansahu_dot_me.ckeditor_backend.VariantsPillowBackend"
 CKEDITOR_ALLOW_NONIMAGE_FILES = False
 
 CKEDITOR_CONFIGS = {
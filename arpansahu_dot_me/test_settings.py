@@ -33,6 +33,8 @@ CACHES = {
 
 # Disable email sending in tests
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+MAILER_TRANSPORT = 'mailer.transports.LocmemTransport'
+IMAGE_VARIANTS_ASYNC = False
 
 # Use local file storage for media in tests (override STORAGES if set)
 STORAGES = {
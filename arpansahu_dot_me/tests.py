@@ -139,6 +139,18 @@ class TestContactView:
         response = client.post(reverse('contact'), data={})
         assert response.status_code == 200
 
+    def test_contact_post_otp_cannot_be_replayed(self, client, db):
+        """Test a valid OTP sends the message once and is rejected on resubmission."""
+        from emails_otp import otp
+        from mailer.models import OutboundEmail
+        data = {
+            'name': 'Visitor', 'email': 'visitor@example.com', 'contact': '1234567890',
+            'subject': 'Hello', 'message': 'Hi there', 'otp': otp.issue('visitor@example.com'),
+        }
+        assert client.post(reverse('contact'), data=data).context['message_sent_done'] is True
+        assert client.post(reverse('contact'), data=data).context['message_sent_done'] is False
+        assert OutboundEmail.objects.count() == 1
+
 
 class TestResumeView:
     """Tests for Resume view."""
@@ -178,6 +190,98 @@ class TestGetOTPView:
         url = reverse('get-otp')
         assert url == '/get-otp'
 
+    def _request_otp(self, client, email, ip='10.0.0.1'):
+        return client.post(
+            reverse('get-otp'), data={'email': email},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_X_REAL_IP=ip,
+        )
+
+    def test_get_otp_limits_each_email_to_five(self, client, db, django_assert_num_queries):
+        """Test the sixth OTP for an address is rejected without touching the database."""
+        from mailer.models import OutboundEmail
+        for number in range(5):
+            assert self._request_otp(client, 'limit@example.com', ip=f'10.0.0.{number}').status_code == 200
+        with django_assert_num_queries(0):
+            response = self._request_otp(client, 'limit@example.com', ip='10.0.0.9')
+        assert response.status_code == 429
+        assert OutboundEmail.objects.filter(to_email='limit@example.com').count() <= 5
+        # OTP emails are dropped rather than delivered after the code expires
+        assert not OutboundEmail.objects.filter(to_email='limit@example.com', expires_at__isnull=True).exists()
+
+    def test_get_otp_email_is_keyed_by_time_step(self, client, db, mocker):
+        """Test a resend within the window is deduplicated, but the same digits in a later window are sent."""
+        from emails_otp import otp
+        from mailer.models import OutboundEmail
+        issue = mocker.patch.object(otp, 'issue_with_step', return_value=('123456', 100))
+        self._request_otp(client, 'step@example.com')
+        self._request_otp(client, 'step@example.com', ip='10.0.0.2')
+        assert OutboundEmail.objects.filter(to_email='step@example.com').count() == 1
+        issue.return_value = ('123456', 101)
+        self._request_otp(client, 'step@example.com', ip='10.0.0.3')
+        assert OutboundEmail.objects.filter(to_email='step@example.com').count() == 2
+
+    def test_get_otp_limits_each_ip(self, client, db):
+        """Test one address cannot request OTPs for many emails."""
+        from arpansahu_dot_me import ratelimit
+        limit, _window = ratelimit.RATE_LIMITS['otp:ip']
+        statuses = [self._request_otp(client, f'user{n}@example.com').status_code for n in range(limit + 1)]
+        assert statuses[:limit] == [200] * limit
+        assert statuses[-1] == 429
+        assert self._request_otp(client, 'other@example.com', ip='10.0.0.2').status_code == 200
+
+    def test_get_otp_is_audited_in_the_database(self, client, db):
+        """Test issued OTPs reach EmailsOtpRecord via the write-behind log."""
+        from emails_otp.audit import flush_otp_records
+        from emails_otp.models import EmailsOtpRecord
+        self._request_otp(client, 'audit@example.com')
+        self._request_otp(client, 'audit@example.com')
+        flush_otp_records()
+        assert EmailsOtpRecord.objects.get(email='audit@example.com').count == 2
+
+
+class TestRateLimit:
+    """Tests for the sliding window rate limiter."""
+
+    def test_limit_within_window(self):
+        """Test hits beyond the limit in one window are rejected."""
+        from arpansahu_dot_me import ratelimit
+        limit, window = ratelimit.RATE_LIMITS['contact:ip']
+        now = window * 1000
+        results = [ratelimit.hit('contact:ip', '1.2.3.4', now=now) for _ in range(limit + 1)]
+        assert results == [True] * limit + [False]
+        assert ratelimit.hit('contact:ip', '5.6.7.8', now=now)
+
+    def test_previous_window_is_weighted(self):
+        """Test hits from the previous window count in proportion to their overlap."""
+        from arpansahu_dot_me import ratelimit
+        limit, window = ratelimit.RATE_LIMITS['contact:ip']
+        start = window * 1000
+        for _ in range(limit):
+            ratelimit.hit('contact:ip', '1.2.3.4', now=start)
+        # Just into the next window almost all earlier hits still count
+        assert not ratelimit.hit('contact:ip', '1.2.3.4', now=start + window + 1)
+        # Near its end they have almost expired
+        assert ratelimit.hit('contact:ip', '1.2.3.4', now=start + 2 * window - 1)
+
+    def test_client_ip_prefers_proxy_header(self, rf):
+        """Test the address set by nginx wins over the socket address."""
+        from arpansahu_dot_me.ratelimit import client_ip
+        assert client_ip(rf.get('/', HTTP_X_REAL_IP='9.9.9.9', REMOTE_ADDR='127.0.0.1')) == '9.9.9.9'
+        assert client_ip(rf.get('/', REMOTE_ADDR='127.0.0.1')) == '127.0.0.1'
+
+    def test_contact_post_rate_limited(self, client, db):
+        """Test the contact form rejects a flood from one address."""
+        from arpansahu_dot_me import ratelimit
+        limit, _window = ratelimit.RATE_LIMITS['contact:ip']
+        for _ in range(limit):
+            assert client.post(reverse('contact'), data={}, HTTP_X_REAL_IP='1.1.1.1').status_code == 200
+        response = client.post(reverse('contact'), data={}, HTTP_X_REAL_IP='1.1.1.1')
+        assert response.status_code == 429
+        assert response.context['contact'] == 'active'
+        assert response.context['message_sent_done'] is False
+        ratelimit.reset('contact:ip', '1.1.1.1')
+        assert client.post(reverse('contact'), data={}, HTTP_X_REAL_IP='1.1.1.1').status_code == 200
+
 
 
 
@@ -221,14 +325,10 @@ class TestSendEmailUtil:
         from arpansahu_dot_me.utils import send_email
         assert callable(send_email)
 
-    def test_send_email_with_mock(self, db, mocker):
-        """Test send_email calls mailjet API correctly."""
+    def test_send_email_queues_message(self, db):
+        """Test send_email queues the email in the outbox."""
         from arpansahu_dot_me import utils
-        mock_result = mocker.MagicMock()
-        mock_result.status_code = 200
-        mock_send = mocker.MagicMock()
-        mock_send.create.return_value = mock_result
-        mocker.patch.object(utils.mailjet, 'send', mock_send)
+        from mailer.models import OutboundEmail
 
         success, status_code = utils.send_email(
             to_email='test@test.com',
@@ -238,8 +338,10 @@ class TestSendEmailUtil:
             html_part='<p>Hello</p>',
         )
         assert success is True
-        assert status_code == 200
-        mock_send.create.assert_called_once()
+        assert status_code == 202
+        message = OutboundEmail.objects.get().as_message()
+        assert message['To'] == [{'Email': 'test@test.com', 'Name': 'Test User'}]
+        assert message['CustomID'] == 'test@test.com'
 
 
 class TestGetGitCommitHash:
@@ -259,3 +361,251 @@ class TestGetGitCommitHash:
         from arpansahu_dot_me.settings import get_git_commit_hash
         assert get_git_commit_hash() is None
 
+
+
+class TestPageCache:
+    """Tests for the anonymous full-page cache."""
+
+    @pytest.fixture
+    def author(self, db):
+        from django.contrib.auth import get_user_model
+        user = get_user_model().objects.create_user(
+            email='pagecache@example.com', username='pagecache', password='TestPassword123!'
+        )
+        user.is_active = True
+        user.save()
+        return user
+
+    def _post(self, author, **kwargs):
+        from django.utils import timezone
+        from blog.models import BlogPost
+        defaults = dict(
+            title='Cached post', slug='cached-post', author=author, excerpt='Excerpt',
+            content='Content', status='published', published_date=timezone.now(),
+        )
+        defaults.update(kwargs)
+        return BlogPost.objects.create(**defaults)
+
+    def test_second_request_is_a_hit_without_queries(self, client, author, django_assert_num_queries):
+        """Test a cached page is served with no database work."""
+        self._post(author)
+        first = client.get(reverse('blog:blog_list'))
+        assert first['X-Page-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get(reverse('blog:blog_list'))
+        assert second['X-Page-Cache'] == 'HIT'
+        assert second.content == first.content
+
+    def test_query_string_variants_are_cached_separately(self, client, db):
+        """Test the query string is part of the key, in any parameter order."""
+        url = reverse('blog:blog_list')
+        client.get(url + '?q=alpha&page=1')
+        assert client.get(url + '?page=1&q=alpha')['X-Page-Cache'] == 'HIT'
+        assert client.get(url + '?q=beta')['X-Page-Cache'] == 'MISS'
+
+    def test_hosts_are_cached_separately(self, client, db, settings):
+        """Test a page cached for one host is never served to another."""
+        settings.ALLOWED_HOSTS = ['arpansahu.me', 'www.arpansahu.me']
+        url = reverse('blog:blog_list')
+        client.get(url, HTTP_HOST='arpansahu.me')
+        assert client.get(url, HTTP_HOST='arpansahu.me')['X-Page-Cache'] == 'HIT'
+        assert client.get(url, HTTP_HOST='www.arpansahu.me')['X-Page-Cache'] == 'MISS'
+
+    def test_authenticated_users_bypass_cache(self, client, author):
+        """Test logged-in users always get a fresh render."""
+        client.get(reverse('blog:blog_list'))
+        client.force_login(author)
+        response = client.get(reverse('blog:blog_list'))
+        assert 'X-Page-Cache' not in response
+
+    def test_post_requests_bypass_cache(self, client, db):
+        """Test POSTs are never answered from the cache."""
+        client.get(reverse('home'))
+        response = client.post(reverse('home'), data={})
+        assert 'X-Page-Cache' not in response
+        assert 'form' in response.context
+
+    def test_csrf_token_is_per_visitor(self, db):
+        """Test cached pages carry the visitor's own CSRF token, never a shared one."""
+        from arpansahu_dot_me.page_cache import CSRF_PLACEHOLDER
+        first, second = Client(), Client()
+        first.get(reverse('home'))
+        response = second.get(reverse('home'))
+        assert response['X-Page-Cache'] == 'HIT'
+        assert CSRF_PLACEHOLDER.encode() not in response.content
+        assert b'name="csrfmiddlewaretoken"' in response.content
+        assert 'csrftoken' in response.cookies
+
+    def test_publishing_a_post_purges_blog_pages(self, client, author):
+        """Test publishing a post purges the blog listings."""
+        client.get(reverse('blog:blog_list'))
+        self._post(author, title='Fresh post')
+        response = client.get(reverse('blog:blog_list'))
+        assert response['X-Page-Cache'] == 'MISS'
+        assert b'Fresh post' in response.content
+
+    def test_likes_and_comments_purge_blog_pages(self, client, author):
+        """Test like and comment counts on listing cards are never stale."""
+        from django.contrib.contenttypes.models import ContentType
+        from blog.models import BlogPost, PostLike
+        from comments.models import Comment
+        post = self._post(author)
+        url = reverse('blog:blog_list')
+        client.get(url)
+        like = PostLike.objects.create(post=post, user=author)
+        assert client.get(url)['X-Page-Cache'] == 'MISS'
+        like.delete()
+        assert client.get(url)['X-Page-Cache'] == 'MISS'
+        guest_comment = Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost), object_id=post.pk,
+            guest_name='Guest', content='Pending approval',
+        )
+        assert client.get(url)['X-Page-Cache'] == 'HIT'
+        guest_comment.is_approved = True
+        guest_comment.save()
+        assert client.get(url)['X-Page-Cache'] == 'MISS'
+        guest_comment.delete()
+        assert client.get(url)['X-Page-Cache'] == 'MISS'
+
+    def test_draft_changes_keep_cache(self, client, author):
+        """Test saving an unpublished post does not purge anything."""
+        draft = self._post(author, status='draft', published_date=None)
+        client.get(reverse('blog:blog_list'))
+        draft.title = 'Still a draft'
+        draft.save()
+        assert client.get(reverse('blog:blog_list'))['X-Page-Cache'] == 'HIT'
+
+    def test_blog_changes_keep_portfolio_pages(self, client, author):
+        """Test blog writes do not purge the portfolio section."""
+        client.get(reverse('about'))
+        self._post(author)
+        assert client.get(reverse('about'))['X-Page-Cache'] == 'HIT'
+
+    def test_resume_change_purges_home(self, client, db):
+        """Test a resume upload purges the pages that embed it."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from resume.models import Resume
+        client.get(reverse('home'))
+        client.get(reverse('projects'))
+        Resume.objects.create(file=SimpleUploadedFile('cv.pdf', b'%PDF-1.4', content_type='application/pdf'))
+        assert client.get(reverse('home'))['X-Page-Cache'] == 'MISS'
+        assert client.get(reverse('projects'))['X-Page-Cache'] == 'HIT'
+
+
+def _jpeg(width=2000, height=1000):
+    from io import BytesIO
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_storage(settings, tmp_path):
+    """Default storage writing to a temporary MEDIA_ROOT."""
+    from django.core.files.storage import storages
+    settings.MEDIA_ROOT = str(tmp_path)
+    return storages['default']
+
+
+class TestImageVariants:
+    """Tests for the responsive image pipeline."""
+
+    def test_generates_widths_and_formats(self, media_storage):
+        """Test resized copies and modern encodings are written next to the original."""
+        from django.core.files.base import ContentFile
+        from arpansahu_dot_me import images
+        media_storage.save('blog/featured/photo.jpg', ContentFile(_jpeg()))
+        manifest = images.generate_variants(media_storage, 'blog/featured/photo.jpg', alias='default')
+
+        assert (manifest['width'], manifest['height']) == (2000, 1000)
+        assert [width for width, _name in manifest['variants']['jpg']] == [480, 960, 1600, 2000]
+        assert manifest['variants']['jpg'][-1] == [2000, 'blog/featured/photo.jpg']
+        assert media_storage.exists('blog/featured/photo.jpg.w480.jpg')
+        for fmt in images.VARIANT_FORMATS:
+            assert media_storage.exists(f'blog/featured/photo.jpg.w2000.{fmt}')
+        assert media_storage.exists('blog/featured/photo.jpg.variants.json')
+        assert images.get_variants('default', 'blog/featured/photo.jpg') == manifest
+
+    def test_never_upscales_and_skips_unchanged(self, media_storage, mocker):
+        """Test small images keep their size and up-to-date variants are not rebuilt."""
+        from django.core.files.base import ContentFile
+        from arpansahu_dot_me import images
+        media_storage.save('small.png', ContentFile(_jpeg(300, 200)))
+        manifest = images.generate_variants(media_storage, 'small.png')
+        assert [width for width, _name in manifest['variants']['png']] == [300]
+
+        encode = mocker.spy(images, '_encode')
+        assert images.generate_variants(media_storage, 'small.png') == manifest
+        assert encode.call_count == 0
+
+    def test_ignores_non_sources(self):
+        """Test SVGs and generated variants are not processed again."""
+        from arpansahu_dot_me.images import is_variant_source
+        assert is_variant_source('images/profile.JPG')
+        assert not is_variant_source('images/logos/python.svg')
+        assert not is_variant_source('images/profile.jpg.w480.jpg')
+        assert is_variant_source('images/profile.w480.jpg')  # An upload that merely looks like one
+
+    def test_same_stem_sources_do_not_collide(self, media_storage):
+        """Test photo.jpg and photo.png keep separate variants."""
+        from django.core.files.base import ContentFile
+        from arpansahu_dot_me import images
+        media_storage.save('photo.jpg', ContentFile(_jpeg(1000, 500)))
+        media_storage.save('photo.png', ContentFile(_jpeg(800, 400)))
+        jpg = images.generate_variants(media_storage, 'photo.jpg')
+        png = images.generate_variants(media_storage, 'photo.png')
+        for fmt in images.VARIANT_FORMATS:
+            assert not {name for _w, name in jpg['variants'][fmt]} & {name for _w, name in png['variants'][fmt]}
+            assert media_storage.exists(f'photo.jpg.w480.{fmt}')
+            assert media_storage.exists(f'photo.png.w480.{fmt}')
+
+    def test_static_command_builds_in_source_tree(self, settings, tmp_path):
+        """Test --static writes variants next to static/images sources and the tag lookup finds them."""
+        from io import StringIO
+        from django.core.management import call_command
+        from arpansahu_dot_me import images
+        settings.STATICFILES_DIRS = [str(tmp_path)]
+        (tmp_path / 'images' / 'projects').mkdir(parents=True)
+        (tmp_path / 'images' / 'projects' / 'app.png').write_bytes(_jpeg(1000, 500))
+        (tmp_path / 'images' / 'logo.svg').write_text('<svg/>')
+        images.get_static_variants.cache_clear()
+
+        out = StringIO()
+        call_command('generate_image_variants', '--static', stdout=out)
+        assert 'Processed 1 image(s), 0 failed' in out.getvalue()
+        assert (tmp_path / 'images' / 'projects' / 'app.png.w480.png').exists()
+        assert images.get_static_variants('images/projects/app.png')['width'] == 1000
+        assert images.get_static_variants('images/logo.svg') is None
+        images.get_static_variants.cache_clear()
+
+
+class TestCKEditorVariants:
+    """Tests for responsive variants of CKEditor uploads."""
+
+    def test_browse_hides_variants(self, client, db, media_storage):
+        """Test the browse dialog lists each upload once, without its variants or manifest."""
+        from django.contrib.auth import get_user_model
+        from django.core.files.base import ContentFile
+        from arpansahu_dot_me import images
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', username='admin', password='AdminPassword123!'
+        )
+        client.force_login(admin)
+        media_storage.save('blog/uploads/2026/01/inline.jpg', ContentFile(_jpeg(1000, 500)))
+        images.generate_variants(media_storage, 'blog/uploads/2026/01/inline.jpg')
+
+        response = client.get(reverse('ckeditor_browse'))
+        assert response.status_code == 200
+        sources = [entry['src'] for entry in response.context['files']]
+        assert sources == ['/media/blog/uploads/2026/01/inline.jpg']
+
+    def test_upload_backend_schedules_variants(self, mocker):
+        """Test the Pillow backend queues variants for images only."""
+        from arpansahu_dot_me import ckeditor_backend
+        mocker.patch('ckeditor_uploader.backends.PillowBackend.save_as', return_value='blog/uploads/a.jpg')
+        schedule = mocker.patch.object(ckeditor_backend, 'schedule_variants')
+        backend = ckeditor_backend.VariantsPillowBackend(None, None)
+        mocker.patch.object(type(backend), 'is_image', new_callable=mocker.PropertyMock, return_value=True)
+        assert backend.save_as('blog/uploads/a.jpg') == 'blog/uploads/a.jpg'
+        schedule.assert_called_once_with('blog/uploads/a.jpg')
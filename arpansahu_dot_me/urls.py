@@ -14,9 +14,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.decorators.cache import never_cache
 from django.views.generic import RedirectView
 from django.views.static import serve as static_serve
 import os
@@ -34,6 +36,10 @@ from .views import (
     TAndCView,
 )
 
+from .ckeditor_backend import browse as ckeditor_browse
+
+from check_service_health.views import healthz, readyz
+
 from account.views import (
     LoginView,
     LogoutView,
@@ -57,6 +63,8 @@ urlpatterns = [
     path('', Home.as_view(), name='home'),
     path('blog/', include('blog.urls')),
     path('comments/', include('comments.urls')),
+    # Browse dialog that hides responsive image variants (must be BEFORE ckeditor_uploader.urls)
+    path('ckeditor/browse/', never_cache(staff_member_required(ckeditor_browse)), name='ckeditor_browse'),
     path('ckeditor/', include('ckeditor_uploader.urls')),
     
     # Redirect allauth login/logout to custom pages (must be BEFORE allauth.urls)
@@ -89,6 +97,10 @@ urlpatterns = [
     path('get-otp', GetOTPView.as_view(), name='get-otp'),
     path('download/resume/', ResumeDownloadView.as_view(), name='resume_download'),
 
+    # Kubernetes probes (normally answered by HealthCheckMiddleware)
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
+
     #sentry test view 
     path('sentry-debug/', trigger_error),
     path('large_resource/', large_resource),
@@ -2,14 +2,13 @@
 Utility functions for the arpansahu_dot_me project
 """
 from django.conf import settings
-from mailjet_rest import Client
+from mailer.outbox import queue_email
 
-mailjet = Client(auth=(settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET), version='v3.1')
 
-
-def send_email(to_email, to_name, subject, text_part, html_part, custom_id=None):
+def send_email(to_email, to_name, subject, text_part, html_part, custom_id=None, idempotency_key=None,
+               expires_in=None):
     """
-    Send email using MailJet API
+    Queue an email for delivery through MailJet (see ``mailer.outbox``)
     
     Args:
         to_email: Recipient email address
@@ -18,35 +17,22 @@ def send_email(to_email, to_name, subject, text_part, html_part, custom_id=None)
         text_part: Plain text version of email
         html_part: HTML version of email
         custom_id: Optional custom ID for tracking
+        idempotency_key: Optional key; queuing the same key twice sends once
+        expires_in: Optional seconds after which the email is dropped instead of sent
         
     Returns:
-        tuple: (success: bool, status_code: int)
+        tuple: (queued: bool, status_code: int) - 202 (accepted) once queued
     """
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": settings.MAIL_JET_EMAIL_ADDRESS,
-                    "Name": "arpansahu.space"
-                },
-                "To": [
-                    {
-                        "Email": to_email,
-                        "Name": to_name
-                    }
-                ],
-                "Subject": subject,
-                "TextPart": text_part,
-                "HTMLPart": html_part,
-                "CustomID": custom_id or to_email
-            }
-        ]
-    }
-    
-    try:
-        result = mailjet.send.create(data=data)
-        return result.status_code == 200, result.status_code
-    except Exception as e:
-        import traceback
-        print(traceback.format_exc())
-        raise e
+    queue_email(
+        to_email=to_email,
+        to_name=to_name,
+        subject=subject,
+        text_part=text_part,
+        html_part=html_part,
+        from_email=settings.MAIL_JET_EMAIL_ADDRESS,
+        from_name="arpansahu.space",
+        custom_id=custom_id or to_email,
+        idempotency_key=idempotency_key,
+        expires_in=expires_in,
+    )
+    return True, 202
@@ -1,7 +1,5 @@
-import base64
 import os
 import traceback
-from datetime import datetime
 
 from braces.views import AjaxResponseMixin, JsonRequestResponseMixin
 from django.conf import settings
@@ -10,14 +8,17 @@ from django.shortcuts import render, get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import View
-import pyotp
 
-from emails_otp.models import EmailsOtpRecord
+from emails_otp import otp as otp_service
+from emails_otp.audit import record_otp
 from resume.models import Resume
+from . import ratelimit
 from .forms import ContactForm
-from .utils import send_email, mailjet
+from .page_cache import SECTION_SITE, cache_anonymous_page
+from .utils import send_email
 
 
+@method_decorator(cache_anonymous_page(SECTION_SITE), name='get')
 class Home(View):
     def get(self, *args, **kwargs):
         form = ContactForm()
@@ -25,6 +26,12 @@ class Home(View):
                       context={'form': form, 'message_sent_done': 'get', 'home': 'active'})
 
     def post(self, request, *args, **kwargs):
+        if not ratelimit.hit('contact:ip', ratelimit.client_ip(request)):
+            # Same page as GET, with the "not sent" message
+            return render(self.request, template_name='index.html',
+                          context={'form': ContactForm(), 'message_sent_done': False, 'home': 'active'},
+                          status=429)
+
         form = ContactForm(request.POST)
         message_sent = False
 
@@ -69,6 +76,7 @@ class Home(View):
                       context={'form': form, 'message_sent_done': message_sent})
 
 
+@method_decorator(cache_anonymous_page(SECTION_SITE), name='get')
 class ProjectDetailedView(View):
     def get(self, request, *args, **kwargs):
         project_name = self.kwargs.get('project_name', None)
@@ -81,6 +89,7 @@ class ProjectDetailedView(View):
         return render(request, template_name=template_name, context={'project_name': project_name})
         
 
+@method_decorator(cache_anonymous_page(SECTION_SITE), name='get')
 class AboutView(View):
     def get(self, *args, **kwargs):
         return render(self.request, template_name='about.html', context={'about': 'active'})
@@ -93,6 +102,7 @@ class TAndCView(View):
     def get(self, *args, **kwargs):
         return render(self.request, template_name='t_and_c.html', )
 
+@method_decorator(cache_anonymous_page(SECTION_SITE), name='get')
 class ProjectsView(View):
     def get(self, *args, **kwargs):
         return render(self.request, template_name='projects.html', context={'project': 'active'})
@@ -121,21 +131,23 @@ class GetOTPView(JsonRequestResponseMixin, AjaxResponseMixin, View):
 
     def post_ajax(self, request, *args, **kwargs):
         email = self.request.POST.get('email').lower()
-        email_status_obj = EmailsOtpRecord.objects.filter(email=email, date=datetime.today()).first()
         status = None
         message = None
         otp = None
         status_code = None
         subject = 'One Time Password for Contacting on arpansahu.space'
 
-        if email_status_obj and email_status_obj.count >= 5:
-            status_code = 400
+        # Rejected before any database work
+        if not ratelimit.hit('otp:ip', ratelimit.client_ip(request)):
+            status_code = 429
+            status = 'Failed'
+            message = 'Too many OTP requests, please try again later'
+        elif not ratelimit.hit('otp:email', email):
+            status_code = 429
             status = 'Failed'
             message = 'Same Email address cannot generate more than 5 otp in a day'
         else:
-            key = base64.b32encode((email + settings.SECRET_KEY).encode())  # Key is generated
-            otp_obj = pyotp.TOTP(key, interval=settings.OTP_EXPIRY_TIME)
-            otp = otp_obj.now()
+            otp, step = otp_service.issue_with_step(email)
             text = """\
                         Hi message from {0},
                         How are you?<br>
@@ -153,44 +165,24 @@ class GetOTPView(JsonRequestResponseMixin, AjaxResponseMixin, View):
                         </html>
                         """.format(email, subject, otp)
 
-            data = {
-                'Messages': [
-                    {
-                        "From": {
-                            "Email": settings.MAIL_JET_EMAIL_ADDRESS,
-                            "Name": "arpansahu.space"
-                        },
-                        "To": [
-                            {
-                                "Email": email,
-                                "Name": f"{email}"
-                            }
-                        ],
-                        "Subject": subject,
-                        "TextPart": text,
-                        "HTMLPart": html,
-                        "CustomID": f"{email}"
-                    }
-                ]
-            }
-
-            try:
-                result = mailjet.send.create(data=data)
-                if result.status_code == 200:
-                    status_code = 200
-                    status = 'Success'
-                    message = 'OTP Sent to your email Successful'
-
-                    if email_status_obj:
-                        email_status_obj.count += 1
-                        email_status_obj.save()
-                    else:
-                        email_status_obj = EmailsOtpRecord(email=email).save()
-
-            except Exception as e:
-                tb = traceback.format_exc()
-                print(tb)
-                raise e
+            # Queued for the outbox; the same OTP requested twice in its window is only
+            # sent once, while a later window reusing the same digits is sent again
+            queued, _ = send_email(
+                to_email=email,
+                to_name=email,
+                subject=subject,
+                text_part=text,
+                html_part=html,
+                custom_id=email,
+                idempotency_key=f'otp:{email}:{step}:{otp}',
+                # A code delivered after it expired is useless; don't retry past that
+                expires_in=settings.OTP_EXPIRY_TIME,
+            )
+            if queued:
+                status_code = 200
+                status = 'Success'
+                message = 'OTP Sent to your email Successful'
+                record_otp(email)
 
         return self.render_json_response({'status': status, 'message': message}, status=status_code)
 
@@ -202,6 +194,11 @@ class ContactView(View):
                       context={'form': form, 'message_sent_done': 'get', 'contact': 'active'})
 
     def post(self, request, *args, **kwargs):
+        if not ratelimit.hit('contact:ip', ratelimit.client_ip(request)):
+            return render(self.request, template_name='contact.html',
+                          context={'form': ContactForm(), 'message_sent_done': False, 'contact': 'active'},
+                          status=429)
+
         form = ContactForm(request.POST)
         message_sent = False
         if form.is_valid():
@@ -212,10 +209,7 @@ class ContactView(View):
             message_form = request.POST.get('message', None)
             otp = request.POST.get('otp', None)
 
-            key = base64.b32encode((email + settings.SECRET_KEY).encode())
-            otp_obj = pyotp.TOTP(key, interval=settings.OTP_EXPIRY_TIME)
-
-            if otp_obj.verify(otp):
+            if otp_service.verify(email, otp):
                 text = """\
                 Hi message from {0},
                 How are you?<br>
@@ -234,35 +228,14 @@ class ContactView(View):
                 </html>
                 """.format(name, subject, message_form, contact, email)
 
-                data = {
-                    'Messages': [
-                        {
-                            "From": {
-                                "Email": settings.MAIL_JET_EMAIL_ADDRESS,
-                                "Name": "arpansahu.space"
-                            },
-                            "To": [
-                                {
-                                    "Email": settings.MY_EMAIL_ADDRESS,
-                                    "Name": "Arpan Sahu"
-                                }
-                            ],
-                            "Subject": f'{name} Contacted you on arpansahu.space',
-                            "TextPart": text,
-                            "HTMLPart": html,
-                            "CustomID": f"{email}"
-                        }
-                    ]
-                }
-
-                try:
-                    result = mailjet.send.create(data=data)
-                    if result.status_code == 200:
-                        message_sent = True
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    print(tb)
-                    raise e
+                message_sent, _ = send_email(
+                    to_email=settings.MY_EMAIL_ADDRESS,
+                    to_name="Arpan Sahu",
+                    subject=f'{name} Contacted you on arpansahu.space',
+                    text_part=text,
+                    html_part=html,
+                    custom_id=email,
+                )
 
         form = ContactForm()
         return render(self.request, template_name='contact.html',
@@ -9,10 +9,6 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'post_count', 'created_at']
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name', 'description']
-    
-    def post_count(self, obj):
-        return obj.posts.count()
-    post_count.short_description = 'Posts'
 
 
 @admin.register(Tag)
@@ -20,10 +16,6 @@ class TagAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'post_count']
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name']
-    
-    def post_count(self, obj):
-        return obj.posts.count()
-    post_count.short_description = 'Posts'
 
 
 @admin.register(BlogPost)
@@ -0,0 +1,78 @@
+"""
+Bulk "liked by me" lookups for posts and comments.
+
+``get_liked_ids`` answers "which of these ids has ``user`` liked?" with one
+query per model, instead of one ``is_liked_by`` query per object. The
+``liked_*`` helpers memoise answers on the request, so views and the
+``liked_ids``/``is_liked`` template tags can ask repeatedly (or for
+overlapping pages of objects) and only unseen ids hit the database.
+"""
+from comments.models import Comment, CommentLike
+
+from .models import BlogPost, PostLike
+
+# kind -> (like model, foreign key column)
+LIKE_MODELS = {
+    'post': (PostLike, 'post_id'),
+    'comment': (CommentLike, 'comment_id'),
+}
+KIND_FOR_MODEL = {BlogPost: 'post', Comment: 'comment'}
+
+REQUEST_CACHE_ATTR = '_liked_by_me'
+
+
+def kind_for(obj):
+    """Return the like kind ('post' or 'comment') for a model instance."""
+    try:
+        return KIND_FOR_MODEL[type(obj)]
+    except KeyError:
+        raise ValueError(f'{type(obj).__name__} instances cannot be liked')
+
+
+def _as_ids(items):
+    return {item if isinstance(item, int) else item.pk for item in items}
+
+
+def get_liked_ids(user, kind, ids):
+    """Return the subset of ``ids`` that ``user`` has liked (one query)."""
+    ids = _as_ids(ids)
+    if not ids or user is None or not user.is_authenticated:
+        return set()
+    model, column = LIKE_MODELS[kind]
+    return set(
+        model.objects.filter(user=user, **{f'{column}__in': ids}).values_list(column, flat=True)
+    )
+
+
+def _request_cache(request, kind):
+    cache = getattr(request, REQUEST_CACHE_ATTR, None)
+    if cache is None:
+        cache = {kind: {} for kind in LIKE_MODELS}
+        setattr(request, REQUEST_CACHE_ATTR, cache)
+    return cache[kind]
+
+
+def remember_liked(request, kind, states):
+    """Seed the request cache with known ``{id: liked}`` states (e.g. annotations)."""
+    _request_cache(request, kind).update(states)
+
+
+def liked_ids_for_request(request, kind, items):
+    """
+    Return the ids among ``items`` (objects or ids) liked by ``request.user``.
+
+    Ids already resolved during this request are served from memory; the rest
+    are fetched together in a single query.
+    """
+    ids = _as_ids(items)
+    known = _request_cache(request, kind)
+    missing = ids.difference(known)
+    if missing:
+        liked = get_liked_ids(request.user, kind, missing)
+        known.update((pk, pk in liked) for pk in missing)
+    return {pk for pk in ids if known[pk]}
+
+
+def is_liked_for_request(request, obj):
+    """Whether ``request.user`` liked ``obj`` (memoised per request)."""
+    return obj.pk in liked_ids_for_request(request, kind_for(obj), [obj.pk])
@@ -0,0 +1,22 @@
+"""
+Management command to recompute word count, reading time and plain excerpt
+for every blog post.
+
+Usage:
+    python manage.py backfill_text_stats
+    python manage.py backfill_text_stats --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost, backfill_text_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored reading time, word count and plain excerpt for all blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Posts loaded and updated per chunk')
+
+    def handle(self, *args, **options):
+        updated = backfill_text_stats(BlogPost, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated text stats for {updated} post(s)'))
@@ -0,0 +1,44 @@
+"""
+Management command to flush buffered blog post view counts to the database.
+
+Usage:
+    python manage.py flush_post_views
+    python manage.py flush_post_views --loop --interval 60
+    python manage.py flush_post_views --all   # Sweep every post, not just the dirty log
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+from blog.view_counter import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered blog post view counts from the cache to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep flushing instead of exiting after one flush'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Seconds to wait between flushes with --loop'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Check every post instead of only those with views logged since the last flush'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            post_ids = BlogPost.objects.values_list('id', flat=True).iterator() if options['all'] else None
+            posts_updated, views_flushed = flush_views(post_ids)
+            if posts_updated or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Flushed {views_flushed} view(s) across {posts_updated} post(s)'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,77 @@
+"""
+Management command to build responsive image variants.
+
+By default covers uploaded media: blog featured images and CKEditor
+uploads. With ``--static`` it covers the portfolio images under
+``static/images`` instead, writing the variants next to the sources so
+``collectstatic`` ships them; run it when building the image, not at pod
+start. Images whose variants are up to date are skipped.
+
+Usage:
+    python manage.py generate_image_variants
+    python manage.py generate_image_variants --force
+    python manage.py generate_image_variants --static
+"""
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.management.base import BaseCommand
+
+from arpansahu_dot_me.images import generate_variants, is_variant_source
+from blog.models import BlogPost
+
+STATIC_IMAGES_PATH = 'images'
+
+
+def walk(storage, path):
+    """Yield every file name below ``path`` in ``storage``."""
+    try:
+        directories, files = storage.listdir(path)
+    except (FileNotFoundError, OSError):
+        return
+    for name in files:
+        yield os.path.join(path, name)
+    for directory in directories:
+        yield from walk(storage, os.path.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = 'Build resized WebP/AVIF variants of uploaded or static images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild variants even if they are up to date'
+        )
+        parser.add_argument(
+            '--static', action='store_true',
+            help=f'Build variants of static/{STATIC_IMAGES_PATH} in the source tree (build time)'
+        )
+
+    def handle(self, *args, **options):
+        if options['static']:
+            # The source directory, not STATIC_ROOT: collectstatic copies the
+            # variants along with the originals, and the tag reads them there.
+            storage = FileSystemStorage(location=settings.STATICFILES_DIRS[0])
+            names = set(walk(storage, STATIC_IMAGES_PATH))
+            alias = None
+        else:
+            storage = storages['default']
+            names = set(
+                BlogPost.objects.exclude(featured_image='').exclude(featured_image__isnull=True)
+                .values_list('featured_image', flat=True)
+            )
+            names.update(walk(storage, settings.CKEDITOR_UPLOAD_PATH.rstrip('/')))
+            alias = 'default'
+
+        built = failed = 0
+        thumbnails = {name for name in names if os.path.splitext(name)[0].endswith('_thumb')}  # CKEditor's
+        for name in sorted(name for name in names - thumbnails if is_variant_source(name)):
+            try:
+                generate_variants(storage, name, alias=alias, force=options['force'])
+                built += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{name}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Processed {built} image(s), {failed} failed'))
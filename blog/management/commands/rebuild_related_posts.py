@@ -0,0 +1,36 @@
+"""
+Management command to recompute the related-posts graph for every post.
+
+Usage:
+    python manage.py rebuild_related_posts
+    python manage.py rebuild_related_posts --no-tfidf   # Tags/category only
+    python manage.py rebuild_related_posts --missing    # Only posts never computed (run on deploy)
+"""
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+from blog.related import Corpus, recompute_related
+
+
+class Command(BaseCommand):
+    help = 'Recompute precomputed related posts for all blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-tfidf', action='store_true', help='Skip TF-IDF content similarity')
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Only compute published posts that have no related posts stored yet',
+        )
+
+    def handle(self, *args, **options):
+        post_ids = None
+        if options['missing']:
+            post_ids = list(BlogPost.objects.filter(
+                status='published', author__is_active=True, related_links__isnull=True
+            ).values_list('id', flat=True))
+            if not post_ids:
+                self.stdout.write('No posts without related posts')
+                return
+        corpus = Corpus(use_tfidf=not options['no_tfidf'])
+        rows = recompute_related(post_ids, corpus=corpus)
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} related-post link(s)'))
@@ -0,0 +1,22 @@
+"""
+Management command to rebuild the blog full-text search index.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand
+from blog.search import rebuild_index, uses_postgres_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search documents (and the tsvector/inverted index) for all blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Posts loaded per chunk')
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        backend = 'PostgreSQL tsvector' if uses_postgres_search() else 'Python inverted index'
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} post(s) using {backend}'))
@@ -0,0 +1,32 @@
+"""
+Management command to recompute denormalized like/reply/comment counters
+and the published post counts of categories and tags.
+
+Usage:
+    python manage.py reconcile_counters
+"""
+
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost, PostLike
+from blog.taxonomy import recount_taxonomy
+from comments.counters import count_subquery, recount, recount_comment_count, recount_comment_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute like, reply, comment and taxonomy counters from the source rows'
+
+    def handle(self, *args, **kwargs):
+        drifted = {
+            'BlogPost.like_count': recount(
+                BlogPost.objects.all(), 'like_count', count_subquery(PostLike, 'post')
+            ),
+            'BlogPost.comment_count': recount_comment_count(BlogPost),
+        }
+        for field, rows in recount_comment_counters().items():
+            drifted[f'Comment.{field}'] = rows
+        for model, rows in recount_taxonomy().items():
+            drifted[f'{model.title()}.post_count'] = rows
+
+        for field, rows in drifted.items():
+            self.stdout.write(f'  {field}: {rows} row(s) corrected')
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters ({sum(drifted.values())} fix(es))'))
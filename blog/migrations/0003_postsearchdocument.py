@@ -0,0 +1,79 @@
+# Generated by Django 4.2.28 on 2026-10-18 15:59
+
+import html
+import re
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.html import strip_tags
+
+
+def create_gin_index(apps, schema_editor):
+    """GIN index on the tsvector column; PostgreSQL only."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS blog_postsearchdoc_vector_gin '
+        'ON blog_postsearchdocument USING GIN (search_vector)'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS blog_postsearchdoc_vector_gin')
+
+
+def _html_to_text(value):
+    # Frozen copy of blog.search.html_to_text as of this migration
+    if not value:
+        return ''
+    return re.sub(r'\s+', ' ', html.unescape(strip_tags(value))).strip()
+
+
+def backfill_documents(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    PostSearchDocument = apps.get_model('blog', 'PostSearchDocument')
+    PostSearchDocument.objects.bulk_create(
+        [
+            PostSearchDocument(
+                post_id=post.pk,
+                title=post.title,
+                excerpt=_html_to_text(post.excerpt),
+                body=_html_to_text(post.content),
+            )
+            for post in BlogPost.objects.only('id', 'title', 'excerpt', 'content').iterator()
+        ],
+        batch_size=200,
+    )
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE blog_postsearchdocument SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'C')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.blogpost')),
+                ('title', models.CharField(max_length=200)),
+                ('excerpt', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
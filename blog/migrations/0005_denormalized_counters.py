@@ -0,0 +1,47 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    PostLike = apps.get_model('blog', 'PostLike')
+    Comment = apps.get_model('comments', 'Comment')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    # The columns were just added as 0, so every row is written once
+    likes = PostLike.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('pk'))
+    BlogPost.objects.update(like_count=Coalesce(Subquery(likes.values('total')), 0))
+
+    content_type = ContentType.objects.filter(app_label='blog', model='blogpost').first()
+    if content_type is None:
+        return  # Fresh database, nothing has been commented on yet
+    approved = Comment.objects.filter(
+        content_type=content_type, object_id=OuterRef('pk'), is_approved=True
+    ).order_by().values('object_id').annotate(total=Count('pk')).values('total')
+    BlogPost.objects.update(comment_count=Coalesce(Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_relatedpost'),
+        ('comments', '0004_denormalized_counters'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved comments'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:13
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_published_date(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    BlogPost.objects.filter(status='published', published_date__isnull=True).update(
+        published_date=F('created_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_published_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-published_date', '-id'], name='blog_blogpo_status_b5e939_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:14
+
+import html
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def _html_to_text(value):
+    # Frozen copy of blog.search.html_to_text as of this migration
+    if not value:
+        return ''
+    return re.sub(r'\s+', ' ', html.unescape(strip_tags(value))).strip()
+
+
+def _text_stats(content, excerpt):
+    # Frozen copy of blog.models.compute_text_stats as of this migration
+    body = _html_to_text(content)
+    word_count = len(body.split())
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / 200)),
+        'plain_excerpt': Truncator(_html_to_text(excerpt) or body).chars(300),
+    }
+
+
+def backfill(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    fields = ['word_count', 'reading_time', 'plain_excerpt']
+    batch = []
+    posts = BlogPost.objects.only('id', 'content', 'excerpt').order_by('pk')
+    for post in posts.iterator(chunk_size=200):
+        for field, value in _text_stats(post.content, post.excerpt).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) >= 200:
+            BlogPost.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        BlogPost.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_keyset_pagination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='plain_excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(model, fk_field, **filters):
+    # Correlated COUNT of model rows pointing at the outer row
+    rows = model.objects.filter(**{fk_field: OuterRef('pk')}, **filters)
+    return Coalesce(
+        Subquery(rows.order_by().values(fk_field).annotate(total=Count('pk')).values('total')),
+        0,
+    )
+
+
+def backfill_taxonomy_counts(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    Category = apps.get_model('blog', 'Category')
+    Tag = apps.get_model('blog', 'Tag')
+
+    # The columns were just added as 0, so every row is written once
+    Category.objects.update(post_count=_count(
+        BlogPost, 'category', status='published', author__is_active=True
+    ))
+    Tag.objects.update(post_count=_count(
+        BlogPost.tags.through, 'tag', blogpost__status='published', blogpost__author__is_active=True
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_text_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='published posts'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='published posts'),
+        ),
+        migrations.RunPython(backfill_taxonomy_counts, migrations.RunPython.noop),
+    ]
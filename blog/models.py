@@ -1,9 +1,66 @@
 from django.db import models
-from django.utils.text import slugify
+from django.utils import timezone
+from django.utils.text import Truncator, slugify
 from django.urls import reverse
 from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.postgres.search import SearchVectorField
 from account.models import Account
 from ckeditor_uploader.fields import RichTextUploadingField
+from .search import html_to_text
+
+WORDS_PER_MINUTE = 200  # Average reading speed
+PLAIN_EXCERPT_LENGTH = 300
+
+
+def compute_text_stats(content, excerpt):
+    """
+    Word count, reading time and plain-text excerpt for a post's HTML.
+    
+    Used by ``BlogPost.save`` and ``backfill_text_stats``.
+    """
+    body = html_to_text(content)
+    word_count = len(body.split())
+    plain_excerpt = html_to_text(excerpt) or body
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)),
+        'plain_excerpt': Truncator(plain_excerpt).chars(PLAIN_EXCERPT_LENGTH),
+    }
+
+
+def backfill_text_stats(model, batch_size=200):
+    """
+    Recompute stored text stats for every post of ``model``, in chunks.
+    
+    Returns:
+        int: number of posts updated
+    """
+    fields = list(compute_text_stats('', ''))
+    updated = 0
+    batch = []
+    posts = model.objects.only('id', 'content', 'excerpt').order_by('pk')
+    for post in posts.iterator(chunk_size=batch_size):
+        for field, value in compute_text_stats(post.content, post.excerpt).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, fields)
+            updated += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, fields)
+        updated += len(batch)
+    return updated
+
+
+def _without_counters(instance, update_fields):
+    """Full saves of loaded rows must not write back stale counter values"""
+    if update_fields is not None or instance._state.adding:
+        return update_fields
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.COUNTER_FIELDS
+    ]
 
 
 class Category(models.Model):
@@ -12,6 +69,10 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Published posts by active authors, maintained by blog.taxonomy
+    post_count = models.PositiveIntegerField('published posts', default=0, editable=False)
+    
+    COUNTER_FIELDS = ('post_count',)
     
     class Meta:
         verbose_name_plural = "Categories"
@@ -23,6 +84,7 @@ class Category(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        kwargs['update_fields'] = _without_counters(self, kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
 
@@ -30,6 +92,10 @@ class Tag(models.Model):
     """Blog post tags"""
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True, blank=True)
+    # Published posts by active authors, maintained by blog.taxonomy
+    post_count = models.PositiveIntegerField('published posts', default=0, editable=False)
+    
+    COUNTER_FIELDS = ('post_count',)
     
     class Meta:
         ordering = ['name']
@@ -40,9 +106,26 @@ class Tag(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        kwargs['update_fields'] = _without_counters(self, kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
 
+class BlogPostQuerySet(models.QuerySet):
+    """Query helpers for BlogPost"""
+    
+    # Columns rendered by post cards (listings, profile, featured and related posts)
+    CARD_FIELDS = (
+        'id', 'title', 'slug', 'plain_excerpt', 'featured_image', 'is_featured', 'status',
+        'published_date', 'created_at', 'reading_time', 'views', 'like_count', 'comment_count',
+        'author__id', 'author__username', 'author__first_name', 'author__last_name',
+        'category__id', 'category__name', 'category__slug',
+    )
+    
+    def cards(self):
+        """Card projection: card columns plus author/category names, never the body"""
+        return self.select_related('author', 'category').only(*self.CARD_FIELDS)
+
+
 class BlogPost(models.Model):
     """Main blog post model"""
     STATUS_CHOICES = [
@@ -78,6 +161,18 @@ class BlogPost(models.Model):
     
     # Stats
     views = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False, help_text="Approved comments")
+    
+    # Derived from content on save so listings never load the content column
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, help_text="Minutes")
+    plain_excerpt = models.CharField(max_length=PLAIN_EXCERPT_LENGTH, blank=True, editable=False)
+    
+    # Maintained atomically by signals (see comments.counters) and, for views, by
+    # the blog.view_counter flush; skipped by full saves
+    COUNTER_FIELDS = ('views', 'like_count', 'comment_count')
+    TEXT_STATS_FIELDS = ('word_count', 'reading_time', 'plain_excerpt')
     
     # Settings
     enable_comments = models.BooleanField(default=True)
@@ -87,12 +182,16 @@ class BlogPost(models.Model):
     # Generic relation to comments
     comments = GenericRelation('comments.Comment', related_query_name='blog_posts')
     
+    objects = BlogPostQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-published_date', '-created_at']
         indexes = [
             models.Index(fields=['-published_date']),
             models.Index(fields=['slug']),
             models.Index(fields=['status']),
+            # Keyset pagination of published listings (blog.pagination)
+            models.Index(fields=['status', '-published_date', '-id']),
         ]
     
     def __str__(self):
@@ -101,25 +200,47 @@ class BlogPost(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        # Listings paginate on published_date, so published posts always carry one
+        if self.status == 'published' and self.published_date is None:
+            self.published_date = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'published_date'}
+        if kwargs.get('update_fields') is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'content', 'excerpt'}.intersection(update_fields):
+            self.refresh_text_stats()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.TEXT_STATS_FIELDS)
         super().save(*args, **kwargs)
     
+    def refresh_text_stats(self):
+        """Recompute word count, reading time and plain excerpt from the HTML"""
+        for field, value in compute_text_stats(self.content, self.excerpt).items():
+            setattr(self, field, value)
+    
     def get_absolute_url(self):
-        return reverse('blog:post_detail', kwargs={'slug': self.slug})
+        return reverse('blog:blog_detail', kwargs={'slug': self.slug})
     
     def get_reading_time(self):
-        """Calculate estimated reading time in minutes"""
-        word_count = len(self.content.split())
-        reading_time = word_count / 200  # Average reading speed
-        return max(1, round(reading_time))
+        """Estimated reading time in minutes (stored on save)"""
+        return self.reading_time
     
     def increment_views(self):
-        """Increment view count"""
-        self.views += 1
-        self.save(update_fields=['views'])
+        """Record a view in the buffered counter (flushed to the DB in bulk)"""
+        from .view_counter import record_view
+        pending = record_view(self.pk)
+        self.views += pending
     
     def get_like_count(self):
         """Get total likes for this post"""
-        return self.likes.count()
+        return self.like_count
     
     def is_liked_by(self, user):
         """Check if user has liked this post"""
@@ -141,3 +262,41 @@ class PostLike(models.Model):
     def __str__(self):
         return f'{self.user.username} likes {self.post.title}'
 
+
+
+class PostSearchDocument(models.Model):
+    """HTML-stripped search text for a post, maintained by blog.signals"""
+    post = models.OneToOneField(
+        BlogPost,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    title = models.CharField(max_length=200)
+    excerpt = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    
+    # Weighted tsvector, only populated on PostgreSQL (GIN index added in migration)
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f'Search document for {self.title}'
+
+
+class RelatedPost(models.Model):
+    """Precomputed related-post neighbour, maintained by blog.related"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        ordering = ['post', 'rank']
+        unique_together = ['post', 'related']
+        indexes = [
+            models.Index(fields=['post', 'rank']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} -> {self.related_id} ({self.score:.2f})'
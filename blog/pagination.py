@@ -0,0 +1,181 @@
+"""
+Keyset (cursor) pagination for post listings.
+
+``Paginator`` runs a ``COUNT(*)`` and an ``OFFSET`` per page, so deep pages
+get slower linearly. ``KeysetPaginator`` instead seeks from the last row of
+the previous page on ``(published_date, id)``, which the
+``(status, -published_date, -id)`` index serves directly. Ties on
+``published_date`` are broken by ``id``, matching the model's
+``-published_date, -created_at`` ordering since ids grow with creation time.
+
+Cursors are opaque URL-safe tokens carrying the boundary row and the page
+number, so "Page N" still renders. There is no jump to an arbitrary page,
+since that needs an ``OFFSET``: ``?page=last`` seeks from the oldest end
+instead (pages walked back from it are aligned to the end, so the first
+one may be short), and any other ``?page=N`` serves the first page. Totals
+are an approximate ``COUNT`` cached for ``COUNT_TIMEOUT`` seconds.
+"""
+import base64
+import hashlib
+import json
+import math
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+POSTS_PER_PAGE = 9
+COUNT_TIMEOUT = 60 * 5
+CURSOR_PARAM = 'cursor'
+PAGE_PARAM = 'page'
+LAST_PAGE = 'last'
+
+AFTER = 'a'
+BEFORE = 'b'
+
+
+def encode_cursor(post, direction, number):
+    """Encode the boundary ``post`` of a page into an opaque cursor token."""
+    payload = [direction, post.published_date.isoformat(), post.pk, number]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, published_date, pk, number), or None if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, published, pk, number = json.loads(raw)
+        if direction not in (AFTER, BEFORE):
+            return None
+        return direction, datetime.fromisoformat(published), int(pk), max(1, int(number))
+    except (TypeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """A page of posts, API-compatible with ``django.core.paginator.Page``."""
+
+    def __init__(self, object_list, number, has_previous, has_next, paginator):
+        self.object_list = object_list
+        self.number = number
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.paginator = paginator
+
+    def __repr__(self):
+        return f'<KeysetPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], AFTER, self.number + 1)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], BEFORE, self.number - 1)
+        return None
+
+
+class KeysetPaginator:
+    """
+    Seek-based paginator over a ``BlogPost`` queryset.
+
+    Args:
+        queryset: posts to paginate (any ordering is replaced)
+        per_page: posts per page
+        count_key: cache key suffix for the approximate total; without it
+            ``count``/``num_pages`` run an uncached ``COUNT``
+    """
+
+    def __init__(self, queryset, per_page=POSTS_PER_PAGE, count_key=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        """Approximate number of posts (cached)."""
+        if self.count_key is None:
+            return self.queryset.count()
+        key = f'blog:count:{hashlib.md5(self.count_key.encode()).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, timeout=COUNT_TIMEOUT)
+        return count
+
+    @property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def _ordered(self, descending=True):
+        if descending:
+            return self.queryset.order_by('-published_date', '-pk')
+        return self.queryset.order_by('published_date', 'pk')
+
+    def first_page(self):
+        rows = list(self._ordered()[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], 1, False, len(rows) > self.per_page, self)
+
+    def page_after(self, published_date, pk, number):
+        rows = list(self._ordered().filter(
+            Q(published_date__lt=published_date) | Q(published_date=published_date, pk__lt=pk)
+        )[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], number, number > 1, len(rows) > self.per_page, self)
+
+    def page_before(self, published_date, pk, number):
+        rows = list(self._ordered(descending=False).filter(
+            Q(published_date__gt=published_date) | Q(published_date=published_date, pk__gt=pk)
+        )[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        if not has_previous:
+            number = 1  # Reached the start; renumber in case posts were added
+        return KeysetPage(rows, number, has_previous, True, self)
+
+    def last_page(self):
+        """The oldest posts, by seeking from the other end of the index."""
+        rows = list(self._ordered(descending=False)[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(rows, self.num_pages if has_previous else 1, has_previous, False, self)
+
+    def get_page(self, params):
+        """Return the page requested by ``params`` (e.g. ``request.GET``)."""
+        cursor = decode_cursor(params.get(CURSOR_PARAM) or '')
+        if cursor is not None:
+            direction, published_date, pk, number = cursor
+            if direction == AFTER:
+                return self.page_after(published_date, pk, number)
+            return self.page_before(published_date, pk, number)
+        if params.get(PAGE_PARAM) == LAST_PAGE:
+            return self.last_page()
+        return self.first_page()
@@ -0,0 +1,206 @@
+"""
+Precomputed related-posts graph.
+
+For every published post the top-N most similar published posts are stored
+in ``RelatedPost`` rows so ``blog_detail`` can read them with one indexed
+lookup. Similarity is a weighted sum of:
+
+* shared tags (``TAG_WEIGHT`` each)
+* same category (``CATEGORY_WEIGHT``)
+* TF-IDF cosine similarity of the HTML-stripped body (``TFIDF_WEIGHT``),
+  using the text already kept in ``PostSearchDocument``
+
+``blog.signals`` recomputes the neighbourhood of a post after the
+transaction that changed it, its tags or its category commits;
+``rebuild_related_posts`` recomputes all (``--missing`` at deploy time
+fills in posts that have never been computed).
+"""
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .search import tokenize
+
+RELATED_POSTS_COUNT = getattr(settings, 'BLOG_RELATED_POSTS_COUNT', 5)
+USE_TFIDF = getattr(settings, 'BLOG_RELATED_POSTS_USE_TFIDF', True)
+
+TAG_WEIGHT = 1.0
+CATEGORY_WEIGHT = 1.0
+TFIDF_WEIGHT = 2.0
+MAX_TERMS_PER_POST = 50  # Keep the sparse vectors small
+
+STOP_WORDS = frozenset("""
+a about above after again all also an and any are as at be because been
+before being below between both but by can could did do does doing down
+during each few for from further had has have having here how if in into
+is it its itself just more most no nor not now of off on once only or other
+our out over own same should so some such than that the their them then
+there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your
+""".split())
+
+
+class Corpus:
+    """Tags, categories and TF-IDF vectors for all published posts."""
+
+    def __init__(self, use_tfidf=USE_TFIDF):
+        from .models import BlogPost
+
+        published = BlogPost.objects.filter(status='published', author__is_active=True)
+        self.categories = dict(published.values_list('id', 'category_id'))
+        self.tags = defaultdict(set)
+        for post_id, tag_id in BlogPost.tags.through.objects.filter(
+            blogpost_id__in=self.categories
+        ).values_list('blogpost_id', 'tag_id'):
+            self.tags[post_id].add(tag_id)
+
+        self.vectors = self._build_vectors(published) if use_tfidf else {}
+
+    def _build_vectors(self, published):
+        from .models import PostSearchDocument
+
+        term_counts = {}
+        document_frequency = Counter()
+        for post_id, body in PostSearchDocument.objects.filter(
+            post__in=published
+        ).values_list('post_id', 'body').iterator():
+            counts = Counter(
+                term for term in tokenize(body)
+                if len(term) > 2 and term not in STOP_WORDS and not term.isdigit()
+            )
+            term_counts[post_id] = counts
+            document_frequency.update(counts.keys())
+
+        # Smoothed IDF so small corpora still score shared terms
+        total = len(term_counts)
+        vectors = {}
+        for post_id, counts in term_counts.items():
+            weights = {
+                term: (1 + math.log(count)) * (1 + math.log((1 + total) / (1 + document_frequency[term])))
+                for term, count in counts.items()
+            }
+            top_terms = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:MAX_TERMS_PER_POST]
+            norm = math.sqrt(sum(weight * weight for _, weight in top_terms))
+            if norm:
+                vectors[post_id] = {term: weight / norm for term, weight in top_terms}
+        return vectors
+
+    def similarity(self, post_id, other_id):
+        score = TAG_WEIGHT * len(self.tags[post_id] & self.tags[other_id])
+        category_id = self.categories.get(post_id)
+        if category_id is not None and category_id == self.categories.get(other_id):
+            score += CATEGORY_WEIGHT
+        vector = self.vectors.get(post_id)
+        other_vector = self.vectors.get(other_id)
+        if vector and other_vector:
+            if len(other_vector) < len(vector):
+                vector, other_vector = other_vector, vector
+            score += TFIDF_WEIGHT * sum(
+                weight * other_vector.get(term, 0.0) for term, weight in vector.items()
+            )
+        return score
+
+    def neighbours(self, post_id, limit=RELATED_POSTS_COUNT):
+        """Return [(other_id, score)] for the ``limit`` most similar posts."""
+        if post_id not in self.categories:
+            return []
+        scored = [
+            (other_id, self.similarity(post_id, other_id))
+            for other_id in self.categories
+            if other_id != post_id
+        ]
+        scored = [item for item in scored if item[1] > 0]
+        # Highest score first; newer posts (higher ids) win ties
+        scored.sort(key=lambda item: (item[1], item[0]), reverse=True)
+        return scored[:limit]
+
+
+def recompute_related(post_ids=None, corpus=None):
+    """
+    Recompute and store neighbours for ``post_ids`` (all posts when None).
+
+    Returns:
+        int: number of RelatedPost rows written
+    """
+    from .models import BlogPost, RelatedPost
+
+    corpus = corpus or Corpus()
+    if post_ids is None:
+        post_ids = list(BlogPost.objects.values_list('id', flat=True))
+    post_ids = set(post_ids)
+
+    rows = [
+        RelatedPost(post_id=post_id, related_id=other_id, score=score, rank=rank)
+        for post_id in post_ids
+        for rank, (other_id, score) in enumerate(corpus.neighbours(post_id), start=1)
+    ]
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def affected_post_ids(post_ids, corpus=None):
+    """
+    Posts whose stored neighbours are likely to change when ``post_ids`` change.
+
+    That is the posts themselves, the posts currently linking to them and
+    their own top neighbours (similarity is symmetric, so those are the
+    posts most likely to rank them now). Posts further away pick up the
+    change on the next ``rebuild_related_posts``.
+    """
+    from .models import RelatedPost
+
+    corpus = corpus or Corpus()
+    affected = set(post_ids)
+    affected.update(
+        RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', flat=True)
+    )
+    for post_id in post_ids:
+        affected.update(other_id for other_id, _ in corpus.neighbours(post_id))
+    return affected
+
+
+def refresh_related_for(post_ids):
+    """Recompute the neighbourhood around ``post_ids`` with one corpus."""
+    corpus = Corpus()
+    return recompute_related(affected_post_ids(post_ids, corpus), corpus=corpus)
+
+
+_pending = threading.local()
+
+
+def _refresh_pending():
+    post_ids = getattr(_pending, 'post_ids', None)
+    if post_ids:
+        _pending.post_ids = set()
+        refresh_related_for(post_ids)
+
+
+def schedule_refresh(post_ids):
+    """
+    Refresh the neighbourhood of ``post_ids`` once the transaction commits.
+
+    Every change within one transaction (a post save plus its tag changes,
+    say) is folded into a single recompute.
+    """
+    pending = getattr(_pending, 'post_ids', None)
+    if pending is None:
+        pending = _pending.post_ids = set()
+    pending.update(post_ids)
+    # The first callback to run drains the set; the others find it empty
+    transaction.on_commit(_refresh_pending)
+
+
+def get_related_posts(post, limit=RELATED_POSTS_COUNT):
+    """Return the stored related posts for ``post`` in rank order (one query)."""
+    from .models import BlogPost
+
+    return BlogPost.objects.filter(
+        related_to__post=post,
+        status='published',
+        author__is_active=True,
+    ).cards().order_by('related_to__rank')[:limit]
@@ -0,0 +1,265 @@
+"""
+Full-text search for blog posts.
+
+Each post has a ``PostSearchDocument`` holding its HTML-stripped title,
+excerpt and body, kept up to date from ``blog.signals``. On PostgreSQL the
+document also stores a weighted ``tsvector`` (GIN indexed) and searches use
+``SearchQuery``/``SearchRank``. Other databases (SQLite in development and
+tests) use a pure-Python inverted index that is stored in the cache and
+patched incrementally as posts change. Patches are read-modify-write on one
+cache entry, so they hold a short cache lock; a writer that cannot get it
+drops the index, which is then rebuilt from the documents on the next search.
+"""
+import html
+import math
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.html import strip_tags
+
+SEARCH_CONFIG = 'english'
+SEARCH_INDEX_KEY = 'blog:search:index'
+SEARCH_INDEX_LOCK_KEY = 'blog:search:index:lock'
+INDEX_LOCK_TIMEOUT = 30
+INDEX_LOCK_WAIT = 2
+
+# Relevance weight per field (title > excerpt > body), mirrors tsvector A/B/C
+FIELD_WEIGHTS = {'title': 3.0, 'excerpt': 2.0, 'body': 1.0}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def html_to_text(value):
+    """Strip tags and entities from rich-text HTML and collapse whitespace."""
+    if not value:
+        return ''
+    text = html.unescape(strip_tags(value))
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def tokenize(text):
+    """Split text into lower-cased word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def uses_postgres_search():
+    return connection.vendor == 'postgresql'
+
+
+def search_vector_expression():
+    """Weighted tsvector over the document fields (PostgreSQL only)."""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('excerpt', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('body', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Document maintenance
+# ---------------------------------------------------------------------------
+
+def build_document_fields(post):
+    return {
+        'title': post.title,
+        'excerpt': html_to_text(post.excerpt),
+        'body': html_to_text(post.content),
+    }
+
+
+def index_post(post):
+    """Create or refresh the search document for ``post``."""
+    from .models import PostSearchDocument
+
+    fields = build_document_fields(post)
+    PostSearchDocument.objects.update_or_create(post=post, defaults=fields)
+    if uses_postgres_search():
+        PostSearchDocument.objects.filter(pk=post.pk).update(
+            search_vector=search_vector_expression()
+        )
+    else:
+        _update_python_index(post.pk, fields)
+
+
+def remove_post(post_id):
+    """Drop ``post_id`` from the Python inverted index (documents cascade)."""
+    if uses_postgres_search():
+        return
+    _patch_python_index(lambda index: _remove_postings(index, post_id))
+
+
+def rebuild_index(batch_size=200):
+    """
+    Rebuild every search document from its post, in chunks.
+
+    Returns:
+        int: number of posts indexed
+    """
+    from .models import BlogPost, PostSearchDocument
+
+    indexed = 0
+    posts = BlogPost.objects.only('id', 'title', 'excerpt', 'content').order_by('pk')
+    for post in posts.iterator(chunk_size=batch_size):
+        PostSearchDocument.objects.update_or_create(
+            post=post, defaults=build_document_fields(post)
+        )
+        indexed += 1
+
+    PostSearchDocument.objects.exclude(post__in=BlogPost.objects.all()).delete()
+    if uses_postgres_search():
+        PostSearchDocument.objects.update(search_vector=search_vector_expression())
+    else:
+        with _index_lock() as locked:
+            index = _build_python_index()
+            if locked:
+                cache.set(SEARCH_INDEX_KEY, index, timeout=None)
+            else:
+                cache.delete(SEARCH_INDEX_KEY)
+    return indexed
+
+
+# ---------------------------------------------------------------------------
+# Python inverted index (non-PostgreSQL fallback)
+# ---------------------------------------------------------------------------
+
+def _score_fields(fields):
+    """Map each term to its weighted, length-dampened frequency."""
+    scores = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in tokenize(fields.get(field) or ''):
+            scores[term] += weight
+    return {term: 1 + math.log(score) for term, score in scores.items()}
+
+
+def _add_postings(index, post_id, fields):
+    term_scores = _score_fields(fields)
+    for term, score in term_scores.items():
+        index['terms'].setdefault(term, {})[post_id] = score
+    index['docs'][post_id] = list(term_scores)
+
+
+def _remove_postings(index, post_id):
+    for term in index['docs'].pop(post_id, []):
+        postings = index['terms'].get(term)
+        if postings is not None:
+            postings.pop(post_id, None)
+            if not postings:
+                del index['terms'][term]
+
+
+def _build_python_index():
+    from .models import PostSearchDocument
+
+    index = {'terms': {}, 'docs': {}}
+    documents = PostSearchDocument.objects.values('post_id', 'title', 'excerpt', 'body')
+    for document in documents.iterator():
+        _add_postings(index, document['post_id'], document)
+    return index
+
+
+@contextmanager
+def _index_lock():
+    """Hold the index lock for a read-modify-write; yields False if it stayed taken."""
+    deadline = time.monotonic() + INDEX_LOCK_WAIT
+    while not cache.add(SEARCH_INDEX_LOCK_KEY, 1, timeout=INDEX_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(0.01)
+    try:
+        yield True
+    finally:
+        cache.delete(SEARCH_INDEX_LOCK_KEY)
+
+
+def _get_python_index():
+    index = cache.get(SEARCH_INDEX_KEY)
+    if index is None:
+        index = _build_python_index()
+        # Never overwrite an index another process stored (and may have patched) meanwhile
+        cache.add(SEARCH_INDEX_KEY, index, timeout=None)
+    return index
+
+
+def _patch_python_index(patch):
+    with _index_lock() as locked:
+        if not locked:
+            cache.delete(SEARCH_INDEX_KEY)  # Rebuilt from the documents on the next search
+            return
+        index = cache.get(SEARCH_INDEX_KEY)
+        if index is None:
+            return  # Built lazily on the next search
+        patch(index)
+        cache.set(SEARCH_INDEX_KEY, index, timeout=None)
+
+
+def _update_python_index(post_id, fields):
+    def patch(index):
+        _remove_postings(index, post_id)
+        _add_postings(index, post_id, fields)
+    _patch_python_index(patch)
+
+
+def _python_search(query):
+    """Return {post_id: score} for posts matching every query term (prefix match)."""
+    terms = tokenize(query)
+    if not terms:
+        return {}
+
+    index = _get_python_index()
+    results = None
+    for query_term in terms:
+        matches = defaultdict(float)
+        for term, postings in index['terms'].items():
+            if term.startswith(query_term):
+                for post_id, score in postings.items():
+                    matches[post_id] += score
+        if results is None:
+            results = dict(matches)
+        else:
+            results = {
+                post_id: score + matches[post_id]
+                for post_id, score in results.items()
+                if post_id in matches
+            }
+        if not results:
+            return {}
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Query API
+# ---------------------------------------------------------------------------
+
+def search_posts(queryset, query):
+    """
+    Filter a ``BlogPost`` queryset to posts matching ``query``.
+
+    Results are annotated with ``search_rank`` and ordered by relevance,
+    then by the default publication ordering.
+    """
+    if uses_postgres_search():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(
+            search_document__search_vector=search_query
+        ).annotate(
+            search_rank=SearchRank(F('search_document__search_vector'), search_query)
+        ).order_by('-search_rank', '-published_date', '-created_at')
+
+    scores = _python_search(query)
+    if not scores:
+        return queryset.none()
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(
+            *[When(pk=post_id, then=Value(score)) for post_id, score in scores.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    ).order_by('-search_rank', '-published_date', '-created_at')
@@ -0,0 +1,96 @@
+"""
+Materialized series navigation per category.
+
+Every category is a "series": its published posts ordered by ``sequence``
+then ``published_date``. The ordered list plus an id -> position map is
+cached per category, so ``blog_detail`` finds the current post, its
+neighbours and the full series list without touching the database.
+
+``blog.signals`` drops a category's entry when a post's ordering, status,
+category, title, slug or publication date changes, and bumps a global
+version when an author is (de)activated.
+"""
+from django.core.cache import cache
+
+SERIES_VERSION_KEY = 'blog:series:version'
+SERIES_TIMEOUT = 60 * 60 * 24
+
+# BlogPost fields that change a series' membership, order or display
+SERIES_FIELDS = ('sequence', 'status', 'category_id', 'published_date', 'title', 'slug', 'author_id')
+
+
+def _series_version():
+    version = cache.get(SERIES_VERSION_KEY)
+    if version is None:
+        cache.add(SERIES_VERSION_KEY, 1, timeout=None)
+        version = cache.get(SERIES_VERSION_KEY, 1)
+    return version
+
+
+def _series_key(category_id):
+    return f'blog:series:v{_series_version()}:{category_id}'
+
+
+def build_series(category_id):
+    """Build the ordered series for ``category_id``."""
+    from .models import BlogPost
+
+    rows = BlogPost.objects.filter(
+        status='published',
+        author__is_active=True,
+        category_id=category_id
+    ).order_by('sequence', 'published_date').values_list('id', 'title', 'slug')
+
+    posts = [
+        {'id': pid, 'title': title, 'slug': slug, 'number': number}
+        for number, (pid, title, slug) in enumerate(rows, start=1)
+    ]
+    return {
+        'posts': posts,
+        'positions': {entry['id']: index for index, entry in enumerate(posts)},
+    }
+
+
+def get_series(category_id):
+    """Return the cached series for ``category_id``, building it on a miss."""
+    key = _series_key(category_id)
+    series = cache.get(key)
+    if series is None:
+        series = build_series(category_id)
+        cache.set(key, series, timeout=SERIES_TIMEOUT)
+    return series
+
+
+def get_series_navigation(post):
+    """
+    Return series navigation for ``post``.
+
+    Returns:
+        tuple: (series_posts: list, prev_post: dict or None, next_post: dict or None)
+    """
+    if not post.category_id:
+        return [], None, None
+
+    series = get_series(post.category_id)
+    posts = series['posts']
+    position = series['positions'].get(post.id)
+    if position is None:
+        return posts, None, None
+
+    prev_post = posts[position - 1] if position > 0 else None
+    next_post = posts[position + 1] if position < len(posts) - 1 else None
+    return posts, prev_post, next_post
+
+
+def invalidate_series(*category_ids):
+    """Drop the cached series for the given categories."""
+    cache.delete_many([_series_key(category_id) for category_id in category_ids if category_id])
+
+
+def invalidate_all_series():
+    """Invalidate every category's series (e.g. an author was deactivated)."""
+    cache.add(SERIES_VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(SERIES_VERSION_KEY)
+    except ValueError:
+        cache.set(SERIES_VERSION_KEY, 1, timeout=None)
@@ -0,0 +1,73 @@
+"""
+Cached sidebar data for the blog.
+
+The "Blog Series" sidebar (categories with their published posts in
+sequence order) only changes when a post or category is edited, so it is
+built once into plain dicts and stored in the cache under a version
+number. Signals in ``blog.signals`` bump the version to invalidate it.
+"""
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+SIDEBAR_VERSION_KEY = 'blog:sidebar:version'
+SIDEBAR_TIMEOUT = 60 * 60 * 24  # Old versions simply age out
+
+
+def get_sidebar_version():
+    """Return the current sidebar version, initialising it if needed."""
+    version = cache.get(SIDEBAR_VERSION_KEY)
+    if version is None:
+        cache.add(SIDEBAR_VERSION_KEY, 1, timeout=None)
+        version = cache.get(SIDEBAR_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_sidebar():
+    """Bump the sidebar version so the next request rebuilds it."""
+    cache.add(SIDEBAR_VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(SIDEBAR_VERSION_KEY)
+    except ValueError:
+        cache.set(SIDEBAR_VERSION_KEY, 1, timeout=None)
+
+
+def build_sidebar_categories():
+    """Build sidebar data: categories with their posts in sequence order."""
+    from .models import BlogPost, Category
+
+    categories = Category.objects.prefetch_related(
+        Prefetch(
+            'posts',
+            queryset=BlogPost.objects.filter(
+                status='published',
+                author__is_active=True
+            ).order_by('sequence', 'published_date').only(
+                'id', 'title', 'slug', 'sequence', 'category_id'
+            ),
+            to_attr='ordered_posts'
+        )
+    ).order_by('name')
+
+    return [
+        {
+            'id': category.id,
+            'name': category.name,
+            'slug': category.slug,
+            'ordered_posts': [
+                {'id': post.id, 'title': post.title, 'slug': post.slug}
+                for post in category.ordered_posts
+            ],
+        }
+        for category in categories
+        if category.ordered_posts
+    ]
+
+
+def get_sidebar_categories():
+    """Return the cached sidebar structure, rebuilding it on a version miss."""
+    key = f'blog:sidebar:v{get_sidebar_version()}'
+    sidebar = cache.get(key)
+    if sidebar is None:
+        sidebar = build_sidebar_categories()
+        cache.set(key, sidebar, timeout=SIDEBAR_TIMEOUT)
+    return sidebar
@@ -1,53 +1,28 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from .models import PostLike, BlogPost
-from comments.models import Comment, CommentLike, Notification
-
-
-@receiver(post_save, sender=Comment)
-def create_comment_notification(sender, instance, created, **kwargs):
-    """Create notification when someone replies to a comment"""
-    if created and instance.parent:
-        # Check if replying to own comment
-        parent_is_same_user = False
-        
-        if instance.author and instance.parent.author:
-            # Both are logged-in users
-            parent_is_same_user = instance.author == instance.parent.author
-        elif not instance.author and not instance.parent.author:
-            # Both are guests - check email
-            if instance.guest_email and instance.parent.guest_email:
-                parent_is_same_user = instance.guest_email.lower() == instance.parent.guest_email.lower()
-        
-        # Create notification only if replying to someone else and parent has an account
-        if not parent_is_same_user and instance.parent.author:
-            author_name = instance.author.get_full_name() if instance.author else instance.guest_name
-            content_obj = instance.content_object
-            post_title = getattr(content_obj, 'title', 'a post') if content_obj else 'a post'
-            Notification.objects.create(
-                recipient=instance.parent.author,
-                sender=instance.author,  # Can be None for guest users
-                sender_name_cache=author_name or 'Someone',
-                notification_type='comment_reply',
-                content_type=instance.content_type,
-                object_id=instance.object_id,
-                comment=instance.parent,
-                message=f'{author_name} replied to your comment on "{post_title}"'
-            )
+from account.models import Account
+from arpansahu_dot_me import images
+from arpansahu_dot_me.page_cache import SECTION_BLOG, purge_section
+from .models import PostLike, BlogPost, Category, Tag
+from .sidebar import invalidate_sidebar
+from . import related, search, series, taxonomy
+from comments.counters import adjust_counter
+from comments.models import Comment
+from comments.notifications import enqueue
 
 
 @receiver(post_save, sender=PostLike)
 def create_post_like_notification(sender, instance, created, **kwargs):
-    """Create notification when someone likes a post"""
+    """Queue a notification when someone likes a post (comment notifications live in comments.signals)"""
     if created and instance.user != instance.post.author:
         sender_name = instance.user.get_full_name() or instance.user.username
         post_ct = ContentType.objects.get_for_model(BlogPost)
         # Someone liked the post
-        Notification.objects.create(
+        enqueue(
             recipient=instance.post.author,
             sender=instance.user,
-            sender_name_cache=sender_name,
+            sender_name=sender_name,
             notification_type='post_like',
             content_type=post_ct,
             object_id=instance.post.id,
@@ -55,21 +30,276 @@ def create_post_like_notification(sender, instance, created, **kwargs):
         )
 
 
-@receiver(post_save, sender=CommentLike)
-def create_comment_like_notification(sender, instance, created, **kwargs):
-    """Create notification when someone likes a comment"""
-    if created and instance.comment.author and instance.user != instance.comment.author:
-        sender_name = instance.user.get_full_name() or instance.user.username if instance.user else 'Someone'
-        content_obj = instance.comment.content_object
-        post_title = getattr(content_obj, 'title', 'a post') if content_obj else 'a post'
-        # Someone liked the comment
-        Notification.objects.create(
-            recipient=instance.comment.author,
-            sender=instance.user,
-            sender_name_cache=sender_name,
-            notification_type='comment_like',
-            content_type=instance.comment.content_type,
-            object_id=instance.comment.object_id,
-            comment=instance.comment,
-            message=f'{sender_name} liked your comment on "{post_title}"'
-        )
+@receiver(post_save, sender=PostLike)
+def increment_post_like_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(BlogPost, instance.post_id, 'like_count', 1)
+
+
+@receiver(post_delete, sender=PostLike)
+def decrement_post_like_count(sender, instance, **kwargs):
+    adjust_counter(BlogPost, instance.post_id, 'like_count', -1)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_sidebar_on_change(sender, **kwargs):
+    """Rebuild the cached blog sidebar when posts or categories change"""
+    invalidate_sidebar()
+
+
+@receiver(pre_save, sender=Account)
+def capture_author_state(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored is_active so post_save only acts when it changes"""
+    instance._was_active = None
+    if instance.pk and (update_fields is None or 'is_active' in update_fields):
+        instance._was_active = Account.objects.filter(pk=instance.pk).values_list(
+            'is_active', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Account)
+def invalidate_sidebar_on_author_change(sender, instance, created, **kwargs):
+    """Authors being (de)activated hides or shows their posts in the sidebar"""
+    # New accounts have no posts yet; profile edits and logins leave is_active alone
+    was_active = getattr(instance, '_was_active', None)
+    if not created and was_active is not None and was_active != instance.is_active:
+        invalidate_sidebar()
+        series.invalidate_all_series()
+        taxonomy.recount_taxonomy()
+        purge_section(SECTION_BLOG)
+
+
+SEARCH_FIELDS = {'title', 'excerpt', 'content'}
+
+
+@receiver(post_save, sender=BlogPost)
+def update_search_document(sender, instance, update_fields=None, **kwargs):
+    """Keep the post's search document in sync with its text"""
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=BlogPost)
+def remove_search_document(sender, instance, **kwargs):
+    """Drop a deleted post from the search index"""
+    search.remove_post(instance.pk)
+
+
+RELATED_FIELDS = {'status', 'category', 'author', 'title', 'excerpt', 'content'}
+
+
+@receiver(post_save, sender=BlogPost)
+def update_related_posts(sender, instance, update_fields=None, **kwargs):
+    """Recompute related posts around a changed post once the save commits"""
+    if update_fields is not None and not RELATED_FIELDS.intersection(update_fields):
+        return
+    related.schedule_refresh({instance.pk})
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def update_related_posts_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Shared tags feed the similarity score"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        related.schedule_refresh({instance.pk})
+    elif pk_set:
+        related.schedule_refresh(pk_set)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def collect_related_posts(sender, instance, **kwargs):
+    """Remember which posts link to a post that is about to be deleted"""
+    instance._related_affected = set(instance.related_to.values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_related_posts_on_delete(sender, instance, **kwargs):
+    affected = getattr(instance, '_related_affected', None)
+    if affected:
+        related.schedule_refresh(affected)
+
+
+@receiver(pre_save, sender=BlogPost)
+def capture_series_state(sender, instance, **kwargs):
+    """Remember the stored series fields so post_save can tell what changed"""
+    instance._series_state = None
+    if instance.pk:
+        instance._series_state = BlogPost.objects.filter(pk=instance.pk).values_list(
+            *series.SERIES_FIELDS
+        ).first()
+
+
+@receiver(pre_save, sender=BlogPost)
+def capture_featured_image_upload(sender, instance, **kwargs):
+    """Note a newly uploaded featured image (its file is committed after this signal)"""
+    image = instance.featured_image
+    instance._featured_image_uploaded = bool(image) and not image._committed
+
+
+@receiver(post_save, sender=BlogPost)
+def build_featured_image_variants(sender, instance, **kwargs):
+    """Build responsive variants of a new featured image after the post is saved"""
+    if getattr(instance, '_featured_image_uploaded', False):
+        images.schedule_variants(instance.featured_image.name)
+
+
+@receiver(post_save, sender=BlogPost)
+def invalidate_series_on_change(sender, instance, created, **kwargs):
+    """Drop cached series navigation for the old and new category when ordering changes"""
+    previous = getattr(instance, '_series_state', None)
+    current = tuple(getattr(instance, field) for field in series.SERIES_FIELDS)
+    if created or previous is None:
+        series.invalidate_series(instance.category_id)
+    elif previous != current:
+        old_category_id = previous[series.SERIES_FIELDS.index('category_id')]
+        series.invalidate_series(old_category_id, instance.category_id)
+
+
+@receiver(post_delete, sender=BlogPost)
+def invalidate_series_on_delete(sender, instance, **kwargs):
+    series.invalidate_series(instance.category_id)
+
+
+# Every blog listing page embeds the sidebar and category/tag clouds, so any
+# visible change purges the whole blog section of the anonymous page cache
+@receiver(post_save, sender=BlogPost)
+def purge_blog_pages_on_post_change(sender, instance, **kwargs):
+    """Purge cached listings unless the post was and still is unpublished"""
+    previous = getattr(instance, '_series_state', None)
+    was_published = previous is not None and previous[series.SERIES_FIELDS.index('status')] == 'published'
+    if was_published or instance.status == 'published':
+        purge_section(SECTION_BLOG)
+
+
+@receiver(post_delete, sender=BlogPost)
+def purge_blog_pages_on_post_delete(sender, instance, **kwargs):
+    if instance.status == 'published':
+        purge_section(SECTION_BLOG)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def purge_blog_pages_on_tags(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        purge_section(SECTION_BLOG)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def purge_blog_pages_on_taxonomy_change(sender, **kwargs):
+    purge_section(SECTION_BLOG)
+
+
+# Listing cards show like and comment counts
+@receiver(post_save, sender=PostLike)
+def purge_blog_pages_on_like(sender, instance, created, **kwargs):
+    if created:
+        purge_section(SECTION_BLOG)
+
+
+@receiver(post_delete, sender=PostLike)
+def purge_blog_pages_on_unlike(sender, instance, **kwargs):
+    purge_section(SECTION_BLOG)
+
+
+def _is_post_comment(comment):
+    return comment.content_type_id == ContentType.objects.get_for_model(BlogPost).pk
+
+
+@receiver(post_save, sender=Comment)
+def purge_blog_pages_on_comment(sender, instance, **kwargs):
+    """Purge when a post comment becomes visible or hidden (see comments.signals.capture_counter_state)"""
+    previous = getattr(instance, '_counter_state', None)
+    if previous is not None and previous[0] != instance.is_approved and _is_post_comment(instance):
+        purge_section(SECTION_BLOG)
+
+
+@receiver(post_delete, sender=Comment)
+def purge_blog_pages_on_comment_delete(sender, instance, **kwargs):
+    if instance.is_approved and _is_post_comment(instance):
+        purge_section(SECTION_BLOG)
+
+
+# Published post counts per category and tag (see blog.taxonomy)
+def _previous_value(previous, field):
+    return previous[series.SERIES_FIELDS.index(field)]
+
+
+@receiver(post_save, sender=BlogPost)
+def update_taxonomy_counts(sender, instance, created, **kwargs):
+    """Move the post between category/tag counts when it is (un)published or recategorised"""
+    previous = None if created else getattr(instance, '_series_state', None)
+    was_counted = previous is not None and taxonomy.is_counted(
+        _previous_value(previous, 'status'), _previous_value(previous, 'author_id')
+    )
+    is_counted = taxonomy.is_counted(instance.status, instance.author_id)
+    old_category_id = _previous_value(previous, 'category_id') if previous else None
+    if was_counted and is_counted and old_category_id == instance.category_id:
+        return
+    if was_counted:
+        taxonomy.adjust_category(old_category_id, -1)
+    if is_counted:
+        taxonomy.adjust_category(instance.category_id, 1)
+    if was_counted != is_counted and not created:
+        taxonomy.adjust_tags(instance.tags.values_list('pk', flat=True), 1 if is_counted else -1)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def update_taxonomy_counts_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep tag counts in step with tags added to or removed from published posts"""
+    if action == 'pre_clear':
+        # The cleared rows are gone by post_clear, so remember them now
+        if reverse:
+            instance._taxonomy_cleared = instance.posts.filter(
+                status='published', author__is_active=True
+            ).count()
+        elif taxonomy.is_counted(instance.status, instance.author_id):
+            instance._taxonomy_cleared = set(instance.tags.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        # ``instance`` is a tag and ``pk_set`` holds post ids
+        if action == 'post_clear':
+            changed = getattr(instance, '_taxonomy_cleared', 0)
+        else:
+            changed = BlogPost.objects.filter(
+                pk__in=pk_set, status='published', author__is_active=True
+            ).count()
+        taxonomy.adjust_tags({instance.pk}, delta * changed)
+    elif action == 'post_clear':
+        taxonomy.adjust_tags(getattr(instance, '_taxonomy_cleared', None), delta)
+    elif taxonomy.is_counted(instance.status, instance.author_id):
+        taxonomy.adjust_tags(pk_set, delta)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def collect_taxonomy_counts(sender, instance, **kwargs):
+    """Remember the tags of a counted post before its tag rows are deleted"""
+    instance._taxonomy_tags = None
+    if taxonomy.is_counted(instance.status, instance.author_id):
+        instance._taxonomy_tags = set(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_taxonomy_counts_on_delete(sender, instance, **kwargs):
+    tag_ids = getattr(instance, '_taxonomy_tags', None)
+    if tag_ids is not None:
+        taxonomy.adjust_category(instance.category_id, -1)
+        taxonomy.adjust_tags(tag_ids, -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_taxonomy_on_change(sender, **kwargs):
+    """Renamed or removed categories/tags change the cached clouds"""
+    taxonomy.invalidate_taxonomy()
@@ -0,0 +1,129 @@
+"""
+Published post counts for categories and tags.
+
+``Category.post_count`` and ``Tag.post_count`` hold the number of published
+posts by active authors. Signals in ``blog.signals`` adjust them with
+atomic ``F()`` UPDATEs as posts are published, unpublished, moved between
+categories, retagged or deleted, so nothing ever runs a ``COUNT`` per
+request. The category and tag clouds rendered by the blog pages are built
+from those columns into plain dicts and cached under a version number that
+every adjustment bumps. ``recount_taxonomy`` recomputes the columns from
+scratch (used when an author is (de)activated and by ``reconcile_counters``).
+"""
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from comments.counters import adjust_counter, count_subquery, recount
+
+TAXONOMY_VERSION_KEY = 'blog:taxonomy:version'
+TAXONOMY_TIMEOUT = 60 * 60 * 24  # Old versions simply age out
+COUNT_FIELD = 'post_count'
+
+
+def is_counted(status, author_id):
+    """Whether a post with this status and author contributes to the counts."""
+    from account.models import Account
+
+    if status != 'published' or not author_id:
+        return False
+    return Account.objects.filter(pk=author_id, is_active=True).exists()
+
+
+def get_taxonomy_version():
+    """Return the current cloud version, initialising it if needed."""
+    version = cache.get(TAXONOMY_VERSION_KEY)
+    if version is None:
+        cache.add(TAXONOMY_VERSION_KEY, 1, timeout=None)
+        version = cache.get(TAXONOMY_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_taxonomy():
+    """Bump the cloud version so the next request rebuilds it."""
+    cache.add(TAXONOMY_VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(TAXONOMY_VERSION_KEY)
+    except ValueError:
+        cache.set(TAXONOMY_VERSION_KEY, 1, timeout=None)
+
+
+def adjust_category(category_id, delta):
+    """Add ``delta`` to one category's published count."""
+    from .models import Category
+
+    if category_id and delta:
+        adjust_counter(Category, category_id, COUNT_FIELD, delta)
+        invalidate_taxonomy()
+
+
+def adjust_tags(tag_ids, delta):
+    """Add ``delta`` to the published count of every tag in ``tag_ids``."""
+    from .models import Tag
+
+    tag_ids = set(tag_ids or ())
+    if tag_ids and delta:
+        Tag.objects.filter(pk__in=tag_ids).update(
+            **{COUNT_FIELD: Greatest(F(COUNT_FIELD) + delta, 0)}
+        )
+        invalidate_taxonomy()
+
+
+def recount_taxonomy():
+    """
+    Recompute ``post_count`` for every category and tag.
+
+    Returns:
+        dict: number of drifted rows per model
+    """
+    from .models import BlogPost, Category, Tag
+
+    counted = {'status': 'published', 'author__is_active': True}
+    drifted = {
+        'category': recount(
+            Category.objects.all(), COUNT_FIELD, count_subquery(BlogPost, 'category', **counted)
+        ),
+        'tag': recount(
+            Tag.objects.all(), COUNT_FIELD, count_subquery(BlogPost.tags.through, 'tag', **{
+                f'blogpost__{field}': value for field, value in counted.items()
+            })
+        ),
+    }
+    invalidate_taxonomy()
+    return drifted
+
+
+def _cloud(model):
+    return [
+        {'id': pk, 'name': name, 'slug': slug, 'post_count': post_count}
+        for pk, name, slug, post_count in model.objects.filter(
+            **{f'{COUNT_FIELD}__gt': 0}
+        ).order_by('name').values_list('id', 'name', 'slug', COUNT_FIELD)
+    ]
+
+
+def build_taxonomy():
+    """Build the category and tag clouds (one query each)."""
+    from .models import Category, Tag
+
+    return {'categories': _cloud(Category), 'tags': _cloud(Tag)}
+
+
+def get_taxonomy():
+    """Return the cached clouds as ``{'categories': [...], 'tags': [...]}``."""
+    key = f'blog:taxonomy:v{get_taxonomy_version()}'
+    taxonomy = cache.get(key)
+    if taxonomy is None:
+        taxonomy = build_taxonomy()
+        cache.set(key, taxonomy, timeout=TAXONOMY_TIMEOUT)
+    return taxonomy
+
+
+def get_category_cloud():
+    """Categories with at least one published post, with their counts."""
+    return get_taxonomy()['categories']
+
+
+def get_tag_cloud():
+    """Tags with at least one published post, with their counts."""
+    return get_taxonomy()['tags']
@@ -2,6 +2,9 @@ import markdown as md
 from django import template
 from django.utils.safestring import mark_safe
 
+from blog.likes import is_liked_for_request, kind_for, liked_ids_for_request
+from blog.pagination import CURSOR_PARAM, PAGE_PARAM
+
 register = template.Library()
 
 
@@ -34,3 +37,40 @@ def reading_time(text):
     word_count = len(text.split())
     minutes = word_count / 200
     return max(1, round(minutes))
+
+
+@register.simple_tag(takes_context=True)
+def liked_ids(context, items, kind=None):
+    """
+    Ids among ``items`` liked by the current user, resolved in one query:
+    {% liked_ids posts as liked %} ... {% if post.id in liked %}
+    """
+    request = context.get('request')
+    items = list(items)
+    if request is None or not items:
+        return set()
+    return liked_ids_for_request(request, kind or kind_for(items[0]), items)
+
+
+@register.simple_tag(takes_context=True)
+def is_liked(context, obj):
+    """Whether the current user liked ``obj``: {% is_liked post as liked %}"""
+    request = context.get('request')
+    if request is None:
+        return False
+    return is_liked_for_request(request, obj)
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **params):
+    """
+    Current query string with pagination replaced, keeping filters and search:
+    <a href="?{% page_query cursor=page_obj.next_cursor %}">
+    """
+    query = context['request'].GET.copy()
+    query.pop(CURSOR_PARAM, None)
+    query.pop(PAGE_PARAM, None)
+    for key, value in params.items():
+        if value is not None:
+            query[key] = value
+    return query.urlencode()
@@ -243,9 +243,11 @@ class TestBlogDetailView:
         assert response.context['post'] == published_post
     
     def test_blog_detail_increments_views(self, client, published_post):
-        """Test viewing post increments view count."""
+        """Test viewing post increments view count once buffered views are flushed."""
+        from blog.view_counter import flush_views
         initial_views = published_post.views
         client.get(reverse('blog:blog_detail', kwargs={'slug': published_post.slug}))
+        flush_views()
         published_post.refresh_from_db()
         assert published_post.views == initial_views + 1
     
@@ -315,6 +317,25 @@ class TestAddCommentView:
         assert response.status_code == 200
         assert response.json()['success']
         assert response.json()['comment']['is_approved']
+    
+    def test_add_comment_reply_too_deep(self, client, published_post, test_user, monkeypatch):
+        """Test replying below the maximum thread depth is refused."""
+        from blog import views
+        from comments.models import Comment
+        from django.contrib.contenttypes.models import ContentType
+        monkeypatch.setattr(views, 'MAX_THREAD_DEPTH', 0)
+        parent = Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost), object_id=published_post.id,
+            author=test_user, content='Root'
+        )
+        client.login(username='bloguser@example.com', password='TestPassword123!')
+        response = client.post(
+            reverse('blog:add_comment', kwargs={'post_slug': published_post.slug}),
+            data={'content': 'Reply', 'parent_id': parent.id},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        assert not response.json()['success']
+        assert Comment.objects.count() == 1
 
 
 class TestTogglePostLikeView:
@@ -442,6 +463,7 @@ class TestBlogSignals:
         """Test notification is created when replying to another user's comment."""
         from django.contrib.contenttypes.models import ContentType
         from comments.models import Comment, Notification
+        from comments.notifications import dispatch_pending
 
         other_user = User.objects.create_user(
             email='otheruser@example.com', username='otheruser', password='pass123'
@@ -461,23 +483,22 @@ class TestBlogSignals:
             content_type=ct, object_id=post.id, author=other_user,
             content='Parent comment', is_approved=True
         )
-        # The blog signal tries to access instance.post which doesn't exist on Comment.
-        # The comments signal handles this correctly instead.
-        # Verify the comments signal creates the notification.
-        reply = Comment.objects.create(
+        Comment.objects.create(
             content_type=ct, object_id=post.id, author=test_user,
             content='Reply to parent', parent=parent_comment, is_approved=True
         )
-        # Comments signal creates notification for comment_reply
+        # The comments signal queues the comment_reply; the worker writes it
+        dispatch_pending()
         notif = Notification.objects.filter(
             recipient=other_user, notification_type='comment_reply'
         )
-        assert notif.exists()
+        assert notif.count() == 1
 
     def test_no_self_notification_on_reply(self, db, test_user):
         """Test no notification when replying to own comment."""
         from django.contrib.contenttypes.models import ContentType
         from comments.models import Comment, Notification
+        from comments.notifications import dispatch_pending
 
         category = Category.objects.create(name='Self Reply Cat', slug='self-reply-cat')
         post = BlogPost.objects.create(
@@ -494,6 +515,7 @@ class TestBlogSignals:
             content_type=ct, object_id=post.id, author=test_user,
             content='My reply', parent=parent, is_approved=True
         )
+        dispatch_pending()
         assert not Notification.objects.filter(
             recipient=test_user, notification_type='comment_reply'
         ).exists()
@@ -627,3 +649,997 @@ class TestBlogTemplateTags:
         result = reading_time(text)
         assert result == 1
 
+
+
+class TestViewCounter:
+    """Tests for the buffered blog post view counter."""
+
+    def test_record_view_buffers_in_cache(self, published_post, settings):
+        """Test views are kept in the cache until flushed."""
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        view_counter.record_view(published_post.id)
+        published_post.refresh_from_db()
+        assert published_post.views == 0
+        assert view_counter.get_pending_views(published_post.id) == 2
+
+    def test_flush_views_applies_deltas(self, published_post):
+        """Test flushing writes pending views and clears the buffer."""
+        from blog import view_counter
+        for _ in range(3):
+            view_counter.record_view(published_post.id)
+        posts_updated, views_flushed = view_counter.flush_views()
+        published_post.refresh_from_db()
+        assert (posts_updated, views_flushed) == (1, 3)
+        assert published_post.views == 3
+        assert view_counter.get_pending_views(published_post.id) == 0
+
+    def test_flush_views_is_single_update(self, published_post, draft_post, django_assert_num_queries):
+        """Test deltas for several posts are written in one UPDATE."""
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        view_counter.record_view(draft_post.id)
+        with django_assert_num_queries(1):  # Bulk UPDATE of the dirty posts only
+            view_counter.flush_views()
+        draft_post.refresh_from_db()
+        assert draft_post.views == 1
+
+    def test_record_view_never_flushes(self, published_post, django_assert_num_queries):
+        """Test counting a view stays out of the database entirely."""
+        from blog import view_counter
+        with django_assert_num_queries(0):
+            for _ in range(3):
+                view_counter.record_view(published_post.id)
+        assert view_counter.get_pending_views(published_post.id) == 3
+
+    def test_flush_reads_only_dirty_posts(self, published_post, draft_post):
+        """Test a flush ignores posts without views logged since the last one."""
+        from django.core.cache import cache
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        assert view_counter.flush_views() == (1, 1)
+        assert view_counter.flush_views() == (0, 0)
+        cache.set(view_counter._view_key(draft_post.id), 4, timeout=None)  # Logged entry lost
+        assert view_counter.flush_views() == (0, 0)
+        assert view_counter.flush_views([draft_post.id]) == (1, 4)
+
+    def test_views_during_flush_stay_dirty(self, published_post, monkeypatch):
+        """Test views counted while a flush runs are picked up by the next one."""
+        from django.core.cache import cache
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        real_get_many = cache.get_many
+
+        def get_many_then_view(keys):
+            values = real_get_many(keys)
+            if view_counter._view_key(published_post.id) in keys:
+                cache.incr(view_counter._view_key(published_post.id))
+            return values
+        monkeypatch.setattr(cache, 'get_many', get_many_then_view)
+        assert view_counter.flush_views() == (1, 1)
+        monkeypatch.undo()
+        assert view_counter.flush_views() == (1, 1)
+        published_post.refresh_from_db()
+        assert published_post.views == 2
+
+    def test_flush_retries_entry_not_written_yet(self, published_post):
+        """Test a number taken but not yet logged is read by a later flush, not skipped."""
+        from django.core.cache import cache
+        from blog import view_counter
+        number = view_counter._next_dirty_number()  # record_view between incr and set
+        assert view_counter.flush_views() == (0, 0)
+        assert cache.get(view_counter.DIRTY_FLUSHED_KEY, 0) == number - 1
+        cache.set(view_counter._view_key(published_post.id), 1, timeout=None)
+        cache.set(view_counter._dirty_key(number), published_post.id, timeout=None)
+        assert view_counter.flush_views() == (1, 1)
+        assert cache.get(view_counter.DIRTY_FLUSHED_KEY) == number
+
+    def test_flush_gives_up_on_lost_entry(self, published_post, monkeypatch):
+        """Test an entry missing past the gap timeout stops holding back the log."""
+        from django.core.cache import cache
+        from blog import view_counter
+        lost = view_counter._next_dirty_number()  # Evicted, or its writer died
+        view_counter.record_view(published_post.id)
+        assert view_counter.flush_views() == (1, 1)
+        assert cache.get(view_counter.DIRTY_FLUSHED_KEY, 0) == lost - 1
+        assert cache.get(view_counter._dirty_key(lost + 1)) == published_post.id  # Kept for the retry
+        monkeypatch.setattr(view_counter, 'DIRTY_GAP_TIMEOUT', 0)
+        assert view_counter.flush_views() == (0, 0)
+        assert cache.get(view_counter.DIRTY_FLUSHED_KEY) == lost + 1
+        assert cache.get(view_counter._dirty_key(lost + 1)) is None
+
+    def test_full_save_keeps_flushed_views(self, published_post):
+        """Test saving a stale instance does not overwrite views flushed meanwhile."""
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        view_counter.flush_views()
+        published_post.title = 'Renamed'
+        published_post.save()
+        published_post.refresh_from_db()
+        assert (published_post.title, published_post.views) == ('Renamed', 1)
+
+    def test_flush_post_views_command(self, published_post):
+        """Test the management command flushes buffered views."""
+        from io import StringIO
+        from django.core.management import call_command
+        from blog import view_counter
+        view_counter.record_view(published_post.id)
+        out = StringIO()
+        call_command('flush_post_views', stdout=out)
+        published_post.refresh_from_db()
+        assert published_post.views == 1
+        assert 'Flushed 1 view(s)' in out.getvalue()
+
+    def test_flush_post_views_all(self, published_post):
+        """Test --all flushes posts missing from the dirty log."""
+        from io import StringIO
+        from django.core.cache import cache
+        from django.core.management import call_command
+        from blog import view_counter
+        cache.set(view_counter._view_key(published_post.id), 2, timeout=None)
+        out = StringIO()
+        call_command('flush_post_views', '--all', stdout=out)
+        published_post.refresh_from_db()
+        assert published_post.views == 2
+
+
+class TestSidebarCache:
+    """Tests for the cached blog sidebar."""
+
+    def test_sidebar_lists_published_posts_only(self, published_post, draft_post, test_category):
+        """Test sidebar contains the category with only its published posts."""
+        from blog.sidebar import get_sidebar_categories
+        sidebar = get_sidebar_categories()
+        assert [cat['slug'] for cat in sidebar] == [test_category.slug]
+        assert [p['slug'] for p in sidebar[0]['ordered_posts']] == [published_post.slug]
+
+    def test_sidebar_served_from_cache(self, published_post, django_assert_num_queries):
+        """Test a warm sidebar costs no queries."""
+        from blog.sidebar import get_sidebar_categories
+        get_sidebar_categories()
+        with django_assert_num_queries(0):
+            get_sidebar_categories()
+
+    def test_sidebar_invalidated_on_post_change(self, published_post):
+        """Test saving a post bumps the version and rebuilds the sidebar."""
+        from blog.sidebar import get_sidebar_categories, get_sidebar_version
+        get_sidebar_categories()
+        version = get_sidebar_version()
+        published_post.title = 'Renamed Post'
+        published_post.save()
+        assert get_sidebar_version() > version
+        assert get_sidebar_categories()[0]['ordered_posts'][0]['title'] == 'Renamed Post'
+
+    def test_sidebar_invalidated_on_author_deactivation(self, published_post, test_user):
+        """Test deactivating the author hides their posts from the sidebar."""
+        from blog.sidebar import get_sidebar_categories
+        assert get_sidebar_categories()
+        test_user.is_active = False
+        test_user.save()
+        assert get_sidebar_categories() == []
+
+    def test_account_saves_without_activation_change_keep_caches(self, published_post, test_user, mocker):
+        """Test signups and profile edits do not recount taxonomy or purge pages."""
+        from blog import taxonomy
+        recount = mocker.spy(taxonomy, 'recount_taxonomy')
+        test_user.first_name = 'Renamed'
+        test_user.save()
+        User.objects.create_user(email='new@example.com', username='newuser', password='TestPassword123!')
+        assert recount.call_count == 0
+        test_user.is_active = False
+        test_user.save(update_fields=['is_active'])
+        assert recount.call_count == 1
+
+
+class TestSearch:
+    """Tests for the blog full-text search index."""
+
+    @pytest.fixture
+    def html_post(self, db, test_user, test_category):
+        return BlogPost.objects.create(
+            title='Deploying Kubernetes',
+            slug='deploying-kubernetes',
+            author=test_user,
+            excerpt='Cluster notes',
+            content='<p class="lead">Helm charts &amp; <strong>rollouts</strong></p>',
+            category=test_category,
+            status='published',
+            published_date=timezone.now(),
+        )
+
+    def test_document_is_html_stripped(self, html_post):
+        """Test the search document holds plain text only."""
+        document = html_post.search_document
+        assert document.body == 'Helm charts & rollouts'
+        assert 'lead' not in document.body
+
+    def test_search_ignores_markup(self, html_post):
+        """Test tag names and attributes do not match searches."""
+        from blog.search import search_posts
+        assert list(search_posts(BlogPost.objects.all(), 'strong')) == []
+        assert list(search_posts(BlogPost.objects.all(), 'rollouts')) == [html_post]
+
+    def test_search_ranks_title_above_body(self, html_post, published_post):
+        """Test a title match outranks a body-only match."""
+        from blog.search import search_posts
+        published_post.content = 'A short aside about kubernetes.'
+        published_post.save()
+        results = list(search_posts(BlogPost.objects.all(), 'kubernetes'))
+        assert results == [html_post, published_post]
+
+    def test_search_matches_all_terms_by_prefix(self, html_post, published_post):
+        """Test every query term must match, as a word prefix."""
+        from blog.search import search_posts
+        assert list(search_posts(BlogPost.objects.all(), 'deploy helm')) == [html_post]
+        assert list(search_posts(BlogPost.objects.all(), 'deploy missing')) == []
+
+    def test_index_updated_incrementally(self, html_post):
+        """Test edits and deletes are reflected in a warm index."""
+        from blog.search import search_posts
+        assert list(search_posts(BlogPost.objects.all(), 'helm')) == [html_post]
+        html_post.content = '<p>Terraform modules</p>'
+        html_post.save()
+        assert list(search_posts(BlogPost.objects.all(), 'helm')) == []
+        assert list(search_posts(BlogPost.objects.all(), 'terraform')) == [html_post]
+        html_post.delete()
+        assert list(search_posts(BlogPost.objects.all(), 'terraform')) == []
+
+    def test_contended_index_is_dropped_not_overwritten(self, html_post, monkeypatch):
+        """Test a writer that cannot get the index lock forces a rebuild instead of losing its edit."""
+        from django.core.cache import cache
+        from blog import search
+        assert list(search.search_posts(BlogPost.objects.all(), 'helm')) == [html_post]
+        monkeypatch.setattr(search, 'INDEX_LOCK_WAIT', 0)
+        cache.add(search.SEARCH_INDEX_LOCK_KEY, 1)
+        html_post.content = '<p>Terraform modules</p>'
+        html_post.save()
+        assert cache.get(search.SEARCH_INDEX_KEY) is None
+        assert list(search.search_posts(BlogPost.objects.all(), 'terraform')) == [html_post]
+
+    def test_rebuild_search_index_command(self, html_post):
+        """Test the rebuild command recreates missing documents."""
+        from io import StringIO
+        from django.core.management import call_command
+        from blog.models import PostSearchDocument
+        PostSearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        assert PostSearchDocument.objects.filter(post=html_post).exists()
+        assert 'Indexed 1 post(s)' in out.getvalue()
+
+    def test_blog_list_search_uses_index(self, client, html_post, published_post):
+        """Test ?q= returns ranked matches only."""
+        response = client.get(reverse('blog:blog_list') + '?q=helm')
+        assert list(response.context['page_obj']) == [html_post]
+
+
+class TestRelatedPosts:
+    """Tests for the precomputed related-posts graph."""
+
+    @pytest.fixture
+    def committed(self, django_capture_on_commit_callbacks):
+        """Run the related-posts refresh queued by signals, as a real commit would."""
+        return lambda: django_capture_on_commit_callbacks(execute=True)
+
+    @pytest.fixture
+    def make_post(self, db, test_user, test_category, committed):
+        def _make(slug, category=test_category, content='Plain content', status='published', tags=()):
+            with committed():
+                post = BlogPost.objects.create(
+                    title=slug.replace('-', ' ').title(),
+                    slug=slug,
+                    author=test_user,
+                    excerpt='Excerpt',
+                    content=content,
+                    category=category,
+                    status=status,
+                    published_date=timezone.now(),
+                )
+                post.tags.add(*tags)
+            return post
+        return _make
+
+    def test_related_posts_ranked_by_similarity(self, make_post, test_tag):
+        """Test shared tags plus category outrank category alone."""
+        from blog.related import get_related_posts
+        post = make_post('first-post', tags=[test_tag])
+        same_category = make_post('same-category')
+        tagged = make_post('tagged-too', tags=[test_tag])
+        assert list(get_related_posts(post)) == [tagged, same_category]
+
+    def test_related_posts_exclude_unrelated_and_drafts(self, make_post):
+        """Test posts with no similarity and unpublished posts are not linked."""
+        from blog.related import get_related_posts
+        other_category = Category.objects.create(name='Elsewhere')
+        post = make_post('first-post', content='<p>Rust ownership rules</p>')
+        make_post('unrelated', category=other_category, content='<p>Baking sourdough bread</p>')
+        make_post('draft-sibling', status='draft')
+        assert list(get_related_posts(post)) == []
+
+    def test_tfidf_links_posts_with_similar_content(self, make_post):
+        """Test content similarity relates posts across categories."""
+        from blog.related import get_related_posts
+        other_category = Category.objects.create(name='Elsewhere')
+        post = make_post('kafka-intro', content='<p>Kafka partitions and consumer groups</p>')
+        similar = make_post('kafka-deep-dive', category=other_category,
+                            content='<p>Tuning Kafka consumer groups and partitions</p>')
+        make_post('gardening', category=other_category, content='<p>Tomatoes need sunlight</p>')
+        assert list(get_related_posts(post))[0] == similar
+
+    def test_related_posts_follow_status_changes(self, make_post, committed):
+        """Test unpublishing a post removes it from its neighbours' lists."""
+        from blog.related import get_related_posts
+        post = make_post('first-post')
+        sibling = make_post('sibling')
+        assert list(get_related_posts(post)) == [sibling]
+        with committed():
+            sibling.status = 'draft'
+            sibling.save()
+        assert not post.related_links.exists()
+
+    def test_related_posts_follow_deletes(self, make_post, committed):
+        """Test deleting a post refreshes the posts that linked to it."""
+        from blog.related import get_related_posts
+        post = make_post('first-post')
+        sibling = make_post('sibling')
+        third = make_post('third')
+        with committed():
+            sibling.delete()
+        assert list(get_related_posts(post)) == [third]
+
+    def test_refresh_waits_for_commit(self, make_post, test_user, test_category,
+                                      django_capture_on_commit_callbacks):
+        """Test nothing is recomputed inside the transaction that changed the post."""
+        post = make_post('first-post')
+        with django_capture_on_commit_callbacks() as callbacks:
+            BlogPost.objects.create(
+                title='Sibling', slug='sibling', author=test_user, content='Plain content',
+                category=test_category, status='published', published_date=timezone.now(),
+            )
+        assert callbacks
+        assert not post.related_links.exists()
+
+    def test_changes_in_one_transaction_share_one_recompute(self, make_post, test_tag, committed,
+                                                            monkeypatch):
+        """Test a save plus tag changes refresh the graph once."""
+        from blog import related
+        post = make_post('first-post')
+        calls = []
+        original = related.refresh_related_for
+        monkeypatch.setattr(related, 'refresh_related_for', lambda ids: calls.append(set(ids)) or original(ids))
+        with committed():
+            post.title = 'Renamed'
+            post.save()
+            post.tags.add(test_tag)
+            make_post('sibling', tags=[test_tag])
+        assert len(calls) == 1
+        assert post.pk in calls[0]
+
+    def test_related_posts_single_query(self, make_post, django_assert_num_queries):
+        """Test reading related posts is one query."""
+        from blog.related import get_related_posts
+        post = make_post('first-post')
+        make_post('sibling')
+        with django_assert_num_queries(1):
+            list(get_related_posts(post))
+
+    def test_rebuild_related_posts_command(self, make_post):
+        """Test the command rebuilds the whole graph."""
+        from io import StringIO
+        from django.core.management import call_command
+        from blog.models import RelatedPost
+        make_post('first-post')
+        make_post('sibling')
+        RelatedPost.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_related_posts', stdout=out)
+        assert RelatedPost.objects.count() == 2
+        assert 'Stored 2 related-post link(s)' in out.getvalue()
+
+    def test_rebuild_related_posts_missing_only(self, make_post):
+        """Test --missing only backfills posts without stored neighbours."""
+        from io import StringIO
+        from django.core.management import call_command
+        from blog.models import RelatedPost
+        post = make_post('first-post')
+        sibling = make_post('sibling')
+        RelatedPost.objects.filter(post=post).delete()
+        out = StringIO()
+        call_command('rebuild_related_posts', '--missing', stdout=out)
+        assert 'Stored 1 related-post link(s)' in out.getvalue()
+        assert list(post.related_links.values_list('related_id', flat=True)) == [sibling.pk]
+        out = StringIO()
+        call_command('rebuild_related_posts', '--missing', stdout=out)
+        assert 'No posts without related posts' in out.getvalue()
+
+
+class TestSeriesNavigation:
+    """Tests for materialized per-category series navigation."""
+
+    @pytest.fixture
+    def series(self, db, test_user, test_category):
+        return [
+            BlogPost.objects.create(
+                title=f'Part {number}',
+                slug=f'part-{number}',
+                author=test_user,
+                excerpt='Excerpt',
+                content='Content',
+                category=test_category,
+                status='published',
+                published_date=timezone.now(),
+                sequence=number,
+            )
+            for number in (1, 2, 3)
+        ]
+
+    def test_navigation_prev_next(self, series):
+        """Test neighbours come from the category order."""
+        from blog.series import get_series_navigation
+        series_posts, prev_post, next_post = get_series_navigation(series[1])
+        assert [sp['slug'] for sp in series_posts] == ['part-1', 'part-2', 'part-3']
+        assert prev_post['slug'] == 'part-1'
+        assert next_post['slug'] == 'part-3'
+
+    def test_navigation_served_from_cache(self, series, django_assert_num_queries):
+        """Test a warm series lookup costs no queries."""
+        from blog.series import get_series_navigation
+        get_series_navigation(series[0])
+        with django_assert_num_queries(0):
+            _, prev_post, next_post = get_series_navigation(series[2])
+        assert prev_post['slug'] == 'part-2'
+        assert next_post is None
+
+    def test_resequencing_invalidates_series(self, series):
+        """Test changing sequence reorders the cached series."""
+        from blog.series import get_series_navigation
+        get_series_navigation(series[0])
+        series[2].sequence = 0
+        series[2].save()
+        series_posts, _, _ = get_series_navigation(series[0])
+        assert [sp['slug'] for sp in series_posts] == ['part-3', 'part-1', 'part-2']
+
+    def test_moving_category_invalidates_both_series(self, series):
+        """Test moving a post drops it from the old series and adds it to the new."""
+        from blog.series import get_series_navigation, get_series
+        other = Category.objects.create(name='Other Series')
+        get_series_navigation(series[0])
+        get_series(other.id)
+        series[1].category = other
+        series[1].save()
+        assert [sp['slug'] for sp in get_series(series[0].category_id)['posts']] == ['part-1', 'part-3']
+        assert [sp['slug'] for sp in get_series(other.id)['posts']] == ['part-2']
+
+    def test_blog_detail_series_context(self, client, series):
+        """Test blog_detail exposes series navigation."""
+        response = client.get(reverse('blog:blog_detail', kwargs={'slug': 'part-2'}))
+        assert response.context['prev_post']['slug'] == 'part-1'
+        assert response.context['next_post']['slug'] == 'part-3'
+        assert len(response.context['series_posts']) == 3
+
+
+class TestDenormalizedCounters:
+    """Tests for the stored like/comment counters on BlogPost."""
+
+    def _comment(self, post, **kwargs):
+        from django.contrib.contenttypes.models import ContentType
+        from comments.models import Comment
+        return Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost),
+            object_id=post.id,
+            content='Counted comment',
+            **kwargs
+        )
+
+    def test_like_count_follows_likes(self, test_user, published_post):
+        """Test likes and unlikes adjust like_count without counting rows."""
+        like = PostLike.objects.create(post=published_post, user=test_user)
+        published_post.refresh_from_db()
+        assert published_post.get_like_count() == 1
+        like.delete()
+        published_post.refresh_from_db()
+        assert published_post.like_count == 0
+
+    def test_comment_count_tracks_approval(self, test_user, published_post):
+        """Test only approved comments are counted, including later approval."""
+        self._comment(published_post, author=test_user)
+        guest = self._comment(published_post, guest_name='Guest', guest_email='g@example.com')
+        published_post.refresh_from_db()
+        assert published_post.comment_count == 1
+        guest.is_approved = True
+        guest.save(update_fields=['is_approved'])
+        published_post.refresh_from_db()
+        assert published_post.comment_count == 2
+        guest.delete()
+        published_post.refresh_from_db()
+        assert published_post.comment_count == 1
+
+    def test_full_save_keeps_counters(self, test_user, published_post):
+        """Test saving a stale instance does not overwrite the counters."""
+        stale = BlogPost.objects.get(pk=published_post.pk)
+        PostLike.objects.create(post=published_post, user=test_user)
+        stale.title = 'Renamed'
+        stale.save()
+        published_post.refresh_from_db()
+        assert published_post.title == 'Renamed'
+        assert published_post.like_count == 1
+
+    def test_toggle_does_not_count_rows(self, client, test_user, published_post):
+        """Test the like toggle reads the stored counter."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        client.force_login(test_user)
+        url = reverse('blog:toggle_post_like', kwargs={'post_slug': published_post.slug})
+        with CaptureQueriesContext(connection) as queries:
+            assert client.post(url).json()['like_count'] == 1
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+    def test_reconcile_counters_command(self, test_user, published_post):
+        """Test reconcile_counters repairs drifted counters."""
+        from io import StringIO
+        from django.core.management import call_command
+        PostLike.objects.create(post=published_post, user=test_user)
+        self._comment(published_post, author=test_user)
+        BlogPost.objects.filter(pk=published_post.pk).update(like_count=7, comment_count=0)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        published_post.refresh_from_db()
+        assert published_post.like_count == 1
+        assert published_post.comment_count == 1
+        assert 'BlogPost.like_count: 1 row(s) corrected' in out.getvalue()
+
+
+class TestLikedByMe:
+    """Tests for the bulk "liked by me" resolver."""
+
+    @pytest.fixture
+    def posts(self, db, test_user, test_category):
+        return [
+            BlogPost.objects.create(
+                title=f'Likeable {number}',
+                slug=f'likeable-{number}',
+                author=test_user,
+                excerpt='Excerpt',
+                content='Content',
+                category=test_category,
+                status='published',
+                published_date=timezone.now(),
+            )
+            for number in range(5)
+        ]
+
+    def _request(self, user):
+        from django.test import RequestFactory
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_get_liked_ids_single_query(self, test_user, posts, django_assert_num_queries):
+        """Test the liked subset is resolved with one query."""
+        from blog.likes import get_liked_ids
+        PostLike.objects.create(post=posts[1], user=test_user)
+        PostLike.objects.create(post=posts[3], user=test_user)
+        with django_assert_num_queries(1):
+            assert get_liked_ids(test_user, 'post', posts) == {posts[1].id, posts[3].id}
+
+    def test_anonymous_user_needs_no_query(self, posts, django_assert_num_queries):
+        """Test anonymous users never like anything and cost no queries."""
+        from django.contrib.auth.models import AnonymousUser
+        from blog.likes import liked_ids_for_request
+        with django_assert_num_queries(0):
+            assert liked_ids_for_request(self._request(AnonymousUser()), 'post', posts) == set()
+
+    def test_request_cache_only_fetches_unseen_ids(self, test_user, posts, django_assert_num_queries):
+        """Test repeated lookups on one request reuse earlier answers."""
+        from blog.likes import is_liked_for_request, liked_ids_for_request
+        PostLike.objects.create(post=posts[0], user=test_user)
+        request = self._request(test_user)
+        with django_assert_num_queries(1):
+            assert liked_ids_for_request(request, 'post', posts[:3]) == {posts[0].id}
+        with django_assert_num_queries(0):
+            assert is_liked_for_request(request, posts[0]) is True
+            assert is_liked_for_request(request, posts[2]) is False
+        with django_assert_num_queries(1):
+            liked_ids_for_request(request, 'post', posts)
+
+    def test_comment_kind(self, test_user, published_post):
+        """Test comment likes are resolved the same way."""
+        from django.contrib.contenttypes.models import ContentType
+        from blog.likes import get_liked_ids
+        from comments.models import Comment, CommentLike
+        comments = [
+            Comment.objects.create(
+                content_type=ContentType.objects.get_for_model(BlogPost),
+                object_id=published_post.id, author=test_user, content=f'Comment {number}'
+            )
+            for number in range(3)
+        ]
+        CommentLike.objects.create(comment=comments[2], user=test_user)
+        assert get_liked_ids(test_user, 'comment', comments) == {comments[2].id}
+
+    def test_template_tags(self, test_user, posts, django_assert_num_queries):
+        """Test liked_ids/is_liked tags render like state at constant query cost."""
+        from django.template import Context, Template
+        PostLike.objects.create(post=posts[4], user=test_user)
+        template = Template(
+            '{% load blog_tags %}{% liked_ids posts as liked %}'
+            '{% for post in posts %}{% if post.id in liked %}Y{% else %}N{% endif %}{% endfor %}'
+            '{% is_liked posts.4 as last %}{{ last }}'
+        )
+        context = Context({'posts': posts, 'request': self._request(test_user)})
+        with django_assert_num_queries(1):
+            assert template.render(context) == 'NNNNYTrue'
+
+    def test_blog_detail_exposes_post_like_state(self, client, test_user, published_post):
+        """Test blog_detail puts the current user's like state in context."""
+        PostLike.objects.create(post=published_post, user=test_user)
+        client.force_login(test_user)
+        response = client.get(reverse('blog:blog_detail', kwargs={'slug': published_post.slug}))
+        assert response.context['post_liked'] is True
+        assert b'post-like-btn liked' in response.content
+
+
+class TestKeysetPagination:
+    """Tests for cursor pagination of post listings."""
+
+    @pytest.fixture
+    def many_posts(self, db, test_user, test_category):
+        from datetime import timedelta
+        now = timezone.now()
+        posts = []
+        for number in range(20):
+            posts.append(BlogPost.objects.create(
+                title=f'Paged {number}',
+                slug=f'paged-{number}',
+                author=test_user,
+                excerpt='Excerpt',
+                content='Content',
+                category=test_category,
+                status='published',
+                # Pairs share a timestamp so ties are broken by id
+                published_date=now - timedelta(hours=number // 2),
+            ))
+        return posts
+
+    def _expected_order(self):
+        return list(BlogPost.objects.filter(status='published').order_by('-published_date', '-id'))
+
+    def test_cursor_walk_visits_every_post_once(self, many_posts):
+        """Test following next cursors yields the full ordering without gaps."""
+        from blog.pagination import KeysetPaginator
+        paginator = KeysetPaginator(BlogPost.objects.filter(status='published'))
+        page = paginator.get_page({})
+        seen = list(page)
+        while page.has_next():
+            page = paginator.get_page({'cursor': page.next_cursor})
+            seen.extend(page)
+        assert seen == self._expected_order()
+        assert page.number == 3
+
+    def test_previous_cursor_returns_same_page(self, many_posts):
+        """Test stepping back reproduces the earlier page."""
+        from blog.pagination import KeysetPaginator
+        paginator = KeysetPaginator(BlogPost.objects.filter(status='published'))
+        first = paginator.get_page({})
+        second = paginator.get_page({'cursor': first.next_cursor})
+        back = paginator.get_page({'cursor': second.previous_cursor})
+        assert list(back) == list(first)
+        assert back.number == 1
+        assert not back.has_previous()
+
+    def test_last_page_seeks_from_the_end(self, many_posts):
+        """Test ?page=last serves the oldest posts without an OFFSET and pages back by cursor."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from blog.pagination import KeysetPaginator
+        paginator = KeysetPaginator(BlogPost.objects.filter(status='published'))
+        with CaptureQueriesContext(connection) as queries:
+            last = paginator.get_page({'page': 'last'})
+        assert not any('OFFSET' in query['sql'] for query in queries.captured_queries)
+        assert list(last) == self._expected_order()[-9:]
+        assert (last.number, last.has_next(), last.has_previous()) == (3, False, True)
+        back = paginator.get_page({'cursor': last.previous_cursor})
+        assert list(back) == self._expected_order()[2:11]
+
+    def test_page_numbers_serve_first_page(self, many_posts):
+        """Test ?page=N no longer jumps with an OFFSET."""
+        from blog.pagination import KeysetPaginator
+        paginator = KeysetPaginator(BlogPost.objects.filter(status='published'))
+        for number in ('2', '99', 'abc'):
+            page = paginator.get_page({'page': number})
+            assert page.number == 1
+            assert list(page) == self._expected_order()[:9]
+
+    def test_invalid_cursor_falls_back_to_first_page(self, many_posts):
+        """Test tampered cursors are ignored."""
+        from blog.pagination import KeysetPaginator
+        paginator = KeysetPaginator(BlogPost.objects.filter(status='published'))
+        assert paginator.get_page({'cursor': 'not-a-cursor'}).number == 1
+
+    def test_cursor_pages_skip_count(self, client, many_posts):
+        """Test cursor pages reuse the cached total instead of counting."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        first = client.get(reverse('blog:blog_list'))
+        cursor = first.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('blog:blog_list'), {'cursor': cursor})
+        assert response.context['page_obj'].number == 2
+        assert not any('"__count"' in query['sql'] for query in queries.captured_queries)
+        assert b'cursor=' in response.content
+
+    def test_published_post_gets_published_date(self, test_user, test_category):
+        """Test publishing without a date stamps one so the post is pageable."""
+        post = BlogPost.objects.create(
+            title='Undated', slug='undated', author=test_user, excerpt='Excerpt',
+            content='Content', category=test_category, status='published'
+        )
+        assert post.published_date is not None
+
+
+class TestTextStats:
+    """Tests for stored word count, reading time and plain excerpt."""
+
+    def _post(self, test_user, **kwargs):
+        defaults = dict(
+            title='Stats post', slug='stats-post', author=test_user, excerpt='',
+            content='', status='published', published_date=timezone.now(),
+        )
+        defaults.update(kwargs)
+        return BlogPost.objects.create(**defaults)
+
+    def test_counts_words_without_markup(self, test_user):
+        """Test tags and attributes are not counted as words."""
+        post = self._post(test_user, content='<p class="lead">Hello <strong style="x">world</strong></p>')
+        assert post.word_count == 2
+        assert post.get_reading_time() == 1
+
+    def test_reading_time_from_word_count(self, test_user):
+        """Test reading time uses 200 words per minute."""
+        post = self._post(test_user, content='<p>' + ' '.join(['word'] * 400) + '</p>')
+        assert post.reading_time == 2
+
+    def test_plain_excerpt(self, test_user):
+        """Test the excerpt is stripped, falls back to the body and is truncated."""
+        post = self._post(test_user, excerpt='<em>Short</em> &amp; sweet', content='<p>Body</p>')
+        assert post.plain_excerpt == 'Short & sweet'
+        long_post = self._post(test_user, slug='long', content='<p>' + 'lorem ' * 200 + '</p>')
+        assert long_post.plain_excerpt.startswith('lorem lorem')
+        assert len(long_post.plain_excerpt) <= 300
+
+    def test_recomputed_only_when_text_changes(self, test_user):
+        """Test saves that touch content refresh the stats, others skip the work."""
+        post = self._post(test_user, content='<p>one two</p>')
+        post.content = '<p>one two three</p>'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        assert post.word_count == 3
+        BlogPost.objects.filter(pk=post.pk).update(word_count=0)
+        post.title = 'Renamed'
+        post.save(update_fields=['title'])
+        post.refresh_from_db()
+        assert post.word_count == 0
+
+    def test_list_page_does_not_load_content(self, client, test_user):
+        """Test listings never select the content column."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self._post(test_user, content='<p>Secret body text</p>')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('blog:blog_list'))
+        assert response.status_code == 200
+        assert not any('"blog_blogpost"."content"' in query['sql'] for query in queries.captured_queries)
+
+    def test_backfill_command(self, test_user):
+        """Test backfill_text_stats recomputes every post."""
+        from io import StringIO
+        from django.core.management import call_command
+        post = self._post(test_user, content='<p>one two three</p>')
+        BlogPost.objects.filter(pk=post.pk).update(word_count=0, reading_time=9, plain_excerpt='')
+        out = StringIO()
+        call_command('backfill_text_stats', '--batch-size', '1', stdout=out)
+        post.refresh_from_db()
+        assert (post.word_count, post.reading_time, post.plain_excerpt) == (3, 1, 'one two three')
+        assert 'Updated text stats for 1 post(s)' in out.getvalue()
+
+
+class TestCardProjection:
+    """Query-budget tests: listings load card columns only, at constant cost."""
+
+    def _add_posts(self, author, category, tag, start, count):
+        for number in range(start, start + count):
+            post = BlogPost.objects.create(
+                title=f'Card {number}', slug=f'card-{number}', author=author,
+                excerpt='Excerpt', content='<p>' + 'long body ' * 500 + '</p>',
+                category=category, status='published', published_date=timezone.now(),
+                is_featured=number % 2 == 0,
+            )
+            post.tags.add(tag)
+
+    def _listing_urls(self, category, tag, author):
+        return [
+            reverse('blog:blog_list'),
+            reverse('blog:category_posts', kwargs={'slug': category.slug}),
+            reverse('blog:tag_posts', kwargs={'slug': tag.slug}),
+            reverse('blog:user_profile', kwargs={'username': author.username}),
+        ]
+
+    def _queries(self, client, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == 200
+        return queries.captured_queries
+
+    def _warm_query_count(self, client, url):
+        self._queries(client, url)  # Fill sidebar/count caches first
+        return len(self._queries(client, url))
+
+    def test_listings_never_load_content(self, client, test_user, test_category, test_tag):
+        """Test no listing query selects the post body."""
+        self._add_posts(test_user, test_category, test_tag, 0, 3)
+        client.force_login(test_user)  # Bypass the anonymous page cache
+        for url in self._listing_urls(test_category, test_tag, test_user):
+            for query in self._queries(client, url):
+                assert '"blog_blogpost"."content"' not in query['sql'], url
+
+    def test_listing_query_count_is_constant(self, client, test_user, test_category, test_tag):
+        """Test card rendering does not lazy-load deferred or related fields."""
+        client.force_login(test_user)
+        self._add_posts(test_user, test_category, test_tag, 0, 2)
+        urls = self._listing_urls(test_category, test_tag, test_user)
+        baseline = {url: self._warm_query_count(client, url) for url in urls}
+        self._add_posts(test_user, test_category, test_tag, 2, 6)
+        for url in urls:
+            assert self._warm_query_count(client, url) == baseline[url], url
+
+    def test_cards_projection(self, published_post, django_assert_num_queries):
+        """Test cards() exposes author and category names in one query."""
+        with django_assert_num_queries(1):
+            card = BlogPost.objects.cards().get(pk=published_post.pk)
+            assert card.author.get_full_name()
+            assert card.category.name == 'Test Category'
+            assert card.get_reading_time() >= 1
+        assert 'content' in card.get_deferred_fields()
+
+
+@pytest.mark.django_db
+class TestTaxonomyCounts:
+    """Tests for the maintained published post counts of categories and tags."""
+
+    def _counts(self):
+        from blog.taxonomy import get_category_cloud, get_tag_cloud
+        return (
+            {c['slug']: c['post_count'] for c in get_category_cloud()},
+            {t['slug']: t['post_count'] for t in get_tag_cloud()},
+        )
+
+    def test_counts_exclude_drafts(self, published_post, draft_post, test_tag):
+        """Test only published posts are counted."""
+        draft_post.tags.add(test_tag)
+        assert self._counts() == ({'test-category': 1}, {'test-tag': 1})
+
+    def test_clouds_served_from_cache(self, published_post, django_assert_num_queries):
+        """Test a warm cloud read costs no queries."""
+        self._counts()
+        with django_assert_num_queries(0):
+            self._counts()
+
+    def test_publish_and_unpublish(self, draft_post, test_tag):
+        """Test publishing adds the post to its category and tags, and back."""
+        draft_post.tags.add(test_tag)
+        assert self._counts() == ({}, {})
+        draft_post.status = 'published'
+        draft_post.save()
+        assert self._counts() == ({'test-category': 1}, {'test-tag': 1})
+        draft_post.status = 'draft'
+        draft_post.save()
+        assert self._counts() == ({}, {})
+
+    def test_category_move(self, published_post, test_category):
+        """Test moving a post transfers its count between categories."""
+        other = Category.objects.create(name='Other', slug='other')
+        published_post.category = other
+        published_post.save()
+        assert self._counts()[0] == {'other': 1}
+        test_category.refresh_from_db()
+        assert test_category.post_count == 0
+
+    def test_tag_changes(self, published_post, test_tag):
+        """Test add, remove and clear of tags on a published post."""
+        other = Tag.objects.create(name='Other Tag', slug='other-tag')
+        published_post.tags.add(other)
+        assert self._counts()[1] == {'test-tag': 1, 'other-tag': 1}
+        published_post.tags.remove(test_tag)
+        assert self._counts()[1] == {'other-tag': 1}
+        published_post.tags.clear()
+        assert self._counts()[1] == {}
+        other.posts.add(published_post)
+        assert self._counts()[1] == {'other-tag': 1}
+        other.posts.clear()
+        assert self._counts()[1] == {}
+
+    def test_delete_and_author_deactivation(self, published_post, test_user):
+        """Test deleting a post or deactivating its author drops the counts."""
+        test_user.is_active = False
+        test_user.save()
+        assert self._counts() == ({}, {})
+        test_user.is_active = True
+        test_user.save()
+        assert self._counts() == ({'test-category': 1}, {'test-tag': 1})
+        published_post.delete()
+        assert self._counts() == ({}, {})
+
+    def test_rename_refreshes_cloud(self, published_post, test_category):
+        """Test editing a category rebuilds the cloud without touching its count."""
+        self._counts()
+        test_category.name = 'Renamed'
+        test_category.save()
+        from blog.taxonomy import get_category_cloud
+        assert get_category_cloud()[0]['name'] == 'Renamed'
+        assert get_category_cloud()[0]['post_count'] == 1
+
+    def test_reconcile_repairs_drift(self, published_post, test_category):
+        """Test recount_taxonomy fixes counts changed behind the signals' back."""
+        from blog.taxonomy import recount_taxonomy
+        Category.objects.filter(pk=test_category.pk).update(post_count=7)
+        assert recount_taxonomy() == {'category': 1, 'tag': 0}
+        assert self._counts()[0] == {'test-category': 1}
+
+
+class TestFeaturedImageVariants:
+    """Tests for building variants of uploaded featured images."""
+
+    def _upload(self, name='cover.jpg'):
+        from io import BytesIO
+        from PIL import Image
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800)).save(buffer, format='JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_builds_variants_after_commit(self, test_user, test_category, settings, tmp_path,
+                                                 django_capture_on_commit_callbacks):
+        """Test a new featured image gets variants once the post is saved."""
+        from django.core.files.storage import storages
+        settings.MEDIA_ROOT = str(tmp_path)
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            post = BlogPost.objects.create(
+                title='Image Post', slug='image-post', author=test_user, content='Body',
+                category=test_category, featured_image=self._upload(),
+            )
+        assert len([callback for callback in callbacks if 'schedule_variants' in callback.__qualname__]) == 1
+        assert storages['default'].exists(f'{post.featured_image.name}.variants.json')
+
+        # Saving again without a new upload does not rebuild
+        with django_capture_on_commit_callbacks() as callbacks:
+            post.title = 'Renamed'
+            post.save()
+        assert not [callback for callback in callbacks if 'schedule_variants' in callback.__qualname__]
+
+    def test_backfill_command(self, test_user, test_category, settings, tmp_path):
+        """Test the command builds variants for featured images and CKEditor uploads, not thumbnails."""
+        from io import StringIO
+        from django.core.files.storage import storages
+        from django.core.management import call_command
+        settings.MEDIA_ROOT = str(tmp_path)
+        storage = storages['default']
+        storage.save('blog/featured/existing.jpg', self._upload())
+        storage.save('blog/uploads/2026/01/inline.jpg', self._upload())
+        storage.save('blog/uploads/2026/01/inline_thumb.jpg', self._upload())
+        BlogPost.objects.create(
+            title='Backfill', slug='backfill', author=test_user, content='Body',
+            category=test_category, featured_image='blog/featured/existing.jpg',
+        )
+        BlogPost.objects.create(
+            title='Missing', slug='missing', author=test_user, content='Body',
+            category=test_category, featured_image='blog/featured/missing.jpg',
+        )
+        out = StringIO()
+        err = StringIO()
+        call_command('generate_image_variants', stdout=out, stderr=err)
+        assert storage.exists('blog/featured/existing.jpg.w480.jpg')
+        assert storage.exists('blog/uploads/2026/01/inline.jpg.w480.jpg')
+        assert not storage.exists('blog/uploads/2026/01/inline_thumb.jpg.w480.jpg')
+        assert 'Processed 2 image(s), 1 failed' in out.getvalue()
+        assert 'missing.jpg' in err.getvalue()
@@ -14,5 +14,6 @@ urlpatterns = [
     path('user/<str:username>/', views.user_profile, name='user_profile'),
     path('notifications/', views.notifications, name='notifications'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
+    path('notifications/unread-count/', views.unread_notification_count, name='unread_notification_count'),
     path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
 ]
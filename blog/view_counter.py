@@ -0,0 +1,188 @@
+"""
+Buffered view counter for blog posts.
+
+Page views are counted in the configured cache (Redis in production,
+LocMem in development) instead of issuing an UPDATE per request. The
+pending deltas are flushed to ``BlogPost.views`` in a single bulk UPDATE
+using ``F()`` expressions by the ``flush_post_views`` worker, never from
+the request path.
+
+Posts with pending views are tracked as a dirty log, like the OTP audit log
+(see ``emails_otp.audit``): a post is appended under an increasing sequence
+number when its counter goes from nothing to one, or when views arrive
+while it is being flushed. A flush only reads the posts logged since the
+last flush instead of every post.
+
+A number is taken (``incr``) before its entry is written, so a flush can
+see a number whose entry is not there yet. The flushed mark therefore only
+advances over the contiguous run of entries actually read; a missing entry
+is retried on the next flush, and only given up on (evicted, or its writer
+died) once it has been missing for ``BLOG_VIEW_DIRTY_GAP_TIMEOUT`` seconds.
+``flush_post_views --all`` recovers anything given up on.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+
+VIEW_KEY_PREFIX = 'blog:views:'
+DIRTY_SEQUENCE_KEY = 'blog:views:dirty:last'
+DIRTY_FLUSHED_KEY = 'blog:views:dirty:flushed'
+DIRTY_GAP_KEY = 'blog:views:dirty:gap'
+FLUSH_LOCK_KEY = 'blog:views:flush-lock'
+
+FLUSH_BATCH_SIZE = getattr(settings, 'BLOG_VIEW_FLUSH_BATCH_SIZE', 500)
+DIRTY_GAP_TIMEOUT = getattr(settings, 'BLOG_VIEW_DIRTY_GAP_TIMEOUT', 300)
+
+
+def _view_key(post_id):
+    return f'{VIEW_KEY_PREFIX}{post_id}'
+
+
+def _dirty_key(number):
+    return f'blog:views:dirty:{number}'
+
+
+def _next_dirty_number():
+    try:
+        return cache.incr(DIRTY_SEQUENCE_KEY)
+    except ValueError:  # First use, or evicted
+        pass
+    number = cache.get(DIRTY_FLUSHED_KEY, 0) + 1
+    if cache.add(DIRTY_SEQUENCE_KEY, number, timeout=None):
+        return number
+    try:
+        return cache.incr(DIRTY_SEQUENCE_KEY)  # Seeded concurrently
+    except ValueError:
+        return None
+
+
+def _mark_dirty(post_id):
+    number = _next_dirty_number()
+    if number is not None:
+        cache.set(_dirty_key(number), post_id, timeout=None)
+
+
+def record_view(post_id):
+    """Count a view for ``post_id`` in the cache and return the pending delta."""
+    key = _view_key(post_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        pending = cache.incr(key)
+    except ValueError:
+        # Key was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+        pending = 1
+
+    if pending == 1:
+        _mark_dirty(post_id)
+    return pending
+
+
+def get_pending_views(post_id):
+    """Return the number of views recorded for ``post_id`` but not yet flushed."""
+    return cache.get(_view_key(post_id)) or 0
+
+
+def flush_views(post_ids=None):
+    """
+    Write buffered view deltas to the database.
+
+    Only the amount read from the cache is subtracted afterwards, so views
+    recorded while the flush is running are kept for the next flush.
+
+    Args:
+        post_ids: posts to flush; defaults to the posts in the dirty log
+
+    Returns:
+        tuple: (posts_updated: int, views_flushed: int)
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=60):
+        return 0, 0  # Another process is flushing
+    try:
+        if post_ids is not None:
+            return _flush(post_ids)
+        last = cache.get(DIRTY_SEQUENCE_KEY, 0)
+        flushed = cache.get(DIRTY_FLUSHED_KEY, 0)
+        if last <= flushed:
+            return 0, 0
+        entries = cache.get_many([_dirty_key(number) for number in range(flushed + 1, last + 1)])
+        result = _flush(sorted(set(entries.values())))
+        done = _contiguous_end(flushed, last, entries)
+        cache.set(DIRTY_FLUSHED_KEY, done, timeout=None)
+        # Entries past a gap stay, so the next flush reads them again
+        cache.delete_many([_dirty_key(number) for number in range(flushed + 1, done + 1)])
+        return result
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _contiguous_end(flushed, last, entries):
+    """Return the highest number up to which every entry was read or given up on."""
+    done = flushed
+    for number in range(flushed + 1, last + 1):
+        if _dirty_key(number) not in entries and not _gap_expired(number):
+            break
+        done = number
+    return done
+
+
+def _gap_expired(number):
+    """Whether entry ``number`` has been missing for longer than DIRTY_GAP_TIMEOUT."""
+    now = time.time()
+    gap = cache.get(DIRTY_GAP_KEY)
+    if gap and gap[0] == number:
+        return now - gap[1] >= DIRTY_GAP_TIMEOUT
+    cache.set(DIRTY_GAP_KEY, (number, now), timeout=None)
+    return False
+
+
+def _flush(post_ids):
+    posts_updated = 0
+    views_flushed = 0
+    batch = []
+    for post_id in post_ids:
+        batch.append(post_id)
+        if len(batch) >= FLUSH_BATCH_SIZE:
+            updated, flushed = _flush_batch(batch)
+            posts_updated += updated
+            views_flushed += flushed
+            batch = []
+    if batch:
+        updated, flushed = _flush_batch(batch)
+        posts_updated += updated
+        views_flushed += flushed
+
+    return posts_updated, views_flushed
+
+
+def _flush_batch(post_ids):
+    from .models import BlogPost
+
+    keys = {_view_key(post_id): post_id for post_id in post_ids}
+    deltas = {
+        keys[key]: delta
+        for key, delta in cache.get_many(list(keys)).items()
+        if delta
+    }
+    if not deltas:
+        return 0, 0
+
+    BlogPost.objects.filter(pk__in=deltas).update(
+        views=F('views') + Case(
+            *[When(pk=post_id, then=Value(delta)) for post_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+    for post_id, delta in deltas.items():
+        try:
+            remaining = cache.decr(_view_key(post_id), delta)
+        except ValueError:
+            continue
+        if remaining > 0:
+            _mark_dirty(post_id)  # Viewed during the flush
+
+    return len(deltas), sum(deltas.values())
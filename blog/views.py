@@ -1,44 +1,32 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Prefetch
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from .likes import liked_ids_for_request, remember_liked
 from .models import BlogPost, Category, Tag, PostLike
-from comments.models import Comment, CommentLike, Notification
+from .pagination import POSTS_PER_PAGE, KeysetPaginator
+from .related import get_related_posts
+from .search import search_posts
+from .series import get_series_navigation
+from .sidebar import get_sidebar_categories, get_sidebar_version
+from .taxonomy import get_category_cloud, get_tag_cloud
+from comments.models import MAX_THREAD_DEPTH, Comment, CommentLike, Notification
+from comments.notifications import dispatch_pending
+from comments.unread import get_unread_count, reset_unread
+from comments.tree import iter_tree, load_comment_tree
 from account.models import Account
+from arpansahu_dot_me.page_cache import SECTION_BLOG, cache_anonymous_page
 
 
-def _get_sidebar_categories(current_post=None):
-    """Build sidebar data: categories with their posts in sequence order."""
-    categories_with_posts = Category.objects.prefetch_related(
-        Prefetch(
-            'posts',
-            queryset=BlogPost.objects.filter(
-                status='published',
-                author__is_active=True
-            ).order_by('sequence', 'published_date').only(
-                'id', 'title', 'slug', 'sequence', 'category_id'
-            ),
-            to_attr='ordered_posts'
-        )
-    ).annotate(
-        published_post_count=Count(
-            'posts',
-            filter=Q(posts__status='published', posts__author__is_active=True)
-        )
-    ).filter(published_post_count__gt=0).order_by('name')
-
-    return categories_with_posts
-
-
+@cache_anonymous_page(SECTION_BLOG)
 def blog_list(request):
     """List all published blog posts"""
     # Only show posts from active authors
     posts = BlogPost.objects.filter(
         status='published',
         author__is_active=True
-    ).select_related('author', 'category').prefetch_related('tags')
+    ).cards()
     
     # Filter by category
     category_slug = request.GET.get('category')
@@ -53,26 +41,28 @@ def blog_list(request):
     # Search
     search_query = request.GET.get('q')
     if search_query:
-        posts = posts.filter(
-            Q(title__icontains=search_query) |
-            Q(content__icontains=search_query) |
-            Q(excerpt__icontains=search_query)
-        )
+        posts = search_posts(posts, search_query)
     
-    # Pagination
-    paginator = Paginator(posts, 9)  # 9 posts per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination: relevance-ordered search results keep offset pages,
+    # date-ordered listings seek on (published_date, id)
+    if search_query:
+        paginator = Paginator(posts, POSTS_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        paginator = KeysetPaginator(posts, count_key=f'list:{category_slug or ""}:{tag_slug or ""}')
+        page_obj = paginator.get_page(request.GET)
     
-    # Get all categories and tags for sidebar
-    categories = Category.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0)
-    tags = Tag.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0)
+    # Category and tag clouds with published post counts (cached)
+    categories = get_category_cloud()
+    tags = get_tag_cloud()
     
     # Get featured posts (only from active authors)
-    featured_posts = BlogPost.objects.filter(status='published', is_featured=True, author__is_active=True)[:3]
+    featured_posts = BlogPost.objects.filter(
+        status='published', is_featured=True, author__is_active=True
+    ).cards()[:3]
     
     # Sidebar: categories with ordered posts
-    sidebar_categories = _get_sidebar_categories()
+    sidebar_categories = get_sidebar_categories()
     
     context = {
         'page_obj': page_obj,
@@ -81,6 +71,7 @@ def blog_list(request):
         'featured_posts': featured_posts,
         'search_query': search_query,
         'sidebar_categories': sidebar_categories,
+        'sidebar_version': get_sidebar_version(),
     }
     
     return render(request, 'blog/blog_list.html', context)
@@ -98,65 +89,33 @@ def blog_detail(request, slug):
     # Increment views
     post.increment_views()
     
-    # Get approved comments (only top-level, replies will be nested)
-    approved_comments = post.comments.filter(is_approved=True, parent=None).select_related('author').prefetch_related('replies__author')
+    # Get approved comments as a tree (top-level comments with nested .children, one query)
+    approved_comments = load_comment_tree(post, request.user)
+    # The tree already carries the user's like state; share it with the like helpers
+    remember_liked(request, 'comment', {
+        comment.id: comment.liked_by_user for comment in iter_tree(approved_comments)
+    })
     
-    # Get related posts (same category or tags, only from active authors)
-    related_posts = BlogPost.objects.filter(
-        status='published',
-        author__is_active=True
-    ).filter(
-        Q(category=post.category) | Q(tags__in=post.tags.all())
-    ).exclude(
-        id=post.id
-    ).distinct()[:5]
+    # Get related posts (precomputed by blog.related, single indexed lookup)
+    related_posts = get_related_posts(post)
     
-    # Get all categories for sidebar
-    categories = Category.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0)
+    # Categories with published posts (cached)
+    categories = get_category_cloud()
     
     # Sidebar: categories with ordered posts
-    sidebar_categories = _get_sidebar_categories(current_post=post)
-    
-    # Find previous and next posts within same category (series)
-    prev_post = None
-    next_post = None
-    series_posts = []
-    if post.category:
-        same_category_posts = list(BlogPost.objects.filter(
-            status='published',
-            author__is_active=True,
-            category=post.category
-        ).order_by('sequence', 'published_date').values_list('id', 'title', 'slug', flat=False))
-        
-        # Build series_posts list with current flag
-        for i, (pid, ptitle, pslug) in enumerate(same_category_posts):
-            series_posts.append({
-                'title': ptitle,
-                'slug': pslug,
-                'is_current': pid == post.id,
-                'number': i + 1,
-            })
-        
-        current_index = None
-        for i, (pid, ptitle, pslug) in enumerate(same_category_posts):
-            if pid == post.id:
-                current_index = i
-                break
-        
-        if current_index is not None:
-            if current_index > 0:
-                p = same_category_posts[current_index - 1]
-                prev_post = {'title': p[1], 'slug': p[2]}
-            if current_index < len(same_category_posts) - 1:
-                n = same_category_posts[current_index + 1]
-                next_post = {'title': n[1], 'slug': n[2]}
+    sidebar_categories = get_sidebar_categories()
+    
+    # Series navigation within the category (materialized per category)
+    series_posts, prev_post, next_post = get_series_navigation(post)
     
     context = {
         'post': post,
         'approved_comments': approved_comments,
+        'post_liked': post.pk in liked_ids_for_request(request, 'post', [post]),
         'related_posts': related_posts,
         'categories': categories,
         'sidebar_categories': sidebar_categories,
+        'sidebar_version': get_sidebar_version(),
         'prev_post': prev_post,
         'next_post': next_post,
         'series_posts': series_posts,
@@ -188,6 +147,12 @@ def add_comment(request, post_slug):
         parent = None
         if parent_id:
             parent = get_object_or_404(Comment, id=parent_id)
+            if parent.depth >= MAX_THREAD_DEPTH:
+                error = 'This thread is nested too deeply to reply to.'
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({'success': False, 'error': error})
+                messages.error(request, error)
+                return redirect('blog:blog_detail', slug=post_slug)
         
         # Handle both logged-in and guest users
         if request.user.is_authenticated:
@@ -255,9 +220,10 @@ def toggle_post_like(request, post_slug):
         else:
             liked = True
         
+        post.refresh_from_db(fields=['like_count'])
         return JsonResponse({
             'liked': liked,
-            'like_count': post.get_like_count()
+            'like_count': post.like_count
         })
     
     return JsonResponse({'error': 'Invalid request'}, status=400)
@@ -276,22 +242,23 @@ def toggle_comment_like(request, comment_id):
         else:
             liked = True
         
+        comment.refresh_from_db(fields=['like_count'])
         return JsonResponse({
             'liked': liked,
-            'like_count': comment.get_like_count()
+            'like_count': comment.like_count
         })
     
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
+@cache_anonymous_page(SECTION_BLOG)
 def category_posts(request, slug):
     """List posts by category"""
     category = get_object_or_404(Category, slug=slug)
-    posts = BlogPost.objects.filter(status='published', category=category).select_related('author', 'category')
+    posts = BlogPost.objects.filter(status='published', category=category).cards()
     
-    paginator = Paginator(posts, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(posts, count_key=f'category:{category.pk}')
+    page_obj = paginator.get_page(request.GET)
     
     context = {
         'category': category,
@@ -301,14 +268,14 @@ def category_posts(request, slug):
     return render(request, 'blog/category_posts.html', context)
 
 
+@cache_anonymous_page(SECTION_BLOG)
 def tag_posts(request, slug):
     """List posts by tag"""
     tag = get_object_or_404(Tag, slug=slug)
-    posts = BlogPost.objects.filter(status='published', tags=tag).select_related('author', 'category')
+    posts = BlogPost.objects.filter(status='published', tags=tag).cards()
     
-    paginator = Paginator(posts, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(posts, count_key=f'tag:{tag.pk}')
+    page_obj = paginator.get_page(request.GET)
     
     context = {
         'tag': tag,
@@ -323,7 +290,7 @@ def user_profile(request, username):
     user = get_object_or_404(Account, username=username)
     
     # Get user's published posts
-    posts = BlogPost.objects.filter(author=user, status='published').order_by('-published_date')[:10]
+    posts = BlogPost.objects.filter(author=user, status='published').cards().order_by('-published_date')[:10]
     
     # Get user's approved comments (without select_related since GenericForeignKey)
     comments = Comment.objects.filter(author=user, is_approved=True).select_related('author', 'content_type').order_by('-created_at')[:20]
@@ -348,11 +315,11 @@ def user_profile(request, username):
 @login_required
 def notifications(request):
     """Display user notifications"""
-    user_notifications = request.user.notifications.all()[:50]
+    # Don't make the user wait for the worker to see their own queued events
+    dispatch_pending(recipient=request.user)
     
-    # Mark as read
-    unread = user_notifications.filter(is_read=False)
-    unread_count = unread.count()
+    user_notifications = Notification.objects.filter(recipient=request.user)[:50]
+    unread_count = get_unread_count(request.user)
     
     context = {
         'notifications': user_notifications,
@@ -366,17 +333,23 @@ def notifications(request):
 def mark_notification_read(request, notification_id):
     """Mark a notification as read"""
     notification = get_object_or_404(Notification, id=notification_id, recipient=request.user)
-    notification.is_read = True
-    notification.save()
+    notification.mark_as_read()
     
     return redirect(notification.get_url())
 
 
+@login_required
+def unread_notification_count(request):
+    """Unread notification count for the header badge (served from cache)"""
+    return JsonResponse({'unread': get_unread_count(request.user)})
+
+
 @login_required
 def mark_all_notifications_read(request):
     """Mark all notifications as read"""
     if request.method == 'POST':
-        request.user.notifications.filter(is_read=False).update(is_read=True)
+        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        reset_unread(request.user.pk)
         messages.success(request, 'All notifications marked as read.')
     
     return redirect('blog:notifications')
@@ -0,0 +1,208 @@
+"""
+Concurrent service health checks.
+
+Each check is a small function that raises on failure. ``run_checks``
+runs the requested checks at the same time on a shared thread pool, and
+gives each one ``CHECK_TIMEOUT`` seconds, so the slowest dependency bounds
+the total time instead of the sum of all of them.
+
+A check that overruns is reported as timed out but keeps its pool
+worker until it returns, so the database and cache checks use their own
+connections with connect and socket timeouts of the same length; a hung
+dependency cannot pile up stuck workers.
+
+``get_readiness`` serves the ``/readyz`` probe. It keeps the last result
+in process memory for ``CACHE_TTL`` seconds (the shared cache is itself a
+dependency under test) and lets only one thread refresh at a time, so
+frequent or overlapping probes never stack up on the database. The probe
+is reachable through nginx, so its report carries only ok/latency per
+check; error details are logged.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CHECK_TIMEOUT = getattr(settings, 'HEALTH_CHECK_TIMEOUT', 3)
+CACHE_TTL = getattr(settings, 'HEALTH_CHECK_CACHE_TTL', 10)
+# Checks that must pass for the pod to receive traffic; the rest are reported only
+READINESS_CHECKS = getattr(settings, 'HEALTH_READINESS_CHECKS', ('database', 'cache'))
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='health-check')
+_refresh_lock = threading.Lock()
+_readiness = {'result': None, 'expires': 0.0}
+
+
+def check_database():
+    from django.db import connections
+    # A dedicated connection, so the timeouts below never apply to requests
+    connection = connections.create_connection('default')
+    if connection.vendor == 'postgresql':
+        options = dict(connection.settings_dict.get('OPTIONS', {}))
+        options['connect_timeout'] = max(2, int(CHECK_TIMEOUT))  # libpq minimum
+        statement_timeout = f'-c statement_timeout={int(CHECK_TIMEOUT * 1000)}'
+        options['options'] = f"{options.get('options', '')} {statement_timeout}".strip()
+        connection.settings_dict = {**connection.settings_dict, 'OPTIONS': options}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    finally:
+        connection.close()
+
+
+_check_cache = None
+
+
+def _get_check_cache():
+    """The default cache, built separately with ``CHECK_TIMEOUT`` socket timeouts for Redis."""
+    global _check_cache
+    if _check_cache is None:
+        params = dict(settings.CACHES['default'])
+        backend = params.pop('BACKEND')
+        if backend.startswith('django_redis.'):
+            params['OPTIONS'] = {
+                **params.get('OPTIONS', {}),
+                'SOCKET_CONNECT_TIMEOUT': CHECK_TIMEOUT,
+                'SOCKET_TIMEOUT': CHECK_TIMEOUT,
+            }
+        _check_cache = import_string(backend)(params.pop('LOCATION', ''), params)
+    return _check_cache
+
+
+def check_cache():
+    cache = _get_check_cache()
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, 1, timeout=10)
+    try:
+        if cache.get(key) != 1:
+            raise RuntimeError('value written to the cache could not be read back')
+    finally:
+        cache.delete(key)
+
+
+def check_storage():
+    from django.core.files.storage import default_storage
+    default_storage.exists('health-check')
+
+
+def check_mailjet():
+    from mailer import mailjet
+    response = mailjet.request('GET', 'REST/sender', params={'Limit': 1})
+    if response.status_code != 200:
+        raise RuntimeError(f'HTTP {response.status_code}')
+
+
+def check_harbor():
+    import requests
+    url = getattr(settings, 'HARBOR_URL', 'https://harbor.arpansahu.space')
+    response = requests.get(f'{url}/api/v2.0/health', timeout=CHECK_TIMEOUT)
+    unhealthy = [
+        component.get('name') for component in response.json().get('components', [])
+        if component.get('status') != 'healthy'
+    ]
+    if response.status_code != 200 or unhealthy:
+        raise RuntimeError(f'HTTP {response.status_code}, unhealthy: {", ".join(unhealthy) or "none"}')
+
+
+def check_sentry():
+    import sentry_sdk
+    if not getattr(settings, 'SENTRY_DSH_URL', None):
+        raise RuntimeError('SENTRY_DSH_URL not configured')
+    if not sentry_sdk.get_client().is_active():
+        raise RuntimeError('Sentry SDK is not active')
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'storage': check_storage,
+    'sentry': check_sentry,
+    'mailjet': check_mailjet,
+    'harbor': check_harbor,
+}
+
+
+def _timed(check):
+    started = time.perf_counter()
+    try:
+        check()
+        error = None
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'[:300]
+    return error, (time.perf_counter() - started) * 1000
+
+
+def run_checks(names=None, timeout=None):
+    """
+    Run checks concurrently.
+
+    Args:
+        names: check names from ``CHECKS`` (default: all)
+        timeout: seconds each check may take (default ``CHECK_TIMEOUT``)
+
+    Returns:
+        dict: name -> {'ok': bool, 'latency_ms': float, 'error': str or None}
+    """
+    names = list(names or CHECKS)
+    timeout = CHECK_TIMEOUT if timeout is None else timeout
+    started = time.perf_counter()
+    futures = {name: _executor.submit(_timed, CHECKS[name]) for name in names}
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            error, latency_ms = future.result()
+        else:  # Left running; its worker is freed when it returns
+            error, latency_ms = f'timed out after {timeout}s', (time.perf_counter() - started) * 1000
+        results[name] = {'ok': error is None, 'latency_ms': round(latency_ms, 1), 'error': error}
+    return results
+
+
+def get_readiness(force=False):
+    """
+    Return the (cached) readiness report.
+
+    Returns:
+        dict: {'status': 'ok' or 'fail', 'checked_at': ISO time,
+               'checks': {name: {'ok': bool, 'latency_ms': float}}}
+    """
+    cached = _readiness['result']
+    if not force and cached and time.monotonic() < _readiness['expires']:
+        return cached
+
+    # One refresh at a time; other probes get the previous report meanwhile
+    if not _refresh_lock.acquire(blocking=cached is None):
+        return cached
+    try:
+        if not force and _readiness['result'] is not cached:
+            return _readiness['result']  # Refreshed while we waited
+        checks = run_checks(READINESS_CHECKS)
+        for name, check in checks.items():
+            if not check['ok']:
+                logger.warning('Readiness check %s failed: %s', name, check['error'])
+        report = {
+            'status': 'ok' if all(check['ok'] for check in checks.values()) else 'fail',
+            'checked_at': timezone.now().isoformat(),
+            # Errors can name internal hosts and addresses; keep them in the logs
+            'checks': {
+                name: {'ok': check['ok'], 'latency_ms': check['latency_ms']} for name, check in checks.items()
+            },
+        }
+        _readiness.update(result=report, expires=time.monotonic() + CACHE_TTL)
+        return report
+    finally:
+        _refresh_lock.release()
+
+
+def reset_readiness():
+    """Drop the cached readiness report."""
+    _readiness.update(result=None, expires=0.0)
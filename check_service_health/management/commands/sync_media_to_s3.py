@@ -1,55 +1,84 @@
+"""
+Management command to sync local media files to S3/MinIO incrementally.
+
+Only files that changed since they were last uploaded are sent (see
+``check_service_health.media_sync``).
+
+Usage:
+    python manage.py sync_media_to_s3
+    python manage.py sync_media_to_s3 --dry-run
+    python manage.py sync_media_to_s3 --delete --workers 20
+"""
 import os
+
 import boto3
 import certifi
-from django.core.management.base import BaseCommand
+from botocore.config import Config
 from django.conf import settings
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import logging
+from django.core.management.base import BaseCommand, CommandError
 
+from check_service_health.media_sync import format_summary, sync_media
 
 
 class Command(BaseCommand):
-    help = 'Sync local media files to S3 and update file URLs'
+    help = 'Upload new and changed media files to S3 and optionally delete removed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=10,
+            help='Files uploaded concurrently'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report what would be uploaded or deleted'
+        )
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Delete objects under the media prefix that were synced from here and no longer '
+                 'exist locally (objects uploaded straight to the bucket are kept)'
+        )
+        parser.add_argument(
+            '--manifest', default=os.path.join(settings.BASE_DIR, '.media_sync_manifest.json'),
+            help='Where to keep the local file manifest between runs'
+        )
 
-    def handle(self, *args, **kwargs):
-        # Initialize the S3 client with the MinIO endpoint
-        s3_client = boto3.client(
+    def get_client(self, workers):
+        return boto3.client(
             's3',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             endpoint_url=settings.AWS_S3_ENDPOINT_URL,
             use_ssl=True,
             verify=certifi.where(),
+            config=Config(max_pool_connections=workers * 4),  # 4 parts per multipart upload
+        )
+
+    def handle(self, *args, **options):
+        prefix = getattr(settings, 'AWS_PUBLIC_MEDIA_LOCATION', None)
+        if not prefix:
+            raise CommandError('AWS_PUBLIC_MEDIA_LOCATION is not set (is USE_S3 enabled?)')
+
+        summary = sync_media(
+            self.get_client(options['workers']),
+            bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            prefix=prefix,
+            root=settings.MEDIA_ROOT,
+            manifest_path=options['manifest'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+            delete=options['delete'],
         )
 
-        # Define local media directory and S3 bucket name
-        local_media_dir = settings.MEDIA_ROOT
-        bucket_name = settings.AWS_STORAGE_BUCKET_NAME
-
-        # Set up logging
-        logging.basicConfig(level=logging.INFO)
-        logger = logging.getLogger(__name__)
-
-        def upload_file(local_path, s3_path):
-            try:
-                s3_client.upload_file(local_path, bucket_name, s3_path)
-                logger.info(f'Successfully uploaded {s3_path}')
-            except Exception as e:
-                logger.error(f'Failed to upload {s3_path}: {str(e)}')
-
-        # Gather all file paths
-        files_to_upload = []
-        for root, dirs, files in os.walk(local_media_dir):
-            for filename in files:
-                local_path = os.path.join(root, filename)
-                relative_path = os.path.relpath(local_path, local_media_dir)
-                s3_path = os.path.join(settings.AWS_PUBLIC_MEDIA_LOCATION, relative_path)
-                files_to_upload.append((local_path, s3_path))
-
-        # Upload files using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(upload_file, local_path, s3_path) for local_path, s3_path in files_to_upload]
-            for future in as_completed(futures):
-                future.result()  # This will re-raise any exceptions caught during upload
-
-        logger.info('Media files have been synced to S3.')
\ No newline at end of file
+        if options['dry_run'] and options['verbosity'] > 1:
+            for relative in summary['planned']['upload']:
+                self.stdout.write(f'  upload {relative}')
+            for relative in summary['planned']['delete']:
+                self.stdout.write(f'  delete {relative}')
+        for line in format_summary(summary):
+            self.stdout.write(line)
+
+        if summary['failed']:
+            for relative, error in sorted(summary['failed'].items()):
+                self.stderr.write(f'  {relative}: {error}')
+            raise CommandError(f'{len(summary["failed"])} file(s) failed to sync')
+        self.stdout.write(self.style.SUCCESS('Media files have been synced to S3.'))
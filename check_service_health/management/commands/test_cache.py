@@ -9,7 +9,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         # Set a value in the cache
-        cache.set('test_key', 'test_value', timeout=10)  # Cache the value for 10 seconds
+        cache.set('test_key', 'test_value', timeout=1)  # Cache the value for 1 second
         value = cache.get('test_key')
         self.stdout.write(f'Initial cache set: {value}')  # Should output 'test_value'
 
@@ -17,12 +17,12 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Initial cache set failed'))
             return
 
-        # Wait for 12 seconds to ensure cache expiration
-        time.sleep(12)
+        # Wait for 2 seconds to ensure cache expiration
+        time.sleep(2)
 
         # Try to retrieve the value again after the timeout
         value = cache.get('test_key')
-        self.stdout.write(f'Value after 12 seconds: {value}')  # Should output None
+        self.stdout.write(f'Value after 2 seconds: {value}')  # Should output None
 
         if value is None:
             self.stdout.write(self.style.SUCCESS('Cache has expired as expected'))
@@ -2,7 +2,7 @@
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from mailjet_rest import Client
+from mailer import mailjet
 
 
 class Command(BaseCommand):
@@ -39,20 +39,18 @@ class Command(BaseCommand):
             self.stdout.write(f'Sender Email: {sender_email}')
             self.stdout.write(f'Admin Email: {my_email}')
             
-            # Initialize Mailjet client
+            # Initialize the shared Mailjet session
             self.stdout.write('\nInitializing Mailjet client...')
-            mailjet = Client(auth=(api_key, api_secret), version='v3.1')
+            mailjet.get_session()
             self.stdout.write(self.style.SUCCESS('✓ Mailjet client initialized'))
             
             # Test API connectivity by getting sender addresses
             self.stdout.write('\nTesting API connectivity...')
             
             # Use v3 API to list senders (verifies credentials)
-            mailjet_v3 = Client(auth=(api_key, api_secret), version='v3')
-            
             try:
                 # Get account profile to verify API access
-                result = mailjet_v3.sender.get()
+                result = mailjet.request('GET', 'REST/sender')
                 
                 if result.status_code == 200:
                     self.stdout.write(self.style.SUCCESS('✓ API credentials validated'))
@@ -79,7 +77,7 @@ class Command(BaseCommand):
             
             # Check API statistics (another way to verify connectivity)
             try:
-                stats_result = mailjet_v3.statcounters.get()
+                stats_result = mailjet.request('GET', 'REST/statcounters')
                 if stats_result.status_code == 200:
                     self.stdout.write(self.style.SUCCESS('✓ API statistics endpoint accessible'))
                     stats = stats_result.json().get('Data', [{}])
@@ -101,28 +99,26 @@ class Command(BaseCommand):
                     from datetime import datetime
                     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     
-                    data = {
-                        'Messages': [
-                            {
-                                "From": {
-                                    "Email": sender_email or "admin@arpansahu.space",
-                                    "Name": "Health Check"
-                                },
-                                "To": [
-                                    {
-                                        "Email": my_email,
-                                        "Name": "Admin"
-                                    }
-                                ],
-                                "Subject": f"Health Check Test - {timestamp}",
-                                "TextPart": f"This is a test email from arpansahu.space health check system.\n\nTimestamp: {timestamp}",
-                                "HTMLPart": f"<h3>Health Check Test</h3><p>This is a test email from <strong>arpansahu.space</strong> health check system.</p><p>Timestamp: {timestamp}</p>",
-                                "CustomID": f"health_check_{timestamp.replace(' ', '_').replace(':', '-')}"
-                            }
-                        ]
-                    }
+                    messages = [
+                        {
+                            "From": {
+                                "Email": sender_email or "admin@arpansahu.space",
+                                "Name": "Health Check"
+                            },
+                            "To": [
+                                {
+                                    "Email": my_email,
+                                    "Name": "Admin"
+                                }
+                            ],
+                            "Subject": f"Health Check Test - {timestamp}",
+                            "TextPart": f"This is a test email from arpansahu.space health check system.\n\nTimestamp: {timestamp}",
+                            "HTMLPart": f"<h3>Health Check Test</h3><p>This is a test email from <strong>arpansahu.space</strong> health check system.</p><p>Timestamp: {timestamp}</p>",
+                            "CustomID": f"health_check_{timestamp.replace(' ', '_').replace(':', '-')}"
+                        }
+                    ]
                     
-                    result = mailjet.send.create(data=data)
+                    result = mailjet.send(messages)
                     
                     if result.status_code == 200:
                         self.stdout.write(self.style.SUCCESS(f'✓ Test email sent successfully to {my_email}'))
@@ -137,6 +133,9 @@ class Command(BaseCommand):
             else:
                 self.stdout.write('\n(Use --send-test flag to send an actual test email)')
             
+            for endpoint, stats in mailjet.get_metrics().items():
+                self.stdout.write(f'  {endpoint}: {stats["requests"]} call(s), avg {stats["avg_ms"]:.0f}ms')
+            
             self.stdout.write(self.style.SUCCESS('\n✓ Mailjet health check passed'))
             
         except Exception as e:
@@ -0,0 +1,257 @@
+"""
+Incremental sync of ``MEDIA_ROOT`` to the S3/MinIO bucket.
+
+A run compares three things:
+
+* the local files (size and mtime, and their expected S3 ETag),
+* a manifest from the previous run, which lets unchanged files skip
+  re-hashing, and
+* one paginated ``list_objects_v2`` of the media prefix.
+
+Only files whose ETag or size differ from the bucket are uploaded. Large
+files use multipart uploads, so their expected ETag is computed the same
+way S3 computes it (md5 of the part md5s plus ``-<parts>``). With
+``delete=True``, objects that no longer exist locally are removed from the
+bucket, but only if the manifest records them as synced from this machine:
+objects that only ever existed in the bucket (uploaded through the site
+while ``USE_S3`` is on) are never deleted.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from boto3.s3.transfer import TransferConfig
+
+MANIFEST_VERSION = 1
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects limit
+READ_SIZE = 1024 * 1024
+
+
+def file_etag(path, size, threshold=MULTIPART_THRESHOLD, chunksize=MULTIPART_CHUNKSIZE):
+    """Return the ETag S3 will report for ``path`` uploaded with these settings."""
+    if size < threshold:
+        digest = hashlib.md5()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(READ_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    part_digests = []
+    with open(path, 'rb') as handle:
+        for part in iter(lambda: handle.read(chunksize), b''):
+            part_digests.append(hashlib.md5(part).digest())
+    return f'{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}'
+
+
+def load_manifest(path):
+    """Return ``{relative path: {size, mtime, etag}}`` from the last run (empty if missing)."""
+    try:
+        with open(path) as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def save_manifest(path, files):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, handle, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def scan_local(root, manifest):
+    """
+    Describe every file below ``root``.
+
+    Files whose size and mtime match the manifest reuse its ETag.
+
+    Returns:
+        tuple: ({relative path: {size, mtime, etag}}, number of files hashed)
+    """
+    files = {}
+    hashed = 0
+    for directory, _dirs, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            stat = os.stat(path)
+            previous = manifest.get(relative)
+            if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime:
+                etag = previous['etag']
+            else:
+                etag = file_etag(path, stat.st_size)
+                hashed += 1
+            files[relative] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'etag': etag}
+    return files, hashed
+
+
+def list_remote(client, bucket, prefix):
+    """Return ``{relative path: {size, etag}}`` for every object under ``prefix``."""
+    prefix = prefix.rstrip('/') + '/'
+    objects = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get('Contents', []):
+            objects[item['Key'][len(prefix):]] = {
+                'size': item['Size'], 'etag': item['ETag'].strip('"'),
+            }
+    return objects
+
+
+def plan_sync(local, remote, delete=False, synced=()):
+    """
+    Work out what has to change.
+
+    Only objects listed in ``synced`` (the previous manifest) are deleted;
+    other remote-only objects are reported as ``remote_only``.
+
+    Returns:
+        dict: {'upload': [paths], 'unchanged': [paths], 'delete': [paths], 'remote_only': [paths]}
+    """
+    upload, unchanged = [], []
+    for relative, info in sorted(local.items()):
+        existing = remote.get(relative)
+        if existing and existing['size'] == info['size'] and existing['etag'] == info['etag']:
+            unchanged.append(relative)
+        else:
+            upload.append(relative)
+    missing = sorted(set(remote) - set(local))
+    stale = [relative for relative in missing if relative in synced] if delete else []
+    remote_only = [relative for relative in missing if relative not in synced]
+    return {'upload': upload, 'unchanged': unchanged, 'delete': stale, 'remote_only': remote_only}
+
+
+def _upload(client, bucket, key, path, transfer_config):
+    extra_args = {}
+    content_type, _encoding = mimetypes.guess_type(path)
+    if content_type:
+        extra_args['ContentType'] = content_type
+    client.upload_file(path, bucket, key, ExtraArgs=extra_args, Config=transfer_config)
+
+
+def _delete(client, bucket, keys):
+    failed = []
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        response = client.delete_objects(
+            Bucket=bucket, Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+        )
+        failed.extend(error['Key'] for error in response.get('Errors', []))
+    return failed
+
+
+def sync_media(client, bucket, prefix, root, manifest_path, workers=10, dry_run=False, delete=False):
+    """
+    Upload changed files under ``root`` to ``bucket``/``prefix``.
+
+    Returns:
+        dict: summary with counts, bytes and seconds (see ``format_summary``)
+    """
+    started = time.perf_counter()
+    prefix = prefix.rstrip('/')
+    manifest = load_manifest(manifest_path)
+    local, hashed = scan_local(root, manifest)
+    remote = list_remote(client, bucket, prefix)
+    plan = plan_sync(local, remote, delete=delete, synced=manifest)
+
+    summary = {
+        'files': len(local),
+        'hashed': hashed,
+        'uploaded': 0,
+        'uploaded_bytes': 0,
+        'unchanged': len(plan['unchanged']),
+        'unchanged_bytes': sum(local[path]['size'] for path in plan['unchanged']),
+        'deleted': 0,
+        'remote_only': len(plan['remote_only']),
+        'failed': {},
+        'planned': plan,
+        'dry_run': dry_run,
+        'upload_seconds': 0.0,
+    }
+    if dry_run:
+        summary['seconds'] = time.perf_counter() - started
+        return summary
+
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=4,
+    )
+    upload_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _upload, client, bucket, f'{prefix}/{relative}', os.path.join(root, relative), transfer_config
+            ): relative
+            for relative in plan['upload']
+        }
+        for future in as_completed(futures):
+            relative = futures[future]
+            try:
+                future.result()
+            except Exception as exc:
+                summary['failed'][relative] = str(exc)
+            else:
+                summary['uploaded'] += 1
+                summary['uploaded_bytes'] += local[relative]['size']
+    summary['upload_seconds'] = time.perf_counter() - upload_started
+
+    if plan['delete']:
+        failed = _delete(client, bucket, [f'{prefix}/{relative}' for relative in plan['delete']])
+        for key in failed:
+            summary['failed'][key[len(prefix) + 1:]] = 'delete failed'
+        summary['deleted'] = len(plan['delete']) - len(failed)
+
+    # Failed files are left out so the next run hashes them again; synced
+    # objects removed locally but still in the bucket stay listed for --delete
+    files = {relative: info for relative, info in local.items() if relative not in summary['failed']}
+    deleted = set(plan['delete']) - set(summary['failed'])
+    files.update(
+        (relative, manifest[relative]) for relative in remote
+        if relative in manifest and relative not in local and relative not in deleted
+    )
+    save_manifest(manifest_path, files)
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+def format_size(size):
+    size = float(size)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+def format_summary(summary):
+    """Human readable lines describing a ``sync_media`` result."""
+    plan = summary['planned']
+    if summary['dry_run']:
+        return [
+            f'{summary["files"]} local file(s), {summary["hashed"]} re-hashed',
+            f'Would upload {len(plan["upload"])} file(s), skip {summary["unchanged"]} unchanged '
+            f'({format_size(summary["unchanged_bytes"])}), delete {len(plan["delete"])}',
+            f'Left {summary["remote_only"]} remote-only file(s) alone (not synced from here)',
+        ]
+
+    lines = [
+        f'{summary["files"]} local file(s), {summary["hashed"]} re-hashed',
+        f'Uploaded {summary["uploaded"]} file(s) ({format_size(summary["uploaded_bytes"])}) '
+        f'in {summary["upload_seconds"]:.1f}s',
+        f'Skipped {summary["unchanged"]} unchanged file(s) ({format_size(summary["unchanged_bytes"])})',
+        f'Deleted {summary["deleted"]} remote file(s), left {summary["remote_only"]} remote-only file(s) alone',
+        f'Finished in {summary["seconds"]:.1f}s',
+    ]
+    if summary['uploaded_bytes'] and summary['upload_seconds']:
+        throughput = summary['uploaded_bytes'] / summary['upload_seconds']
+        lines.append(f'Estimated upload time saved: {summary["unchanged_bytes"] / throughput:.1f}s')
+    return lines
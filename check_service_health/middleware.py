@@ -0,0 +1,25 @@
+from .views import healthz, readyz
+
+PROBES = {
+    '/healthz': healthz,
+    '/readyz': readyz,
+}
+
+
+class HealthCheckMiddleware:
+    """
+    Answer Kubernetes probes before the rest of the middleware stack.
+
+    Kubelet connects to the pod IP over plain HTTP, so the probes must skip
+    ALLOWED_HOSTS validation and the HTTPS redirect, and they have no use
+    for sessions or authentication. Keep this first in ``MIDDLEWARE``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        probe = PROBES.get(request.path_info)
+        if probe is not None:
+            return probe(request)
+        return self.get_response(request)
@@ -53,3 +53,264 @@ class TestAsCompleted:
         from concurrent.futures import as_completed
         assert callable(as_completed)
 
+
+
+class TestHealthChecks:
+    """Tests for the concurrent health checks and probe endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_readiness(self):
+        from check_service_health import checks
+        checks.reset_readiness()
+        yield
+        checks.reset_readiness()
+
+    def test_checks_run_concurrently(self, monkeypatch):
+        """Test total time is bounded by the slowest check, not the sum."""
+        import time
+        from check_service_health import checks
+        monkeypatch.setitem(checks.CHECKS, 'slow_a', lambda: time.sleep(0.3))
+        monkeypatch.setitem(checks.CHECKS, 'slow_b', lambda: time.sleep(0.3))
+        started = time.perf_counter()
+        results = checks.run_checks(['slow_a', 'slow_b'])
+        assert time.perf_counter() - started < 0.55
+        assert all(result['ok'] for result in results.values())
+
+    def test_timeout_and_errors_are_reported(self, monkeypatch):
+        """Test a hung check times out and a failing one reports its error."""
+        import time
+        from check_service_health import checks
+
+        def broken():
+            raise RuntimeError('down')
+        monkeypatch.setitem(checks.CHECKS, 'hung', lambda: time.sleep(1))
+        monkeypatch.setitem(checks.CHECKS, 'broken', broken)
+        results = checks.run_checks(['hung', 'broken'], timeout=0.1)
+        assert results['hung']['error'].startswith('timed out')
+        assert results['broken'] == {'ok': False, 'latency_ms': results['broken']['latency_ms'],
+                                     'error': 'RuntimeError: down'}
+
+    def test_healthz_skips_host_validation(self, client, settings):
+        """Test liveness answers for any Host header without touching dependencies."""
+        settings.ALLOWED_HOSTS = ['arpansahu.space']
+        response = client.get('/healthz', HTTP_HOST='10.1.2.3:8000')
+        assert response.status_code == 200
+        assert response.json() == {'status': 'ok'}
+        assert response['Cache-Control'] == 'no-store'
+
+    def test_readyz_reports_latency_and_caches(self, client, db, monkeypatch):
+        """Test readiness lists each dependency and reuses the result within the TTL."""
+        from check_service_health import checks
+        calls = []
+        monkeypatch.setitem(checks.CHECKS, 'database', lambda: calls.append('database'))
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        body = response.json()
+        assert body['status'] == 'ok'
+        assert set(body['checks']) == set(checks.READINESS_CHECKS)
+        assert 'latency_ms' in body['checks']['cache']
+        client.get('/readyz')
+        assert calls == ['database']
+
+    def test_readyz_fails_when_a_dependency_is_down(self, client, monkeypatch):
+        """Test readiness returns 503 when a required check fails."""
+        from check_service_health import checks
+
+        def down():
+            raise ConnectionError('refused')
+        monkeypatch.setitem(checks.CHECKS, 'database', down)
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.json()['checks']['database']['ok'] is False
+
+    def test_readyz_logs_errors_instead_of_returning_them(self, client, monkeypatch, caplog):
+        """Test error text (which can name internal hosts) only goes to the log."""
+        from check_service_health import checks
+
+        def down():
+            raise ConnectionError('could not connect to server at "10.0.0.5", port 5432')
+        monkeypatch.setitem(checks.CHECKS, 'database', down)
+        response = client.get('/readyz')
+        assert set(response.json()['checks']['database']) == {'ok', 'latency_ms'}
+        assert '10.0.0.5' not in response.content.decode()
+        assert '10.0.0.5' in caplog.text
+
+    def test_checks_use_their_own_timeouts(self, settings, monkeypatch):
+        """Test the cache check gets a Redis client with connect and socket timeouts."""
+        from check_service_health import checks
+        settings.CACHES = {'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': 'redis://localhost:6379',
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        }}
+        monkeypatch.setattr(checks, '_check_cache', None)
+        cache = checks._get_check_cache()
+        assert cache._params['OPTIONS']['SOCKET_CONNECT_TIMEOUT'] == checks.CHECK_TIMEOUT
+        assert cache._params['OPTIONS']['SOCKET_TIMEOUT'] == checks.CHECK_TIMEOUT
+
+    def test_database_check(self, db):
+        """Test the real database check passes against the test database."""
+        from check_service_health import checks
+        checks.check_database()
+        checks.check_cache()
+
+    def test_all_services_command(self, monkeypatch):
+        """Test the command summarises every check."""
+        from io import StringIO
+        from django.core.management import call_command
+        from check_service_health import checks
+        for name in checks.CHECKS:
+            monkeypatch.setitem(checks.CHECKS, name, lambda: None)
+        out = StringIO()
+        call_command('test_all_services', stdout=out)
+        assert out.getvalue().count('PASSED') == 6
+        assert 'All services are healthy' in out.getvalue()
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls used by media_sync."""
+
+    def __init__(self, page_size=2):
+        self.objects = {}
+        self.page_size = page_size
+        self.uploads = []
+        self.fail = set()
+
+    def get_paginator(self, name):
+        assert name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        for start in range(0, len(keys), self.page_size):
+            yield {'Contents': [
+                {'Key': key, 'Size': self.objects[key]['size'], 'ETag': f'"{self.objects[key]["etag"]}"'}
+                for key in keys[start:start + self.page_size]
+            ]}
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+        import os
+        from check_service_health.media_sync import file_etag
+        if key in self.fail:
+            raise OSError('upload refused')
+        size = os.path.getsize(path)
+        self.objects[key] = {'size': size, 'etag': file_etag(path, size, Config.multipart_threshold,
+                                                             Config.multipart_chunksize)}
+        self.uploads.append(key)
+
+    def delete_objects(self, Bucket, Delete):
+        for item in Delete['Objects']:
+            self.objects.pop(item['Key'], None)
+        return {}
+
+
+class TestMediaSync:
+    """Tests for the incremental media sync."""
+
+    @pytest.fixture
+    def media(self, tmp_path):
+        root = tmp_path / 'media'
+        (root / 'blog').mkdir(parents=True)
+        (root / 'blog' / 'a.jpg').write_bytes(b'a' * 10)
+        (root / 'blog' / 'b.png').write_bytes(b'b' * 20)
+        (root / 'c.txt').write_bytes(b'c' * 30)
+        return root
+
+    def _sync(self, s3, media, tmp_path, **kwargs):
+        from check_service_health.media_sync import sync_media
+        return sync_media(s3, 'bucket', 'portfolio/media', str(media),
+                          str(tmp_path / 'manifest.json'), workers=2, **kwargs)
+
+    def test_second_run_uploads_nothing(self, media, tmp_path):
+        """Test unchanged files are neither uploaded nor re-hashed."""
+        s3 = FakeS3()
+        first = self._sync(s3, media, tmp_path)
+        assert first['uploaded'] == 3 and first['uploaded_bytes'] == 60
+        assert 'portfolio/media/blog/a.jpg' in s3.objects
+
+        second = self._sync(s3, media, tmp_path)
+        assert second['uploaded'] == 0 and second['hashed'] == 0
+        assert second['unchanged'] == 3 and second['unchanged_bytes'] == 60
+
+    def test_only_changed_files_upload(self, media, tmp_path):
+        """Test a modified file is detected by its checksum."""
+        s3 = FakeS3()
+        self._sync(s3, media, tmp_path)
+        s3.uploads.clear()
+        (media / 'c.txt').write_bytes(b'changed')
+        result = self._sync(s3, media, tmp_path)
+        assert s3.uploads == ['portfolio/media/c.txt']
+        assert result['unchanged'] == 2
+
+    def test_dry_run_changes_nothing(self, media, tmp_path):
+        """Test a dry run only plans."""
+        s3 = FakeS3()
+        result = self._sync(s3, media, tmp_path, dry_run=True)
+        assert len(result['planned']['upload']) == 3
+        assert s3.objects == {} and not (tmp_path / 'manifest.json').exists()
+
+    def test_delete_mirrors_removed_files(self, media, tmp_path):
+        """Test --delete removes remote objects missing locally, and only then."""
+        s3 = FakeS3()
+        self._sync(s3, media, tmp_path)
+        (media / 'blog' / 'a.jpg').unlink()
+        assert self._sync(s3, media, tmp_path)['deleted'] == 0
+        assert 'portfolio/media/blog/a.jpg' in s3.objects
+        assert self._sync(s3, media, tmp_path, delete=True)['deleted'] == 1
+        assert 'portfolio/media/blog/a.jpg' not in s3.objects
+
+    def test_delete_keeps_bucket_only_objects(self, media, tmp_path):
+        """Test --delete never removes objects this tool did not sync."""
+        s3 = FakeS3()
+        self._sync(s3, media, tmp_path)
+        s3.objects['portfolio/media/blog/uploaded-on-site.jpg'] = {'size': 5, 'etag': 'abc'}
+        result = self._sync(s3, media, tmp_path, delete=True)
+        assert result['deleted'] == 0 and result['remote_only'] == 1
+        assert 'portfolio/media/blog/uploaded-on-site.jpg' in s3.objects
+        (media / 'c.txt').unlink()
+        assert self._sync(s3, media, tmp_path, delete=True)['deleted'] == 1
+        assert 'portfolio/media/blog/uploaded-on-site.jpg' in s3.objects
+
+    def test_failures_are_reported(self, media, tmp_path):
+        """Test a failed upload is reported and retried next run."""
+        s3 = FakeS3()
+        s3.fail.add('portfolio/media/c.txt')
+        result = self._sync(s3, media, tmp_path)
+        assert list(result['failed']) == ['c.txt']
+        s3.fail.clear()
+        assert self._sync(s3, media, tmp_path)['uploaded'] == 1
+
+    def test_multipart_etag(self, tmp_path):
+        """Test large files get S3's multipart ETag format."""
+        import hashlib
+        from check_service_health.media_sync import file_etag
+        path = tmp_path / 'big.bin'
+        path.write_bytes(b'x' * 25)
+        parts = [hashlib.md5(b'x' * 10).digest(), hashlib.md5(b'x' * 10).digest(), hashlib.md5(b'x' * 5).digest()]
+        assert file_etag(str(path), 25, threshold=20, chunksize=10) == f'{hashlib.md5(b"".join(parts)).hexdigest()}-3'
+        assert file_etag(str(path), 25) == hashlib.md5(b'x' * 25).hexdigest()
+
+    def test_summary_lines(self, media, tmp_path):
+        """Test the summary mentions uploads, skips and time saved."""
+        from check_service_health.media_sync import format_summary
+        s3 = FakeS3()
+        self._sync(s3, media, tmp_path)
+        (media / 'c.txt').write_bytes(b'changed')
+        text = '\n'.join(format_summary(self._sync(s3, media, tmp_path)))
+        assert 'Uploaded 1 file(s)' in text
+        assert 'Skipped 2 unchanged file(s)' in text
+        assert 'Estimated upload time saved' in text
+
+    def test_command_dry_run(self, media, tmp_path, settings, monkeypatch):
+        """Test the management command reports the plan without uploading."""
+        from io import StringIO
+        from django.core.management import call_command
+        from check_service_health.management.commands import sync_media_to_s3
+        s3 = FakeS3()
+        settings.MEDIA_ROOT = str(media)
+        settings.AWS_PUBLIC_MEDIA_LOCATION = 'portfolio/media'
+        monkeypatch.setattr(sync_media_to_s3.Command, 'get_client', lambda self, workers: s3)
+        out = StringIO()
+        call_command('sync_media_to_s3', dry_run=True, manifest=str(tmp_path / 'm.json'), stdout=out)
+        assert 'Would upload 3 file(s)' in out.getvalue()
+        assert s3.objects == {}
@@ -1,3 +1,19 @@
-from django.shortcuts import render
+from django.http import JsonResponse
 
-# Create your views here.
+from .checks import get_readiness
+
+
+def _no_store(response):
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def healthz(request):
+    """Liveness: the process is up and serving requests (no dependency checks)."""
+    return _no_store(JsonResponse({'status': 'ok'}))
+
+
+def readyz(request):
+    """Readiness: database and cache reachable, with per-dependency latency."""
+    report = get_readiness()
+    return _no_store(JsonResponse(report, status=200 if report['status'] == 'ok' else 503))
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Comment, CommentLike, Notification, CommentEditHistory
+from .models import Comment, CommentLike, Notification, NotificationArchive, CommentEditHistory
+from .unread import invalidate_unread
 
 
 @admin.register(Comment)
@@ -56,7 +57,7 @@ class CommentLikeAdmin(admin.ModelAdmin):
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('recipient', 'notification_type', 'message_preview', 'is_read', 'created_at')
+    list_display = ('recipient', 'notification_type', 'message_preview', 'actor_count', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('recipient__username', 'message')
     list_editable = ('is_read',)
@@ -71,11 +72,15 @@ class NotificationAdmin(admin.ModelAdmin):
     message_preview.short_description = 'Message'
     
     def mark_as_read(self, request, queryset):
+        recipients = list(queryset.values_list('recipient_id', flat=True))
         queryset.update(is_read=True)
+        invalidate_unread(*recipients)
     mark_as_read.short_description = "Mark selected notifications as read"
     
     def mark_as_unread(self, request, queryset):
+        recipients = list(queryset.values_list('recipient_id', flat=True))
         queryset.update(is_read=False)
+        invalidate_unread(*recipients)
     mark_as_unread.short_description = "Mark selected notifications as unread"
 
 
@@ -91,3 +96,11 @@ class CommentEditHistoryAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.previous_content[:50] + '...' if len(obj.previous_content) > 50 else obj.previous_content
     content_preview.short_description = 'Previous Content'
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'notification_type', 'actor_count', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'archived_at')
+    search_fields = ('recipient__username', 'message')
+    raw_id_fields = ('recipient',)
@@ -0,0 +1,84 @@
+"""
+Denormalized counters for comments and the objects they are attached to.
+
+``Comment.like_count``, ``Comment.reply_count`` and ``comment_count`` on a
+commented object (e.g. ``BlogPost``) are adjusted with a single atomic
+``F()`` UPDATE from signals, so reads never need a ``COUNT(*)``. The
+``recount_*`` helpers recompute them from the source rows in bulk and are
+used by the ``reconcile_counters`` command to repair any drift.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+COMMENT_COUNT_FIELD = 'comment_count'
+
+
+def adjust_counter(model, pk, field, delta):
+    """Atomically add ``delta`` to ``field`` on one row (never below zero)."""
+    if not pk or not delta:
+        return
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def adjust_comment_count(content_type_id, object_id, delta):
+    """Adjust ``comment_count`` on a commented object, if its model has one."""
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None:
+        return
+    try:
+        model._meta.get_field(COMMENT_COUNT_FIELD)
+    except FieldDoesNotExist:
+        return
+    adjust_counter(model, object_id, COMMENT_COUNT_FIELD, delta)
+
+
+def count_subquery(model, fk_field, **filters):
+    """Correlated ``COUNT`` of ``model`` rows pointing at the outer row."""
+    rows = model.objects.filter(**{fk_field: OuterRef('pk')}, **filters)
+    return Coalesce(
+        Subquery(rows.order_by().values(fk_field).annotate(total=Count('pk')).values('total')),
+        0,
+    )
+
+
+def recount(queryset, field, expected):
+    """
+    Rewrite ``field`` on rows of ``queryset`` that differ from ``expected``.
+
+    Returns:
+        int: number of rows that had drifted
+    """
+    drifted = list(
+        queryset.annotate(expected_count=expected)
+        .exclude(**{field: F('expected_count')})
+        .values_list('pk', flat=True)
+    )
+    if drifted:
+        queryset.model.objects.filter(pk__in=drifted).update(**{field: expected})
+    return len(drifted)
+
+
+def recount_comment_counters():
+    """Recompute ``like_count`` and ``reply_count`` for every comment."""
+    from .models import Comment, CommentLike
+
+    comments = Comment.objects.all()
+    return {
+        'like_count': recount(comments, 'like_count', count_subquery(CommentLike, 'comment')),
+        'reply_count': recount(
+            comments, 'reply_count', count_subquery(Comment, 'parent', is_approved=True)
+        ),
+    }
+
+
+def recount_comment_count(model):
+    """Recompute ``comment_count`` (approved comments) for every ``model`` row."""
+    from .models import Comment
+
+    content_type = ContentType.objects.get_for_model(model)
+    approved = Comment.objects.filter(
+        content_type=content_type, object_id=OuterRef('pk'), is_approved=True
+    ).order_by().values('object_id').annotate(total=Count('pk')).values('total')
+    return recount(model.objects.all(), COMMENT_COUNT_FIELD, Coalesce(Subquery(approved), 0))
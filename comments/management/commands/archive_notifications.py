@@ -0,0 +1,39 @@
+"""
+Management command to archive old read notifications.
+
+Usage:
+    python manage.py archive_notifications
+    python manage.py archive_notifications --days 30 --batch-size 500
+    python manage.py archive_notifications --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from comments.retention import (
+    ARCHIVE_BATCH_SIZE, RETENTION_DAYS, archive_read_notifications, expired_notifications,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move read notifications older than the retention period into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=RETENTION_DAYS,
+            help='Archive read notifications older than this many days'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+            help='Notifications moved per transaction'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many notifications would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = expired_notifications(options['days']).count()
+            self.stdout.write(f'Would archive {count} notification(s)')
+            return
+        archived = archive_read_notifications(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} notification(s)'))
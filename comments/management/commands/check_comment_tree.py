@@ -0,0 +1,38 @@
+"""
+Management command to verify the materialized path/depth of every comment.
+
+Usage:
+    python manage.py check_comment_tree
+    python manage.py check_comment_tree --fix   # Rewrite inconsistent rows
+"""
+
+from django.core.management.base import BaseCommand
+from comments.models import Comment, compute_tree_positions
+
+
+class Command(BaseCommand):
+    help = 'Check (and optionally repair) the materialized comment tree encoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite rows whose path or depth is wrong')
+
+    def handle(self, *args, **options):
+        expected = compute_tree_positions(Comment.objects.values_list('id', 'parent_id'))
+
+        broken = [
+            Comment(id=pk, path=expected[pk][0], depth=expected[pk][1])
+            for pk, path, depth in Comment.objects.values_list('id', 'path', 'depth').iterator()
+            if pk in expected and expected[pk] != (path, depth)
+        ]
+
+        if not broken:
+            self.stdout.write(self.style.SUCCESS(f'All {len(expected)} comment(s) are consistent'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'{len(broken)} comment(s) have an inconsistent path or depth'))
+        for comment in broken[:20]:
+            self.stdout.write(f'  #{comment.id}: expected path={comment.path!r} depth={comment.depth}')
+
+        if options['fix']:
+            Comment.objects.bulk_update(broken, ['path', 'depth'], batch_size=500)
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(broken)} comment(s)'))
@@ -0,0 +1,41 @@
+"""
+Management command to write queued notifications from the outbox.
+
+Usage:
+    python manage.py dispatch_notifications
+    python manage.py dispatch_notifications --loop --interval 5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from comments.notifications import DISPATCH_BATCH_SIZE, dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Turn queued notification events into notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DISPATCH_BATCH_SIZE,
+            help='Events handled per transaction'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait between polls with --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed, created = dispatch_pending(batch_size=options['batch_size'])
+            if processed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Dispatched {processed} event(s) into {created} notification(s)'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+def _path_segment(pk):
+    # Frozen copy of comments.models.path_segment as of this migration
+    digits = ''
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[remainder] + digits
+    return digits.rjust(7, '0') + '/'
+
+
+def _tree_positions(rows):
+    # Frozen copy of comments.models.compute_tree_positions as of this migration
+    children = {}
+    for pk, parent_id in rows:
+        children.setdefault(parent_id, []).append(pk)
+    positions = {}
+    stack = [(pk, '', 0) for pk in children.get(None, [])]
+    while stack:
+        pk, path, depth = stack.pop()
+        positions[pk] = (path, depth)
+        child_path = path + _path_segment(pk)
+        stack.extend((child, child_path, depth + 1) for child in children.get(pk, []))
+    return positions
+
+
+def backfill_tree_paths(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    positions = _tree_positions(Comment.objects.values_list('id', 'parent_id'))
+    Comment.objects.bulk_update(
+        [Comment(id=pk, path=path, depth=depth) for pk, (path, depth) in positions.items()],
+        ['path', 'depth'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text="Ancestor ids from the root, e.g. '000000a/000000f/'", max_length=1024),
+        ),
+        migrations.RunPython(backfill_tree_paths, migrations.RunPython.noop),
+    ]
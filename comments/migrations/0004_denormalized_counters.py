@@ -0,0 +1,45 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(model, fk_field, **filters):
+    # Correlated COUNT of model rows pointing at the outer row
+    rows = model.objects.filter(**{fk_field: OuterRef('pk')}, **filters)
+    return Coalesce(
+        Subquery(rows.order_by().values(fk_field).annotate(total=Count('pk')).values('total')),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    CommentLike = apps.get_model('comments', 'CommentLike')
+    # The columns were just added as 0, so every row is written once
+    Comment.objects.update(
+        like_count=_count(CommentLike, 'comment'),
+        reply_count=_count(Comment, 'parent', is_approved=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_comment_path_depth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved direct replies'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
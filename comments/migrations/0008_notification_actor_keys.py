@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-18 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0007_notification_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_keys',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
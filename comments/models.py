@@ -1,7 +1,56 @@
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from account.models import Account
+from .unread import adjust_unread
+
+
+# Materialized path: each ancestor id as fixed-width base36 plus a separator,
+# so a subtree is a single prefix range and a comment's path sorts before its
+# replies'. The path holds ancestors only, so ordering by it groups siblings
+# rather than giving depth-first thread order (see comments.tree for that).
+PATH_SEGMENT_WIDTH = 7
+PATH_SEPARATOR = '/'
+PATH_MAX_LENGTH = 1024
+# Deepest reply the path column can hold (one segment per ancestor)
+MAX_THREAD_DEPTH = PATH_MAX_LENGTH // (PATH_SEGMENT_WIDTH + len(PATH_SEPARATOR))
+_BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def path_segment(pk):
+    """Encode a primary key as a fixed-width materialized path segment"""
+    digits = ''
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        digits = _BASE36_DIGITS[remainder] + digits
+    return digits.rjust(PATH_SEGMENT_WIDTH, '0') + PATH_SEPARATOR
+
+
+def _split_path(path):
+    step = PATH_SEGMENT_WIDTH + len(PATH_SEPARATOR)
+    return [path[i:i + step] for i in range(0, len(path), step)]
+
+
+def compute_tree_positions(rows):
+    """
+    Compute the expected (path, depth) for comments from (id, parent_id) rows.
+    
+    Used by the ``check_comment_tree`` command.
+    """
+    children = {}
+    for pk, parent_id in rows:
+        children.setdefault(parent_id, []).append(pk)
+    
+    positions = {}
+    stack = [(pk, '', 0) for pk in children.get(None, [])]
+    while stack:
+        pk, path, depth = stack.pop()
+        positions[pk] = (path, depth)
+        child_path = path + path_segment(pk)
+        stack.extend((child, child_path, depth + 1) for child in children.get(pk, []))
+    return positions
 
 
 class Comment(models.Model):
@@ -42,7 +91,7 @@ class Comment(models.Model):
         help_text="Email for notifications (not displayed publicly)"
     )
     
-    # Threading support - unlimited depth
+    # Threading support - nested up to MAX_THREAD_DEPTH levels
     parent = models.ForeignKey(
         'self', 
         null=True, 
@@ -52,6 +101,16 @@ class Comment(models.Model):
         help_text="Parent comment for nested threads"
     )
     
+    # Materialized path of ancestors (maintained in save) and depth in the thread
+    path = models.CharField(
+        max_length=PATH_MAX_LENGTH,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Ancestor ids from the root, e.g. '000000a/000000f/'"
+    )
+    depth = models.PositiveIntegerField(default=0, editable=False)
+    
     # Comment content
     content = models.TextField(help_text="Comment text content")
     
@@ -65,6 +124,12 @@ class Comment(models.Model):
     is_edited = models.BooleanField(default=False)
     is_pinned = models.BooleanField(default=False, help_text="Pin important comments")
     
+    # Denormalized counters (maintained by comments.signals, see comments.counters)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False, help_text="Approved direct replies")
+    
+    COUNTER_FIELDS = ('like_count', 'reply_count')
+    
     class Meta:
         ordering = ['-is_pinned', 'created_at']
         indexes = [
@@ -89,7 +154,7 @@ class Comment(models.Model):
     
     def get_like_count(self):
         """Get total likes for this comment"""
-        return self.likes.count()
+        return self.like_count
     
     def is_liked_by(self, user):
         """Check if user has liked this comment"""
@@ -98,17 +163,44 @@ class Comment(models.Model):
         return False
     
     def get_reply_count(self):
-        """Get total replies to this comment"""
-        return self.replies.filter(is_approved=True).count()
+        """Get total approved replies to this comment"""
+        return self.reply_count
     
     def get_thread_depth(self):
-        """Calculate depth level in comment thread"""
-        depth = 0
-        current = self.parent
-        while current:
-            depth += 1
-            current = current.parent
-        return depth
+        """Depth level in comment thread (0 for top-level comments)"""
+        return self.depth
+    
+    @property
+    def descendant_prefix(self):
+        """Path prefix shared by every descendant of this comment"""
+        return self.path + path_segment(self.pk)
+    
+    def get_descendants(self):
+        """All replies below this comment, at any depth (one range query)"""
+        return Comment.objects.filter(path__startswith=self.descendant_prefix)
+    
+    def get_subtree(self):
+        """
+        This comment and all of its descendants, ordered by ``path``.
+        
+        That puts each comment before its replies and keeps siblings together,
+        but it is not depth-first: every reply to a comment comes before any of
+        their own replies. For thread order rebuild the result with
+        ``comments.tree.build_tree`` and ``iter_tree``.
+        """
+        return Comment.objects.filter(
+            Q(pk=self.pk) | Q(path__startswith=self.descendant_prefix)
+        ).order_by('path', 'created_at')
+    
+    def delete_subtree(self):
+        """Delete this comment and all of its descendants"""
+        return self.get_subtree().delete()
+    
+    def _expected_tree_position(self):
+        if self.parent_id is None:
+            return '', 0
+        parent = self.parent
+        return parent.path + path_segment(parent.pk), parent.depth + 1
     
     def save(self, *args, **kwargs):
         # Auto-approve comments from registered users
@@ -116,7 +208,45 @@ class Comment(models.Model):
             self.is_approved = True
             # Cache author name for persistence after deletion
             self.author_name_cache = self.author.get_full_name() or self.author.username
+        
+        # Counters are only changed atomically in the database; never write back stale copies
+        if kwargs.get('update_fields') is None and not self._state.adding:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        
+        previous = None
+        if self.pk:
+            previous = Comment.objects.filter(pk=self.pk).values_list('path', 'depth').first()
+        self.path, self.depth = self._expected_tree_position()
+        if self.pk and path_segment(self.pk) in _split_path(self.path):
+            raise ValueError('A comment cannot be moved below itself or one of its replies.')
+        deepest = self.depth
+        if previous and self.depth > previous[1]:
+            subtree_depth = Comment.objects.filter(
+                path__startswith=previous[0] + path_segment(self.pk)
+            ).aggregate(deepest=models.Max('depth'))['deepest']
+            if subtree_depth is not None:
+                deepest = subtree_depth + (self.depth - previous[1])
+        if deepest > MAX_THREAD_DEPTH:
+            raise ValueError(f'Comment threads cannot be nested more than {MAX_THREAD_DEPTH} levels deep.')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'path', 'depth'}
         super().save(*args, **kwargs)
+        
+        # Re-root the subtree when a comment moves to a different parent
+        if previous and previous[0] != self.path:
+            old_prefix = previous[0] + path_segment(self.pk)
+            Comment.objects.filter(path__startswith=old_prefix).update(
+                path=Concat(Value(self.descendant_prefix), Substr('path', len(old_prefix) + 1)),
+                depth=F('depth') + (self.depth - previous[1]),
+            )
 
 
 class CommentLike(models.Model):
@@ -180,6 +310,7 @@ class Notification(models.Model):
         ('comment_like', 'Comment Like'),
         ('comment_mention', 'Mentioned in Comment'),
         ('post_comment', 'New Comment on Your Post'),
+        ('post_like', 'Post Like'),
     ]
     
     recipient = models.ForeignKey(
@@ -222,11 +353,23 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Aggregated notifications ("A and 12 others liked ...") count every actor,
+    # remember each counted sender key and keep the most recent few as [sender key, name] pairs
+    actor_count = models.PositiveIntegerField(default=1)
+    actor_keys = models.JSONField(default=list, blank=True)
+    recent_actors = models.JSONField(default=list, blank=True)
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
-            models.Index(fields=['is_read']),
+            # Unread rows are a small, hot slice of the table (badge counts,
+            # aggregation lookups), so index only those
+            models.Index(
+                fields=['recipient', '-created_at'],
+                condition=Q(is_read=False),
+                name='notification_unread_idx',
+            ),
             models.Index(fields=['notification_type']),
         ]
     
@@ -240,7 +383,63 @@ class Notification(models.Model):
         return '#'
     
     def mark_as_read(self):
-        """Mark notification as read"""
+        """Mark notification as read (and update the cached unread counter)"""
         if not self.is_read:
             self.is_read = True
-            self.save(update_fields=['is_read'])
+            if Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True):
+                adjust_unread(self.recipient_id, -1)
+
+
+class NotificationArchive(models.Model):
+    """
+    Compact copy of a read notification moved out of ``Notification``.
+    
+    Written by the ``archive_notifications`` command (see ``comments.retention``).
+    """
+    recipient = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField()
+    actor_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f'archived {self.notification_type} for user {self.recipient_id}'
+
+
+class NotificationOutbox(models.Model):
+    """
+    A notification waiting to be written by the ``dispatch_notifications`` worker.
+    
+    Signals only insert one of these (see ``comments.notifications``); the
+    worker turns pending rows into ``Notification`` rows in bulk. The
+    ``dedupe_key`` is unique, so a repeated event is dropped at insert time.
+    """
+    recipient = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+')
+    sender = models.ForeignKey(
+        Account, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    sender_name_cache = models.CharField(max_length=100, blank=True)
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    message = models.TextField()
+    dedupe_key = models.CharField(max_length=200, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f'pending {self.notification_type} for user {self.recipient_id}'
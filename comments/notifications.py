@@ -0,0 +1,215 @@
+"""
+Notification dispatch through a database outbox.
+
+Signal handlers call ``enqueue``, which records the event with a single
+INSERT into ``NotificationOutbox`` inside the triggering transaction, so a
+rolled-back comment or like never notifies anyone. The
+``dispatch_notifications`` worker calls ``dispatch_pending`` to drain the
+outbox in batches: events are deduplicated per (recipient, type, target,
+sender), events matching an unread notification already on file are
+dropped, and the rest are written with one ``bulk_create`` per batch.
+
+Likes are aggregated: events with the same (recipient, type, target) are
+folded into the recipient's unread notification for that target if it saw
+activity within ``NOTIFICATION_AGGREGATION_WINDOW`` seconds. That row is
+updated in place ("A and 12 others liked your post") with an actor count,
+the keys of every actor counted (so a re-like or an older liker is not
+counted twice) and the ``RECENT_ACTORS`` most recent actors, so a viral post costs one row
+per recipient instead of one per like.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationOutbox
+from .unread import adjust_unread
+
+DISPATCH_BATCH_SIZE = 500
+AGGREGATED_TYPES = {'post_like', 'comment_like'}
+AGGREGATION_WINDOW = getattr(settings, 'NOTIFICATION_AGGREGATION_WINDOW', 60 * 60 * 24)
+RECENT_ACTORS = 3
+
+
+def _sender_key(item):
+    return item.sender_id or f'guest:{item.sender_name_cache.lower()}'
+
+
+def notification_key(item):
+    """Identity of a notification or outbox event used for deduplication."""
+    return target_key(item) + (_sender_key(item),)
+
+
+def target_key(item):
+    """(recipient, type, target) that aggregated notifications are grouped by."""
+    return (
+        item.recipient_id, item.notification_type, item.content_type_id,
+        item.object_id, item.comment_id,
+    )
+
+
+def describe_actors(names, count):
+    """``'A'``, ``'A and B'`` or ``'A and 12 others'`` for an aggregated notification."""
+    if count <= 1 or not names:
+        return names[0] if names else 'Someone'
+    if count == 2 and len(names) > 1:
+        return f'{names[0]} and {names[1]}'
+    others = count - 1
+    return f'{names[0]} and {others} other{"" if others == 1 else "s"}'
+
+
+def enqueue(recipient, notification_type, message, sender=None, sender_name='',
+            content_type=None, object_id=None, comment=None):
+    """
+    Queue a notification for ``recipient``; repeats of a pending event are ignored.
+
+    Args:
+        recipient: Account to notify
+        notification_type: one of ``Notification.NOTIFICATION_TYPES``
+        message: text shown to the recipient
+        sender: Account that triggered it (None for guests)
+        sender_name: display name kept if the sender is deleted
+        content_type, object_id: the object the notification links to
+        comment: related comment, if any
+    """
+    event = NotificationOutbox(
+        recipient=recipient,
+        sender=sender,
+        sender_name_cache=(sender_name or '')[:100],
+        notification_type=notification_type,
+        content_type=content_type,
+        object_id=object_id,
+        comment=comment,
+        message=message,
+    )
+    event.dedupe_key = ':'.join(str(part) for part in notification_key(event))[:200]
+    NotificationOutbox.objects.bulk_create([event], ignore_conflicts=True)
+
+
+def _unread_keys(events):
+    existing = Notification.objects.filter(
+        is_read=False,
+        recipient_id__in={event.recipient_id for event in events},
+        notification_type__in={event.notification_type for event in events},
+    ).only(
+        'recipient', 'sender', 'sender_name_cache', 'notification_type',
+        'content_type', 'object_id', 'comment',
+    )
+    return {notification_key(notification) for notification in existing}
+
+
+def _notification_from(event):
+    return Notification(
+        recipient_id=event.recipient_id,
+        sender_id=event.sender_id,
+        sender_name_cache=event.sender_name_cache,
+        notification_type=event.notification_type,
+        content_type_id=event.content_type_id,
+        object_id=event.object_id,
+        comment_id=event.comment_id,
+        message=event.message,
+        actor_keys=[_sender_key(event)],
+        recent_actors=[[_sender_key(event), event.sender_name_cache]],
+    )
+
+
+def _open_aggregates(events):
+    """Unread aggregated notifications still inside the window, by target."""
+    cutoff = timezone.now() - timedelta(seconds=AGGREGATION_WINDOW)
+    existing = Notification.objects.filter(
+        is_read=False,
+        created_at__gte=cutoff,
+        recipient_id__in={event.recipient_id for event in events},
+        notification_type__in={event.notification_type for event in events},
+    ).order_by('created_at')
+    return {target_key(notification): notification for notification in existing}
+
+
+def _fold(notification, event):
+    """Add ``event``'s actor to an aggregated notification; False if already counted."""
+    if not notification.recent_actors:
+        notification.recent_actors = [[_sender_key(notification), notification.sender_name_cache]]
+    if not notification.actor_keys:
+        notification.actor_keys = [key for key, _name in notification.recent_actors]
+    actor = [_sender_key(event), event.sender_name_cache]
+    if actor[0] in notification.actor_keys:
+        return False
+    # Messages read "<sender name><rest>", so swap the names in front of the rest
+    rest = event.message[len(event.sender_name_cache):] if event.message.startswith(
+        event.sender_name_cache) else f' {event.message}'
+    notification.actor_count += 1
+    notification.actor_keys.append(actor[0])
+    notification.recent_actors = [actor] + notification.recent_actors[:RECENT_ACTORS - 1]
+    notification.sender_id = event.sender_id
+    notification.sender_name_cache = event.sender_name_cache
+    names = [name for _key, name in notification.recent_actors]
+    notification.message = describe_actors(names, notification.actor_count) + rest
+    notification.created_at = timezone.now()
+    return True
+
+
+def _dispatch_batch(events):
+    aggregated = [event for event in events if event.notification_type in AGGREGATED_TYPES]
+    single = [event for event in events if event.notification_type not in AGGREGATED_TYPES]
+
+    notifications = []
+    if single:
+        seen = _unread_keys(single)
+        for event in single:
+            key = notification_key(event)
+            if key not in seen:
+                seen.add(key)
+                notifications.append(_notification_from(event))
+
+    updated = {}
+    if aggregated:
+        open_rows = _open_aggregates(aggregated)
+        for event in aggregated:
+            key = target_key(event)
+            notification = open_rows.get(key)
+            if notification is None:
+                open_rows[key] = notification = _notification_from(event)
+                notifications.append(notification)
+            elif _fold(notification, event) and notification.pk:
+                updated[notification.pk] = notification
+
+    Notification.objects.bulk_create(notifications)
+    if updated:
+        Notification.objects.bulk_update(updated.values(), [
+            'actor_count', 'actor_keys', 'recent_actors', 'sender', 'sender_name_cache', 'message', 'created_at',
+        ])
+    NotificationOutbox.objects.filter(pk__in=[event.pk for event in events]).delete()
+    return Counter(notification.recipient_id for notification in notifications)
+
+
+def dispatch_pending(batch_size=DISPATCH_BATCH_SIZE, recipient=None):
+    """
+    Turn queued events into notifications.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it, so several workers can drain concurrently.
+
+    Args:
+        batch_size: events handled per transaction
+        recipient: only dispatch events for this account
+
+    Returns:
+        tuple: (events processed, notifications created)
+    """
+    processed = created = 0
+    while True:
+        with transaction.atomic():
+            pending = NotificationOutbox.objects.select_for_update(skip_locked=True)
+            if recipient is not None:
+                pending = pending.filter(recipient=recipient)
+            events = list(pending.order_by('pk')[:batch_size])
+            new_unread = _dispatch_batch(events) if events else Counter()
+        # Committed: bump the recipients' cached unread counters
+        for recipient_id, count in new_unread.items():
+            adjust_unread(recipient_id, count)
+        created += sum(new_unread.values())
+        processed += len(events)
+        if len(events) < batch_size:
+            return processed, created
@@ -0,0 +1,67 @@
+"""
+Retention for notifications.
+
+Read notifications older than ``NOTIFICATION_RETENTION_DAYS`` are moved into
+``NotificationArchive`` (recipient, type, target, message and dates only)
+by the ``archive_notifications`` command. Rows move in primary-key batches,
+each copied and deleted in its own transaction, so the live table stays
+small without long-running locks. A batch is locked while it is copied, so
+a notification marked unread meanwhile is not archived (rows a request is
+updating right now are skipped until the next run).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+RETENTION_DAYS = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def expired_notifications(days=RETENTION_DAYS):
+    """Read notifications created more than ``days`` days ago."""
+    from .models import Notification
+
+    cutoff = timezone.now() - timedelta(days=days)
+    return Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+
+def archive_read_notifications(days=RETENTION_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move expired read notifications into the archive table.
+
+    Returns:
+        int: number of notifications archived
+    """
+    from .models import Notification, NotificationArchive
+
+    archived = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                expired_notifications(days).select_for_update(skip_locked=True).filter(
+                    pk__gt=last_pk
+                ).order_by('pk').values(
+                    'pk', 'recipient_id', 'notification_type', 'content_type_id',
+                    'object_id', 'message', 'actor_count', 'created_at',
+                )[:batch_size]
+            )
+            if not batch:
+                return archived
+            NotificationArchive.objects.bulk_create([
+                NotificationArchive(
+                    recipient_id=row['recipient_id'],
+                    notification_type=row['notification_type'],
+                    content_type_id=row['content_type_id'],
+                    object_id=row['object_id'],
+                    message=row['message'],
+                    actor_count=row['actor_count'],
+                    created_at=row['created_at'],
+                )
+                for row in batch
+            ])
+            Notification.objects.filter(pk__in=[row['pk'] for row in batch]).delete()
+        archived += len(batch)
+        last_pk = batch[-1]['pk']
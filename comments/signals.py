@@ -1,12 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from .counters import adjust_comment_count, adjust_counter
 from .models import Comment, CommentLike, Notification
+from .notifications import enqueue
+from .unread import adjust_unread, invalidate_unread
 
 
 @receiver(post_save, sender=Comment)
 def create_comment_notification(sender, instance, created, **kwargs):
     """
-    Create notifications when:
+    Queue notifications when:
     1. Someone replies to your comment
     2. Someone comments on your post (for content owners)
     """
@@ -18,13 +21,17 @@ def create_comment_notification(sender, instance, created, **kwargs):
         # Don't notify yourself
         if instance.author != instance.parent.author:
             sender_name = instance.get_author_display_name()
-            Notification.objects.create(
+            content_obj = instance.content_object
+            post_title = getattr(content_obj, 'title', 'a post') if content_obj else 'a post'
+            enqueue(
                 recipient=instance.parent.author,
                 sender=instance.author,
-                sender_name_cache=sender_name,
+                sender_name=sender_name,
                 notification_type='comment_reply',
+                content_type=instance.content_type,
+                object_id=instance.object_id,
                 comment=instance,
-                message=f'{sender_name} replied to your comment'
+                message=f'{sender_name} replied to your comment on "{post_title}"'
             )
     
     # TODO: Notify content owner (requires generic relation to content_object)
@@ -33,20 +40,87 @@ def create_comment_notification(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=CommentLike)
 def create_like_notification(sender, instance, created, **kwargs):
-    """Create notification when someone likes your comment"""
+    """Queue a notification when someone likes your comment"""
     if not created:
         return
     
-    comment_author = instance.comment.author
+    comment = instance.comment
+    comment_author = comment.author
     
     # Only notify if comment has an author and it's not self-like
     if comment_author and instance.user != comment_author:
         sender_name = instance.user.get_full_name() or instance.user.username if instance.user else 'Someone'
-        Notification.objects.create(
+        content_obj = comment.content_object
+        post_title = getattr(content_obj, 'title', 'a post') if content_obj else 'a post'
+        enqueue(
             recipient=comment_author,
             sender=instance.user,
-            sender_name_cache=sender_name,
+            sender_name=sender_name,
             notification_type='comment_like',
-            comment=instance.comment,
-            message=f'{sender_name} liked your comment'
+            content_type=comment.content_type,
+            object_id=comment.object_id,
+            comment=comment,
+            message=f'{sender_name} liked your comment on "{post_title}"'
         )
+
+
+COUNTER_FIELDS = {'is_approved', 'parent'}
+
+
+@receiver(pre_save, sender=Comment)
+def capture_counter_state(sender, instance, update_fields=None, **kwargs):
+    """Remember approval state and parent so post_save can adjust counters"""
+    if not instance.pk:
+        instance._counter_state = (False, None)
+    elif update_fields is None or COUNTER_FIELDS.intersection(update_fields):
+        instance._counter_state = Comment.objects.filter(pk=instance.pk).values_list(
+            'is_approved', 'parent_id'
+        ).first() or (False, None)
+    else:
+        instance._counter_state = None  # Counters unaffected
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_counters(sender, instance, **kwargs):
+    """Keep reply and comment counts in step with approval and re-parenting"""
+    previous = getattr(instance, '_counter_state', None)
+    if previous is None or previous == (instance.is_approved, instance.parent_id):
+        return
+    was_approved, old_parent_id = previous
+    if was_approved:
+        adjust_counter(Comment, old_parent_id, 'reply_count', -1)
+    if instance.is_approved:
+        adjust_counter(Comment, instance.parent_id, 'reply_count', 1)
+    if was_approved != instance.is_approved:
+        delta = 1 if instance.is_approved else -1
+        adjust_comment_count(instance.content_type_id, instance.object_id, delta)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_counters(sender, instance, **kwargs):
+    if instance.is_approved:
+        adjust_counter(Comment, instance.parent_id, 'reply_count', -1)
+        adjust_comment_count(instance.content_type_id, instance.object_id, -1)
+
+
+@receiver(post_save, sender=CommentLike)
+def increment_comment_like_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(Comment, instance.comment_id, 'like_count', 1)
+
+
+@receiver(post_delete, sender=CommentLike)
+def decrement_comment_like_count(sender, instance, **kwargs):
+    adjust_counter(Comment, instance.comment_id, 'like_count', -1)
+
+
+@receiver(post_save, sender=Notification)
+def refresh_unread_on_save(sender, instance, created, **kwargs):
+    """Edits through save() (e.g. the admin) may flip is_read; recount lazily"""
+    invalidate_unread(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def decrement_unread_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.recipient_id, -1)
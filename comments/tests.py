@@ -370,12 +370,14 @@ class TestCommentSignals:
     def test_comment_reply_creates_notification(self, db, test_user, test_user_2, published_post, test_comment):
         """Test notification is created when someone replies to a comment."""
         from comments.models import Notification
+        from comments.notifications import dispatch_pending
         ct = ContentType.objects.get_for_model(BlogPost)
         Comment.objects.create(
             content_type=ct, object_id=published_post.id,
             author=test_user_2, content='Reply to your comment',
             parent=test_comment, is_approved=True
         )
+        dispatch_pending()
         assert Notification.objects.filter(
             recipient=test_user, notification_type='comment_reply'
         ).exists()
@@ -383,7 +385,9 @@ class TestCommentSignals:
     def test_like_creates_notification(self, db, test_user, test_user_2, test_comment):
         """Test notification is created when someone likes a comment."""
         from comments.models import Notification
+        from comments.notifications import dispatch_pending
         CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        dispatch_pending()
         assert Notification.objects.filter(
             recipient=test_user, notification_type='comment_like'
         ).exists()
@@ -391,7 +395,9 @@ class TestCommentSignals:
     def test_self_like_no_notification(self, db, test_user, test_comment):
         """Test no notification when liking own comment."""
         from comments.models import Notification
+        from comments.notifications import dispatch_pending
         CommentLike.objects.create(comment=test_comment, user=test_user)
+        dispatch_pending()
         assert not Notification.objects.filter(
             recipient=test_user, notification_type='comment_like'
         ).exists()
@@ -399,13 +405,554 @@ class TestCommentSignals:
     def test_self_reply_no_notification(self, db, test_user, published_post, test_comment):
         """Test no notification when replying to own comment."""
         from comments.models import Notification
+        from comments.notifications import dispatch_pending
         ct = ContentType.objects.get_for_model(BlogPost)
         Comment.objects.create(
             content_type=ct, object_id=published_post.id,
             author=test_user, content='My own reply',
             parent=test_comment, is_approved=True
         )
+        dispatch_pending()
         assert not Notification.objects.filter(
             recipient=test_user, notification_type='comment_reply'
         ).exists()
 
+
+
+class TestCommentTreeLoader:
+    """Tests for comments.tree.load_comment_tree."""
+
+    def _reply(self, parent, author, content, published_post, is_approved=True):
+        return Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost),
+            object_id=published_post.id,
+            author=author, content=content,
+            parent=parent, is_approved=is_approved
+        )
+
+    def test_builds_nested_tree(self, test_user, test_user_2, published_post, test_comment):
+        """Test replies of replies are nested with depth and reply counts."""
+        from comments.tree import load_comment_tree
+        reply = self._reply(test_comment, test_user_2, 'Reply', published_post)
+        nested = self._reply(reply, test_user, 'Nested reply', published_post)
+        roots = load_comment_tree(published_post)
+        assert roots == [test_comment]
+        assert roots[0].children == [reply]
+        assert roots[0].children[0].children == [nested]
+        assert roots[0].children[0].children[0].depth == 2
+        assert roots[0].reply_count == 1
+
+    def test_skips_unapproved_subtrees(self, test_user, test_user_2, published_post, test_comment):
+        """Test unapproved replies (and their replies) are hidden."""
+        from comments.tree import load_comment_tree
+        pending = self._reply(test_comment, None, 'Pending', published_post, is_approved=False)
+        self._reply(pending, test_user_2, 'Under pending', published_post)
+        roots = load_comment_tree(published_post)
+        assert roots[0].children == []
+        assert roots[0].reply_count == 0
+
+    def test_annotates_likes_for_user(self, test_user, test_user_2, published_post, test_comment):
+        """Test like counts and the user's like state are annotated."""
+        from comments.tree import load_comment_tree
+        CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        roots = load_comment_tree(published_post, test_user_2)
+        assert roots[0].like_count == 1
+        assert roots[0].liked_by_user is True
+        assert load_comment_tree(published_post, test_user)[0].liked_by_user is False
+
+    def test_constant_queries_for_deep_threads(self, test_user, test_user_2, published_post,
+                                               test_comment, django_assert_num_queries):
+        """Test a deep, wide thread loads in a single query."""
+        from comments.tree import load_comment_tree
+        parent = test_comment
+        for depth in range(10):
+            parent = self._reply(parent, test_user_2, f'Depth {depth}', published_post)
+            self._reply(parent, test_user, f'Sibling {depth}', published_post)
+        ContentType.objects.get_for_model(BlogPost)  # Warm the content type cache
+        with django_assert_num_queries(1):
+            roots = load_comment_tree(published_post, test_user)
+        assert roots[0].children[0].children[0].depth == 2
+
+    def test_blog_detail_renders_nested_replies(self, client, test_user_2, published_post, test_comment):
+        """Test blog_detail renders replies beyond the first level."""
+        reply = self._reply(test_comment, test_user_2, 'First level reply', published_post)
+        self._reply(reply, test_user_2, 'Second level reply', published_post)
+        response = client.get(reverse('blog:blog_detail', kwargs={'slug': published_post.slug}))
+        assert b'Second level reply' in response.content
+
+
+class TestCommentTreePaths:
+    """Tests for the materialized path/depth stored on comments."""
+
+    def _reply(self, parent, author, content, published_post):
+        return Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost),
+            object_id=published_post.id,
+            author=author, content=content,
+            parent=parent, is_approved=True
+        )
+
+    def test_path_and_depth_on_create(self, test_user, published_post, test_comment):
+        """Test replies store their ancestor path and depth."""
+        from comments.models import path_segment
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        nested = self._reply(reply, test_user, 'Nested', published_post)
+        assert test_comment.path == '' and test_comment.depth == 0
+        assert reply.path == path_segment(test_comment.pk)
+        assert nested.path == path_segment(test_comment.pk) + path_segment(reply.pk)
+        assert nested.get_thread_depth() == 2
+
+    def test_path_segments_sort_numerically(self):
+        """Test fixed-width segments keep string order equal to id order."""
+        from comments.models import path_segment
+        assert path_segment(9) < path_segment(10) < path_segment(36) < path_segment(1000)
+
+    def test_get_descendants_single_query(self, test_user, published_post, test_comment,
+                                          django_assert_num_queries):
+        """Test the whole subtree is fetched with one query."""
+        parent = test_comment
+        created = []
+        for depth in range(5):
+            parent = self._reply(parent, test_user, f'Depth {depth}', published_post)
+            created.append(parent)
+        with django_assert_num_queries(1):
+            descendants = list(test_comment.get_descendants())
+        assert set(descendants) == set(created)
+        assert list(created[2].get_subtree()) == created[2:]
+
+    def test_move_reroots_subtree(self, test_user, published_post, test_comment):
+        """Test moving a comment updates the path and depth of its replies."""
+        other_root = self._reply(None, test_user, 'Other root', published_post)
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        nested = self._reply(reply, test_user, 'Nested', published_post)
+        reply.parent = None
+        reply.save()
+        nested.refresh_from_db()
+        assert reply.depth == 0
+        assert nested.depth == 1
+        assert nested.path == reply.descendant_prefix
+        reply.parent = other_root
+        reply.save(update_fields=['parent'])
+        nested.refresh_from_db()
+        assert nested.depth == 2
+        assert nested.path.startswith(other_root.descendant_prefix)
+
+    def test_cycle_rejected(self, test_user, published_post, test_comment):
+        """Test a comment cannot be moved below its own reply."""
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        test_comment.parent = reply
+        with pytest.raises(ValueError):
+            test_comment.save()
+
+    def test_max_depth_fits_path_column(self):
+        """Test the deepest allowed path fits in the path column."""
+        from comments.models import MAX_THREAD_DEPTH, path_segment
+        assert len(path_segment(36 ** 7 - 1) * MAX_THREAD_DEPTH) <= Comment._meta.get_field('path').max_length
+
+    def test_replies_beyond_max_depth_rejected(self, test_user, published_post, test_comment, monkeypatch):
+        """Test replies and moves past MAX_THREAD_DEPTH are refused."""
+        from comments import models as comment_models
+        monkeypatch.setattr(comment_models, 'MAX_THREAD_DEPTH', 2)
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        nested = self._reply(reply, test_user, 'Nested', published_post)
+        with pytest.raises(ValueError):
+            self._reply(nested, test_user, 'Too deep', published_post)
+        other = self._reply(test_comment, test_user, 'Other', published_post)
+        reply.parent = other
+        with pytest.raises(ValueError):
+            reply.save()
+
+    def test_subtree_order_groups_siblings(self, test_user, published_post, test_comment):
+        """Test path order puts replies before their own replies; the tree helpers give thread order."""
+        from comments.tree import build_tree, iter_tree
+        first = self._reply(test_comment, test_user, 'First', published_post)
+        nested = self._reply(first, test_user, 'Nested', published_post)
+        second = self._reply(test_comment, test_user, 'Second', published_post)
+        subtree = list(test_comment.get_subtree())
+        assert subtree == [test_comment, first, second, nested]
+        assert list(iter_tree(build_tree(subtree))) == [test_comment, first, nested, second]
+
+    def test_delete_subtree(self, test_user, published_post, test_comment):
+        """Test deleting a subtree removes every descendant."""
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        self._reply(reply, test_user, 'Nested', published_post)
+        sibling = self._reply(test_comment, test_user, 'Sibling', published_post)
+        reply.delete_subtree()
+        assert set(Comment.objects.all()) == {test_comment, sibling}
+
+    def test_check_comment_tree_command_fixes(self, test_user, published_post, test_comment):
+        """Test check_comment_tree reports and repairs inconsistent rows."""
+        from io import StringIO
+        from django.core.management import call_command
+        reply = self._reply(test_comment, test_user, 'Reply', published_post)
+        Comment.objects.filter(pk=reply.pk).update(path='', depth=0)
+        out = StringIO()
+        call_command('check_comment_tree', stdout=out)
+        assert '1 comment(s) have an inconsistent' in out.getvalue()
+        call_command('check_comment_tree', '--fix', stdout=out)
+        reply.refresh_from_db()
+        assert reply.depth == 1
+        assert reply.path == test_comment.descendant_prefix
+
+
+class TestCommentCounters:
+    """Tests for the stored like/reply counters on Comment."""
+
+    def _reply(self, parent, author, published_post, is_approved=True):
+        return Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost),
+            object_id=published_post.id,
+            author=author, content='Reply',
+            parent=parent, is_approved=is_approved
+        )
+
+    def test_like_count_follows_likes(self, test_user_2, test_comment):
+        """Test likes and unlikes adjust like_count."""
+        like = CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        test_comment.refresh_from_db()
+        assert test_comment.get_like_count() == 1
+        like.delete()
+        test_comment.refresh_from_db()
+        assert test_comment.like_count == 0
+
+    def test_reply_count_follows_approval_and_moves(self, test_user, published_post, test_comment):
+        """Test reply_count changes on approval, re-parenting and delete."""
+        other = self._reply(None, test_user, published_post)
+        pending = self._reply(test_comment, None, published_post, is_approved=False)
+        test_comment.refresh_from_db()
+        assert test_comment.get_reply_count() == 0
+        pending.is_approved = True
+        pending.save()
+        test_comment.refresh_from_db()
+        assert test_comment.reply_count == 1
+        pending.parent = other
+        pending.save()
+        test_comment.refresh_from_db()
+        other.refresh_from_db()
+        assert (test_comment.reply_count, other.reply_count) == (0, 1)
+        pending.delete()
+        other.refresh_from_db()
+        assert other.reply_count == 0
+
+    def test_subtree_delete_updates_post_count(self, test_user, published_post, test_comment):
+        """Test deleting a thread removes every approved comment from the post count."""
+        reply = self._reply(test_comment, test_user, published_post)
+        self._reply(reply, test_user, published_post)
+        published_post.refresh_from_db()
+        assert published_post.comment_count == 3
+        test_comment.delete()
+        published_post.refresh_from_db()
+        assert published_post.comment_count == 0
+
+    def test_toggle_like_view_uses_counter(self, client, test_user_2, test_comment):
+        """Test toggle_like_comment returns the stored counter."""
+        client.force_login(test_user_2)
+        url = reverse('comments:toggle_like', kwargs={'comment_id': test_comment.id})
+        assert client.post(url).json()['like_count'] == 1
+        assert client.post(url).json()['like_count'] == 0
+
+    def test_recount_comment_counters(self, test_user_2, test_comment):
+        """Test recount_comment_counters repairs drift."""
+        from comments.counters import recount_comment_counters
+        CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        Comment.objects.filter(pk=test_comment.pk).update(like_count=0, reply_count=4)
+        assert recount_comment_counters() == {'like_count': 1, 'reply_count': 1}
+        test_comment.refresh_from_db()
+        assert (test_comment.like_count, test_comment.reply_count) == (1, 0)
+
+
+class TestNotificationOutbox:
+    """Tests for queued notification dispatch."""
+
+    def _reply(self, parent, author, published_post):
+        return Comment.objects.create(
+            content_type=ContentType.objects.get_for_model(BlogPost),
+            object_id=published_post.id,
+            author=author, content='Reply',
+            parent=parent, is_approved=True
+        )
+
+    def test_signals_only_queue(self, test_user, test_user_2, published_post, test_comment):
+        """Test replies and likes queue events without writing notifications."""
+        from comments.models import Notification, NotificationOutbox
+        self._reply(test_comment, test_user_2, published_post)
+        CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        assert NotificationOutbox.objects.count() == 2
+        assert not Notification.objects.exists()
+
+    def test_dispatch_writes_one_notification_per_event(self, test_user, test_user_2, published_post, test_comment):
+        """Test a reply produces a single linked notification and empties the outbox."""
+        from comments.models import Notification, NotificationOutbox
+        from comments.notifications import dispatch_pending
+        reply = self._reply(test_comment, test_user_2, published_post)
+        assert dispatch_pending() == (1, 1)
+        notification = Notification.objects.get(recipient=test_user)
+        assert notification.comment == reply
+        assert notification.get_url() == published_post.get_absolute_url()
+        assert not NotificationOutbox.objects.exists()
+
+    def test_repeated_events_are_deduplicated(self, test_user, test_user_2, test_comment):
+        """Test like/unlike/like queues one event and skips unread duplicates."""
+        from comments.models import Notification, NotificationOutbox
+        from comments.notifications import dispatch_pending
+        for _ in range(3):
+            CommentLike.objects.filter(comment=test_comment, user=test_user_2).delete()
+            CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        assert NotificationOutbox.objects.count() == 1
+        dispatch_pending()
+        CommentLike.objects.filter(comment=test_comment, user=test_user_2).delete()
+        CommentLike.objects.create(comment=test_comment, user=test_user_2)
+        assert dispatch_pending() == (1, 0)
+        assert Notification.objects.filter(recipient=test_user).count() == 1
+
+    def test_dispatch_batches_use_bounded_queries(self, test_user, published_post, test_comment, django_assert_max_num_queries):
+        """Test many events are written with a bounded number of queries."""
+        from comments.models import Notification
+        from comments.notifications import dispatch_pending
+        for number in range(20):
+            other = User.objects.create_user(
+                email=f'liker{number}@example.com', username=f'liker{number}', password='pass123'
+            )
+            CommentLike.objects.create(comment=test_comment, user=other)
+        # Per batch: claim, open aggregates, insert, update, delete (plus savepoints)
+        with django_assert_max_num_queries(19):
+            assert dispatch_pending(batch_size=10) == (20, 1)
+        assert Notification.objects.get(recipient=test_user).actor_count == 20
+
+    def test_notifications_page_dispatches_own_events(self, client, test_user, test_user_2, published_post, test_comment):
+        """Test the recipient sees queued events without waiting for the worker."""
+        self._reply(test_comment, test_user_2, published_post)
+        client.force_login(test_user)
+        response = client.get(reverse('blog:notifications'))
+        assert response.status_code == 200
+        assert 'replied to your comment' in response.content.decode()
+
+    def test_command_drains_outbox(self, test_user, test_user_2, published_post):
+        """Test the worker command writes post-like notifications."""
+        from io import StringIO
+        from django.core.management import call_command
+        from blog.models import PostLike
+        from comments.models import Notification
+        PostLike.objects.create(post=published_post, user=test_user_2)
+        out = StringIO()
+        call_command('dispatch_notifications', stdout=out)
+        assert 'Dispatched 1 event(s) into 1 notification(s)' in out.getvalue()
+        assert Notification.objects.get(recipient=test_user).notification_type == 'post_like'
+
+
+class TestNotificationAggregation:
+    """Tests for folding likes on the same target into one notification."""
+
+    def _liker(self, number):
+        return User.objects.create_user(
+            email=f'fan{number}@example.com', username=f'fan{number}', password='pass123'
+        )
+
+    def _like_post(self, post, number):
+        from blog.models import PostLike
+        PostLike.objects.create(post=post, user=self._liker(number))
+
+    def test_likes_collapse_into_one_row(self, test_user, published_post):
+        """Test likes from several users update one notification in place."""
+        from comments.models import Notification
+        from comments.notifications import dispatch_pending
+        self._like_post(published_post, 1)
+        dispatch_pending()
+        self._like_post(published_post, 2)
+        dispatch_pending()
+        notification = Notification.objects.get(recipient=test_user)
+        assert notification.actor_count == 2
+        assert notification.message == 'fan2 and fan1 liked your post "Post for Comments"'
+        for number in range(3, 6):
+            self._like_post(published_post, number)
+        dispatch_pending()
+        notification = Notification.objects.get(recipient=test_user)
+        assert notification.actor_count == 5
+        assert notification.message == 'fan5 and 4 others liked your post "Post for Comments"'
+        assert [name for _key, name in notification.recent_actors] == ['fan5', 'fan4', 'fan3']
+
+    def test_repeat_actor_not_double_counted(self, test_user, published_post):
+        """Test an actor already on the notification does not bump the count."""
+        from blog.models import PostLike
+        from comments.models import Notification
+        from comments.notifications import dispatch_pending
+        self._like_post(published_post, 1)
+        dispatch_pending()
+        fan = User.objects.get(username='fan1')
+        PostLike.objects.filter(user=fan).delete()
+        PostLike.objects.create(post=published_post, user=fan)
+        dispatch_pending()
+        assert Notification.objects.get(recipient=test_user).actor_count == 1
+
+    def test_older_actor_not_double_counted(self, test_user, published_post):
+        """Test an actor no longer among the recent names is still counted once."""
+        from blog.models import PostLike
+        from comments.models import Notification
+        from comments.notifications import dispatch_pending
+        for number in range(1, 6):
+            self._like_post(published_post, number)
+            dispatch_pending()
+        fan = User.objects.get(username='fan1')
+        PostLike.objects.filter(user=fan).delete()
+        PostLike.objects.create(post=published_post, user=fan)
+        dispatch_pending()
+        notification = Notification.objects.get(recipient=test_user)
+        assert notification.actor_count == 5
+        assert [name for _key, name in notification.recent_actors] == ['fan5', 'fan4', 'fan3']
+
+    def test_read_or_expired_rows_start_a_new_group(self, test_user, published_post):
+        """Test reading a notification or leaving the window starts a new row."""
+        from datetime import timedelta
+        from comments.models import Notification
+        from comments.notifications import AGGREGATION_WINDOW, dispatch_pending
+        self._like_post(published_post, 1)
+        dispatch_pending()
+        Notification.objects.update(is_read=True)
+        self._like_post(published_post, 2)
+        dispatch_pending()
+        assert Notification.objects.filter(recipient=test_user).count() == 2
+        Notification.objects.update(
+            created_at=timezone.now() - timedelta(seconds=AGGREGATION_WINDOW + 60)
+        )
+        self._like_post(published_post, 3)
+        dispatch_pending()
+        assert Notification.objects.filter(recipient=test_user).count() == 3
+
+    def test_replies_are_not_aggregated(self, test_user, published_post, test_comment):
+        """Test each reply keeps its own notification."""
+        from comments.models import Notification
+        from comments.notifications import dispatch_pending
+        ct = ContentType.objects.get_for_model(BlogPost)
+        for number in range(2):
+            Comment.objects.create(
+                content_type=ct, object_id=published_post.id, author=self._liker(number),
+                content='Reply', parent=test_comment, is_approved=True
+            )
+        dispatch_pending()
+        assert Notification.objects.filter(recipient=test_user, notification_type='comment_reply').count() == 2
+
+    def test_describe_actors(self):
+        """Test actor summaries for one, two and many actors."""
+        from comments.notifications import describe_actors
+        assert describe_actors(['A'], 1) == 'A'
+        assert describe_actors(['A', 'B'], 2) == 'A and B'
+        assert describe_actors(['A'], 2) == 'A and 1 other'
+        assert describe_actors(['A', 'B', 'C'], 13) == 'A and 12 others'
+
+
+class TestUnreadCounter:
+    """Tests for the cached per-user unread notification counter."""
+
+    def _notify(self, test_comment, number):
+        from comments.notifications import dispatch_pending
+        liker = User.objects.create_user(
+            email=f'reader{number}@example.com', username=f'reader{number}', password='pass123'
+        )
+        ct = ContentType.objects.get_for_model(BlogPost)
+        Comment.objects.create(
+            content_type=ct, object_id=test_comment.object_id, author=liker,
+            content='Reply', parent=test_comment, is_approved=True
+        )
+        dispatch_pending()
+
+    def test_counter_follows_dispatch_and_reads(self, test_user, test_comment, django_assert_num_queries):
+        """Test new notifications increment and reads decrement the cached count."""
+        from comments.models import Notification
+        from comments.unread import get_unread_count
+        assert get_unread_count(test_user) == 0
+        self._notify(test_comment, 1)
+        self._notify(test_comment, 2)
+        with django_assert_num_queries(0):
+            assert get_unread_count(test_user) == 2
+        Notification.objects.first().mark_as_read()
+        with django_assert_num_queries(0):
+            assert get_unread_count(test_user) == 1
+        Notification.objects.filter(is_read=False).first().delete()
+        assert get_unread_count(test_user) == 0
+
+    def test_views_update_counter(self, client, test_user, test_comment):
+        """Test marking one or all notifications read through the views."""
+        from comments.models import Notification
+        from comments.unread import get_unread_count
+        for number in range(3):
+            self._notify(test_comment, number)
+        client.force_login(test_user)
+        assert client.get(reverse('blog:unread_notification_count')).json() == {'unread': 3}
+        notification = Notification.objects.first()
+        client.get(reverse('blog:mark_notification_read', kwargs={'notification_id': notification.id}))
+        assert get_unread_count(test_user) == 2
+        client.post(reverse('blog:mark_all_notifications_read'))
+        assert client.get(reverse('blog:unread_notification_count')).json() == {'unread': 0}
+        assert not Notification.objects.filter(is_read=False).exists()
+
+    def test_badge_rendered_for_recipient(self, client, test_user, test_comment):
+        """Test the header badge and account page show the cached count."""
+        self._notify(test_comment, 1)
+        client.force_login(test_user)
+        response = client.get(reverse('blog:blog_list'))
+        assert response.context['unread_notification_count']() == 1
+        assert 'rounded-pill">1</span>' in response.content.decode()
+        response = client.get(reverse('account'))
+        assert response.context['unread_notification_count'] == 1
+
+    def test_admin_save_invalidates_counter(self, test_user, test_comment):
+        """Test editing a notification with save() forces a recount."""
+        from comments.models import Notification
+        from comments.unread import get_unread_count
+        self._notify(test_comment, 1)
+        assert get_unread_count(test_user) == 1
+        notification = Notification.objects.get()
+        notification.is_read = True
+        notification.save()
+        assert get_unread_count(test_user) == 0
+
+
+class TestNotificationRetention:
+    """Tests for archiving old read notifications."""
+
+    def _notifications(self, recipient, count, is_read=True, days_old=120):
+        from datetime import timedelta
+        from comments.models import Notification
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=recipient, notification_type='comment_like',
+                message=f'Old {number}', is_read=is_read,
+            )
+            for number in range(count)
+        ])
+        Notification.objects.filter(message__startswith='Old').update(
+            created_at=timezone.now() - timedelta(days=days_old)
+        )
+
+    def test_archives_only_old_read_notifications(self, test_user):
+        """Test unread and recent notifications stay in place."""
+        from comments.models import Notification, NotificationArchive
+        from comments.retention import archive_read_notifications
+        self._notifications(test_user, 5)
+        Notification.objects.filter(message='Old 0').update(is_read=False)
+        Notification.objects.create(
+            recipient=test_user, notification_type='comment_like', message='Recent', is_read=True
+        )
+        assert archive_read_notifications(days=90, batch_size=2) == 4
+        assert set(Notification.objects.values_list('message', flat=True)) == {'Old 0', 'Recent'}
+        assert NotificationArchive.objects.filter(recipient=test_user).count() == 4
+
+    def test_command_dry_run_and_archive(self, test_user):
+        """Test the command reports, then archives."""
+        from io import StringIO
+        from django.core.management import call_command
+        from comments.models import Notification
+        self._notifications(test_user, 3)
+        out = StringIO()
+        call_command('archive_notifications', '--dry-run', stdout=out)
+        assert 'Would archive 3 notification(s)' in out.getvalue()
+        assert Notification.objects.count() == 3
+        call_command('archive_notifications', '--days', '30', stdout=out)
+        assert 'Archived 3 notification(s)' in out.getvalue()
+        assert not Notification.objects.exists()
+
+    def test_unread_partial_index(self):
+        """Test the unread index is partial on is_read=False."""
+        from comments.models import Notification
+        index = next(i for i in Notification._meta.indexes if i.name == 'notification_unread_idx')
+        assert index.condition.children == [('is_read', False)]
@@ -0,0 +1,74 @@
+"""
+Threaded comment tree loader.
+
+All comments on an object share its ``content_type``/``object_id``, so the
+whole thread - at any depth - is fetched with a single query. The current
+user's like state is annotated in the same query (like and reply counts are
+stored on the row), and the tree is assembled in memory. Each returned
+comment carries:
+
+* ``children``       - approved direct replies, in display order
+* ``depth``          - 0 for top-level comments (stored on the row)
+* ``like_count``     - number of likes
+* ``reply_count``    - number of approved direct replies
+* ``liked_by_user``  - whether ``user`` has liked it
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, Value, BooleanField
+
+from .models import Comment, CommentLike
+
+
+def get_thread_queryset(content_object, user=None):
+    """Approved comments for ``content_object`` with bulk annotations."""
+    content_type = ContentType.objects.get_for_model(content_object)
+    queryset = Comment.objects.filter(
+        content_type=content_type,
+        object_id=content_object.pk,
+        is_approved=True,
+    ).select_related('author')
+
+    if user is not None and user.is_authenticated:
+        liked = CommentLike.objects.filter(comment=OuterRef('pk'), user=user)
+        queryset = queryset.annotate(liked_by_user=Exists(liked))
+    else:
+        queryset = queryset.annotate(liked_by_user=Value(False, output_field=BooleanField()))
+    return queryset
+
+
+def build_tree(comments):
+    """
+    Link ``comments`` into a tree and return the top-level ones.
+
+    Replies whose parent is not in ``comments`` (e.g. awaiting approval)
+    are dropped together with their subtree.
+    """
+    by_id = {}
+    for comment in comments:
+        comment.children = []
+        by_id[comment.id] = comment
+
+    roots = []
+    for comment in by_id.values():
+        if comment.parent_id is None:
+            roots.append(comment)
+        else:
+            parent = by_id.get(comment.parent_id)
+            if parent is not None:
+                parent.children.append(comment)
+
+    return roots
+
+
+def iter_tree(roots):
+    """Yield every comment of a built tree, depth first."""
+    stack = list(reversed(roots))
+    while stack:
+        comment = stack.pop()
+        yield comment
+        stack.extend(reversed(comment.children))
+
+
+def load_comment_tree(content_object, user=None):
+    """Return the approved comment thread for ``content_object`` (one query)."""
+    return build_tree(list(get_thread_queryset(content_object, user)))
@@ -0,0 +1,56 @@
+"""
+Per-user unread notification counter kept in the cache.
+
+The header badge, the account page and the notifications page all read
+``get_unread_count``, which costs one cache read. On a miss the count is
+loaded from the database once and cached for ``UNREAD_TIMEOUT`` seconds.
+Writers keep it current instead of invalidating it: the dispatcher
+increments it for new notifications, marking notifications read decrements
+or resets it, and deleting an unread notification decrements it. The
+timeout bounds any drift from writes that bypass these helpers (e.g. bulk
+admin actions, which call ``invalidate_unread``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+UNREAD_TIMEOUT = getattr(settings, 'NOTIFICATION_UNREAD_TIMEOUT', 60 * 60)
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user):
+    """Number of unread notifications for ``user`` (0 for anonymous users)."""
+    if user is None or not user.is_authenticated:
+        return 0
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        from .models import Notification
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.add(key, count, timeout=UNREAD_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust_unread(user_id, delta):
+    """Add ``delta`` to a cached counter; a missing counter is left to reload."""
+    if not user_id or not delta:
+        return
+    key = _unread_key(user_id)
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        return  # Not cached, the next read counts from the database
+    if count < 0:
+        cache.delete(key)
+
+
+def reset_unread(user_id):
+    """Record that ``user_id`` has no unread notifications."""
+    cache.set(_unread_key(user_id), 0, timeout=UNREAD_TIMEOUT)
+
+
+def invalidate_unread(*user_ids):
+    """Forget cached counters so they are recounted on the next read."""
+    cache.delete_many([_unread_key(user_id) for user_id in set(user_ids) if user_id])
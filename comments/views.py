@@ -57,10 +57,11 @@ def toggle_like_comment(request, comment_id):
     else:
         liked = True
     
+    comment.refresh_from_db(fields=['like_count'])
     return JsonResponse({
         'success': True,
         'liked': liked,
-        'like_count': comment.get_like_count()
+        'like_count': comment.like_count
     })
 
 
@@ -5,6 +5,15 @@ import pytest
 import os
 from django.test import Client
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache (view counters, cached fragments)."""
+    cache.clear()
+    yield
+    cache.clear()
 
 
 @pytest.fixture(scope='session')
@@ -1,6 +1,12 @@
 from django import template
+from django.core.files.storage import storages
+from django.forms.utils import flatatt
+from django.templatetags.static import static
 from django.template.loader import get_template
 from django.template import TemplateDoesNotExist
+from django.utils.html import format_html, format_html_join
+
+from arpansahu_dot_me.images import CONTENT_TYPES, get_static_variants, get_variants, is_variant_source
 
 register = template.Library()
 
@@ -11,4 +17,55 @@ def include_if_exists(template_name):
         get_template(template_name)
         return template.loader.render_to_string(template_name)
     except TemplateDoesNotExist:
-        return ''
\ No newline at end of file
+        return ''
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', css_class='', loading='lazy', **attrs):
+    """
+    Render an image with ``srcset`` and AVIF/WebP sources when variants exist.
+
+    ``image`` is an ``ImageField`` value in the default (media) storage, or a
+    static path such as ``'images/logo-sm.png'``. Any other keyword becomes
+    an ``<img>`` attribute; an explicit ``width`` or ``height`` replaces the
+    intrinsic size from the manifest. Without variants a plain ``<img>`` is
+    rendered.
+
+    Usage:
+        {% responsive_image post.featured_image alt=post.title sizes="(max-width: 768px) 100vw, 800px" %}
+        {% responsive_image 'images/logo-sm.png' css_class="logo-sm" sizes="24px" height="24" %}
+    """
+    if not image:
+        return ''
+    if isinstance(image, str):
+        name = image
+        url = static
+        manifest = get_static_variants(name) if is_variant_source(name) else None
+    else:
+        name = image.name
+        url = storages['default'].url
+        manifest = get_variants('default', name)
+    extra = flatatt(attrs)
+
+    if not manifest:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async"{}>',
+            url(name), alt, css_class, loading, extra,
+        )
+
+    def srcset(entries):
+        return ', '.join(f'{url(path)} {width}w' for width, path in entries)
+
+    if 'width' not in attrs and 'height' not in attrs:
+        extra = format_html(' width="{}" height="{}"{}', manifest['width'], manifest['height'], extra)
+    variants = manifest['variants']
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((CONTENT_TYPES[fmt], srcset(variants[fmt]), sizes) for fmt in CONTENT_TYPES if variants.get(fmt)),
+    )
+    fallback = next(entries for fmt, entries in variants.items() if fmt not in CONTENT_TYPES)
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{} alt="{}" class="{}" '
+        'loading="{}" decoding="async"></picture>',
+        sources, url(name), srcset(fallback), sizes, extra, alt, css_class, loading,
+    )
@@ -35,3 +35,85 @@ class TestIncludeIfExistsTag:
         """Test that include_if_exists always returns a string."""
         result = include_if_exists('any_template.html')
         assert isinstance(result, str)
+
+
+class TestResponsiveImageTag:
+    """Tests for the responsive_image template tag."""
+
+    def test_plain_img_without_variants(self, settings, tmp_path):
+        """Test an image without variants renders a lazy <img>."""
+        from blog.models import BlogPost
+        settings.MEDIA_ROOT = str(tmp_path)
+        html = Template('{% load custom_tags %}{% responsive_image post.featured_image alt="Logo" %}').render(
+            Context({'post': BlogPost(featured_image='blog/featured/logo.png')})
+        )
+        assert html.startswith('<img src="/media/blog/featured/logo.png" alt="Logo"')
+        assert 'loading="lazy"' in html
+
+    def test_picture_with_variants(self, settings, tmp_path):
+        """Test an image with variants renders sources and srcset."""
+        from io import BytesIO
+        from PIL import Image
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import storages
+        from arpansahu_dot_me import images
+        from blog.models import BlogPost
+        settings.MEDIA_ROOT = str(tmp_path)
+        buffer = BytesIO()
+        Image.new('RGB', (1000, 600)).save(buffer, format='JPEG')
+        storages['default'].save('blog/featured/cover.jpg', ContentFile(buffer.getvalue()))
+        images.generate_variants(storages['default'], 'blog/featured/cover.jpg', alias='default')
+
+        post = BlogPost(featured_image='blog/featured/cover.jpg')
+        html = Template(
+            '{% load custom_tags %}{% responsive_image post.featured_image alt=title sizes="50vw" %}'
+        ).render(Context({'post': post, 'title': 'A & B'}))
+        assert html.startswith('<picture>') and html.endswith('</picture>')
+        assert (
+            'srcset="/media/blog/featured/cover.jpg.w480.jpg 480w, /media/blog/featured/cover.jpg.w960.jpg 960w, '
+            '/media/blog/featured/cover.jpg 1000w"'
+        ) in html
+        assert 'width="1000" height="600"' in html
+        assert 'alt="A &amp; B"' in html
+        for fmt in images.VARIANT_FORMATS:
+            assert f'type="image/{fmt}"' in html
+        if 'avif' in images.VARIANT_FORMATS:
+            assert html.index('image/avif') < html.index('image/webp')
+
+    def test_static_path_with_variants(self, settings, tmp_path):
+        """Test a static path reads its build-time manifest and keeps explicit attributes."""
+        import json
+        from arpansahu_dot_me import images
+        settings.STATICFILES_DIRS = [str(tmp_path)]
+        (tmp_path / 'images').mkdir()
+        (tmp_path / 'images' / 'logo.png.variants.json').write_text(json.dumps({
+            'source': 'x', 'width': 500, 'height': 500,
+            'variants': {'png': [[480, 'images/logo.png.w480.png'], [500, 'images/logo.png']],
+                         'webp': [[480, 'images/logo.png.w480.webp'], [500, 'images/logo.png.w500.webp']]},
+        }))
+        images.get_static_variants.cache_clear()
+        html = Template(
+            '{% load custom_tags %}{% responsive_image "images/logo.png" sizes="24px" height="24" %}'
+        ).render(Context())
+        images.get_static_variants.cache_clear()
+        assert '<source type="image/webp" srcset="/static/images/logo.png.w480.webp 480w, ' in html
+        assert ' height="24"' in html and 'width=' not in html
+        assert 'src="/static/images/logo.png"' in html
+
+    def test_static_path_without_variants(self):
+        """Test SVGs and images without a manifest render a plain <img> with extra attributes."""
+        html = Template(
+            '{% load custom_tags %}{% responsive_image "images/logos/python.svg" alt="Python" style="height: 18px;" %}'
+        ).render(Context())
+        assert html == (
+            '<img src="/static/images/logos/python.svg" alt="Python" class="" loading="lazy" decoding="async" '
+            'style="height: 18px;">'
+        )
+
+    def test_empty_image(self):
+        """Test an empty field renders nothing."""
+        from blog.models import BlogPost
+        html = Template('{% load custom_tags %}{% responsive_image post.featured_image %}').render(
+            Context({'post': BlogPost()})
+        )
+        assert html == ''
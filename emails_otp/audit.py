@@ -0,0 +1,124 @@
+"""
+Write-behind audit trail for issued OTPs.
+
+Issuing an OTP only appends ``(email, date)`` to a log kept in the cache
+(an atomic sequence number plus one key per entry). ``flush_otp_records``
+folds the unflushed entries into ``EmailsOtpRecord`` with one UPDATE per
+address. It runs only in the worker (``flush_otp_records --loop``), so the
+counts in the admin lag by up to ``FLUSH_INTERVAL`` but OTP requests never
+write to the database.
+
+A number is taken (``incr``) before its entry is written, so a flush can
+see a number whose entry is not there yet. A flush therefore only folds in
+the contiguous run of entries it read and stops at the first missing one,
+which is retried on the next flush. A missing entry is only given up on
+(evicted, or its writer died) once it has been missing for
+``GAP_TIMEOUT`` seconds.
+"""
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailsOtpRecord
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'emails_otp:audit:seq'
+FLUSHED_KEY = 'emails_otp:audit:flushed'
+GAP_KEY = 'emails_otp:audit:gap'
+FLUSH_LOCK_KEY = 'emails_otp:audit:flushing'
+ENTRY_TIMEOUT = 60 * 60 * 24 * 7
+FLUSH_INTERVAL = getattr(settings, 'OTP_AUDIT_FLUSH_INTERVAL', 5 * 60)
+GAP_TIMEOUT = getattr(settings, 'OTP_AUDIT_GAP_TIMEOUT', 5 * 60)
+
+
+def _entry_key(number):
+    return f'emails_otp:audit:entry:{number}'
+
+
+def _next_number():
+    """Next log sequence number; a missing sequence resumes after the flushed mark."""
+    try:
+        return cache.incr(SEQUENCE_KEY)
+    except ValueError:  # First use, or evicted
+        pass
+    number = cache.get(FLUSHED_KEY, 0) + 1
+    if cache.add(SEQUENCE_KEY, number, timeout=None):
+        return number
+    try:
+        return cache.incr(SEQUENCE_KEY)  # Seeded concurrently
+    except ValueError:  # Evicted again in between
+        return None
+
+
+def record_otp(email, date=None):
+    """Log one issued OTP (cache only; the worker writes it to the database)."""
+    date = date or timezone.now().date()
+    number = _next_number()
+    if number is None:
+        # The OTP is already queued; losing one audit entry beats failing the request
+        logger.warning('Dropped OTP audit entry for %s', email)
+        return
+    cache.set(_entry_key(number), (email, date.isoformat()), timeout=ENTRY_TIMEOUT)
+
+
+def _save_count(email, date, count):
+    updated = EmailsOtpRecord.objects.filter(email=email, date=date).update(
+        count=F('count') + count, modified=timezone.now()
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            EmailsOtpRecord.objects.create(email=email, date=date, count=count)
+    except IntegrityError:  # Created concurrently
+        EmailsOtpRecord.objects.filter(email=email, date=date).update(count=F('count') + count)
+
+
+def flush_otp_records():
+    """
+    Write unflushed log entries to ``EmailsOtpRecord``.
+
+    Returns:
+        int: number of OTPs written
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=60):
+        return 0  # Another process is flushing
+    try:
+        last = cache.get(SEQUENCE_KEY, 0)
+        flushed = cache.get(FLUSHED_KEY, 0)
+        if last <= flushed:
+            return 0
+        entries = cache.get_many([_entry_key(number) for number in range(flushed + 1, last + 1)])
+        done = flushed
+        for number in range(flushed + 1, last + 1):
+            if _entry_key(number) not in entries and not _gap_expired(number):
+                break
+            done = number
+        # Entries past a gap are left for the next flush, which counts them once
+        keys = [_entry_key(number) for number in range(flushed + 1, done + 1)]
+        counts = Counter(tuple(entries[key]) for key in keys if key in entries)
+
+        for (email, date), count in counts.items():
+            _save_count(email, date, count)
+        cache.set(FLUSHED_KEY, done, timeout=None)
+        cache.delete_many(keys)
+        return sum(counts.values())
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _gap_expired(number):
+    """Whether entry ``number`` has been missing for longer than GAP_TIMEOUT."""
+    now = time.time()
+    gap = cache.get(GAP_KEY)
+    if gap and gap[0] == number:
+        return now - gap[1] >= GAP_TIMEOUT
+    cache.set(GAP_KEY, (number, now), timeout=None)
+    return False
@@ -0,0 +1,58 @@
+"""
+Management command to micro-benchmark OTP issue/verify.
+
+Compares building a fresh ``pyotp.TOTP`` per request (the previous
+approach) with the cached generators in ``emails_otp.otp``.
+
+Usage:
+    python manage.py benchmark_otp
+    python manage.py benchmark_otp --iterations 50000 --emails 100
+"""
+
+import base64
+import time
+
+import pyotp
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from emails_otp import otp
+
+
+class Command(BaseCommand):
+    help = 'Time OTP generation and verification with and without the secret cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=20000,
+            help='Operations per measurement'
+        )
+        parser.add_argument(
+            '--emails', type=int, default=50,
+            help='Distinct addresses to cycle through'
+        )
+
+    def _time(self, label, func, emails, iterations):
+        start = time.perf_counter()
+        for number in range(iterations):
+            func(emails[number % len(emails)])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'{label:<28} {elapsed * 1e6 / iterations:8.2f} µs/op')
+        return elapsed
+
+    def handle(self, *args, **options):
+        emails = [f'bench{number}@example.com' for number in range(options['emails'])]
+        iterations = options['iterations']
+
+        def uncached(email):
+            key = base64.b32encode((email + settings.SECRET_KEY).encode())
+            return pyotp.TOTP(key, interval=settings.OTP_EXPIRY_TIME).now()
+
+        def derive_only(email):
+            return pyotp.TOTP(otp.derive_secret(email), interval=settings.OTP_EXPIRY_TIME).now()
+
+        otp.get_totp.cache_clear()
+        baseline = self._time('new TOTP per request', uncached, emails, iterations)
+        self._time('HMAC derivation, no cache', derive_only, emails, iterations)
+        cached = self._time('cached TOTP (otp.issue)', otp.issue, emails, iterations)
+        self.stdout.write(f'\nCache: {otp.get_totp.cache_info()}')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up over baseline: {baseline / cached:.1f}x'))
@@ -0,0 +1,35 @@
+"""
+Management command to write the cached OTP audit log to the database.
+
+Usage:
+    python manage.py flush_otp_records
+    python manage.py flush_otp_records --loop   # Worker: every OTP_AUDIT_FLUSH_INTERVAL seconds
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from emails_otp.audit import FLUSH_INTERVAL, flush_otp_records
+
+
+class Command(BaseCommand):
+    help = 'Write OTPs logged in the cache to EmailsOtpRecord'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep flushing instead of exiting after one flush'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=FLUSH_INTERVAL,
+            help='Seconds to wait between flushes with --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_otp_records()
+            if written or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Recorded {written} OTP(s)'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
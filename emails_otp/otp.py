@@ -0,0 +1,80 @@
+"""
+One time passwords for the contact form.
+
+Each address gets its own TOTP secret, derived as
+HMAC-SHA256(SECRET_KEY, "contact-otp:" + email). Unlike encoding the
+email and ``SECRET_KEY`` into the key, the secret reveals nothing about
+either. Derived ``pyotp.TOTP`` objects are kept in a bounded LRU, so
+repeated issue/verify calls for an address skip the HMAC and base32 work.
+
+``verify`` accepts a code only once: the first successful check claims
+the address's current time step in the cache with ``cache.add``. A
+replayed code, or a second concurrent submission, is then rejected until
+the step expires.
+"""
+import base64
+import datetime
+import hashlib
+import hmac
+from functools import lru_cache
+
+import pyotp
+from django.conf import settings
+from django.core.cache import cache
+
+SECRET_CACHE_SIZE = getattr(settings, 'OTP_SECRET_CACHE_SIZE', 1024)
+USED_KEY = 'emails_otp:used:{email}:{step}'
+
+
+def normalize_email(email):
+    """Addresses are case-insensitive for OTPs."""
+    return (email or '').strip().lower()
+
+
+def derive_secret(email):
+    """Return the base32 TOTP secret for ``email``."""
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), b'contact-otp:' + email.encode(), hashlib.sha256
+    ).digest()
+    return base64.b32encode(digest).decode()
+
+
+@lru_cache(maxsize=SECRET_CACHE_SIZE)
+def get_totp(email):
+    """Return the (cached) TOTP generator for a normalized address."""
+    return pyotp.TOTP(derive_secret(email), interval=settings.OTP_EXPIRY_TIME)
+
+
+def issue(email):
+    """Return the current code for ``email``."""
+    return get_totp(normalize_email(email)).now()
+
+
+def issue_with_step(email):
+    """
+    Return the current code for ``email`` and its TOTP time step.
+
+    The step tells codes from different windows apart even when the six
+    digits repeat, e.g. to key the outgoing email.
+    """
+    totp = get_totp(normalize_email(email))
+    now = datetime.datetime.now()
+    return totp.at(now), totp.timecode(now)
+
+
+def verify(email, code):
+    """
+    Check ``code`` for ``email`` and mark it used.
+
+    Returns:
+        bool: True the first time a valid code is presented
+    """
+    email = normalize_email(email)
+    if not email or not code:
+        return False
+    totp = get_totp(email)
+    now = datetime.datetime.now()
+    if not totp.verify(str(code).strip(), for_time=now):
+        return False
+    used_key = USED_KEY.format(email=email, step=totp.timecode(now))
+    return cache.add(used_key, 1, timeout=totp.interval)
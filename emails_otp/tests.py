@@ -83,3 +83,132 @@ class TestEmailsOtpRecordModel:
             date=date.today()
         )
         assert records.count() == 0
+
+
+class TestOtpAudit:
+    """Tests for the write-behind OTP audit log."""
+
+    def test_record_otp_defers_database_writes(self, db, django_assert_num_queries):
+        """Test logging OTPs between flushes does not query the database."""
+        from emails_otp import audit
+        with django_assert_num_queries(0):
+            audit.record_otp('wb@example.com')
+            audit.record_otp('wb@example.com')
+        assert not EmailsOtpRecord.objects.exists()
+        assert audit.flush_otp_records() == 2
+        assert EmailsOtpRecord.objects.get(email='wb@example.com').count == 2
+        assert audit.flush_otp_records() == 0
+
+    def test_flush_adds_to_existing_record(self, db):
+        """Test flushing increments the row already stored for the day."""
+        from emails_otp import audit
+        EmailsOtpRecord.objects.create(email='wb@example.com', date=date.today(), count=3)
+        audit.record_otp('wb@example.com', date=date.today())
+        audit.flush_otp_records()
+        assert EmailsOtpRecord.objects.get(email='wb@example.com').count == 4
+
+    def test_record_otp_never_flushes(self, db, django_assert_num_queries):
+        """Test even the first OTP after an interval stays in the cache for the worker."""
+        from emails_otp import audit
+        with django_assert_num_queries(0):
+            audit.record_otp('first@example.com')
+        assert not EmailsOtpRecord.objects.exists()
+
+    def test_flush_retries_entry_not_written_yet(self, db):
+        """Test a number taken but not yet logged holds back later entries without losing them."""
+        from django.core.cache import cache
+        from emails_otp import audit
+        number = audit._next_number()  # record_otp between incr and set
+        audit.record_otp('late@example.com')
+        assert audit.flush_otp_records() == 0
+        assert cache.get(audit.FLUSHED_KEY, 0) == number - 1
+        cache.set(audit._entry_key(number), ('late@example.com', date.today().isoformat()))
+        assert audit.flush_otp_records() == 2
+        assert audit.flush_otp_records() == 0
+        assert EmailsOtpRecord.objects.get(email='late@example.com').count == 2
+
+    def test_flush_gives_up_on_lost_entry(self, db, monkeypatch):
+        """Test an entry missing past the gap timeout is skipped and later ones counted once."""
+        from django.core.cache import cache
+        from emails_otp import audit
+        lost = audit._next_number()  # Evicted, or its writer died
+        audit.record_otp('gap@example.com')
+        assert audit.flush_otp_records() == 0
+        monkeypatch.setattr(audit, 'GAP_TIMEOUT', 0)
+        assert audit.flush_otp_records() == 1
+        assert audit.flush_otp_records() == 0
+        assert cache.get(audit.FLUSHED_KEY) == lost + 1
+        assert EmailsOtpRecord.objects.get(email='gap@example.com').count == 1
+
+    def test_record_otp_survives_evicted_sequence(self, db):
+        """Test an evicted sequence key is re-seeded past the flushed mark."""
+        from django.core.cache import cache
+        from emails_otp import audit
+        audit.record_otp('evict@example.com')
+        assert audit.flush_otp_records() == 1
+        cache.delete(audit.SEQUENCE_KEY)
+        audit.record_otp('evict@example.com')
+        assert cache.get(audit.SEQUENCE_KEY) == 2
+        assert audit.flush_otp_records() == 1
+        assert EmailsOtpRecord.objects.get(email='evict@example.com').count == 2
+
+    def test_flush_command(self, db):
+        """Test the management command flushes pending entries."""
+        from io import StringIO
+        from django.core.management import call_command
+        from emails_otp import audit
+        audit.record_otp('cmd@example.com')
+        out = StringIO()
+        call_command('flush_otp_records', stdout=out)
+        assert 'Recorded 1 OTP(s)' in out.getvalue()
+
+
+class TestOtpService:
+    """Tests for OTP issue/verify."""
+
+    def test_issue_and_verify_once(self):
+        """Test a code verifies once and is then rejected as a replay."""
+        from emails_otp import otp
+        code = otp.issue('Person@Example.com')
+        assert otp.verify('person@example.com', code)
+        assert not otp.verify('person@example.com', code)
+
+    def test_issue_with_step_verifies(self):
+        """Test the code from issue_with_step is valid and comes with the current time step."""
+        from datetime import datetime
+        from emails_otp import otp
+        code, step = otp.issue_with_step('Step@Example.com')
+        current = otp.get_totp('step@example.com').timecode(datetime.now())
+        assert current - 1 <= step <= current  # A window may have ended in between
+        assert otp.verify('step@example.com', code)
+
+    def test_wrong_code_is_not_consumed(self):
+        """Test a wrong guess does not use up the real code."""
+        from emails_otp import otp
+        code = otp.issue('guess@example.com')
+        wrong = f'{(int(code) + 1) % 1000000:06d}'
+        assert not otp.verify('guess@example.com', wrong)
+        assert otp.verify('guess@example.com', code)
+
+    def test_codes_are_per_address(self):
+        """Test secrets differ per address and hide the Django secret."""
+        from django.conf import settings
+        from emails_otp import otp
+        assert otp.derive_secret('a@example.com') != otp.derive_secret('b@example.com')
+        assert settings.SECRET_KEY not in otp.derive_secret('a@example.com')
+        assert not otp.verify('', '123456')
+
+    def test_generators_are_cached_and_bounded(self):
+        """Test TOTP objects are reused from a bounded LRU."""
+        from emails_otp import otp
+        otp.get_totp.cache_clear()
+        assert otp.get_totp('lru@example.com') is otp.get_totp('lru@example.com')
+        assert otp.get_totp.cache_info().maxsize == otp.SECRET_CACHE_SIZE
+
+    def test_benchmark_command(self):
+        """Test the benchmark command runs."""
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('benchmark_otp', iterations=20, emails=2, stdout=out)
+        assert 'Speed-up over baseline' in out.getvalue()
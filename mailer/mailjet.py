@@ -0,0 +1,150 @@
+"""
+Shared Mailjet API client.
+
+Every Mailjet call goes through one ``requests.Session`` per process, so
+the TLS connection to api.mailjet.com is kept alive and reused instead of
+being set up again for each send. The session is built on first use, not
+at import, with explicit timeouts and a pooled adapter that retries
+connection failures and throttled/5xx responses.
+
+Sends (POST) are only retried when the connection could not be opened, so
+a message is never delivered twice by the HTTP layer; anything else is
+left to the outbox's own retry schedule.
+
+Each call's latency is logged and accumulated per endpoint in
+``get_metrics()``.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+API_URL = getattr(settings, 'MAILJET_API_URL', 'https://api.mailjet.com/')
+CONNECT_TIMEOUT = getattr(settings, 'MAILJET_CONNECT_TIMEOUT', 3.05)
+READ_TIMEOUT = getattr(settings, 'MAILJET_READ_TIMEOUT', 15)
+POOL_SIZE = getattr(settings, 'MAILJET_POOL_SIZE', 10)
+MAX_RETRIES = getattr(settings, 'MAILJET_MAX_RETRIES', 3)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+_metrics = {}
+
+
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),  # Never re-POST a send
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.auth = (settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET)
+    session.headers.update({
+        'Content-Type': 'application/json',
+        'User-Agent': 'arpansahu.space-mailer',
+    })
+    return session
+
+
+def get_session():
+    """Return the process-wide Mailjet session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    """Close pooled connections; the next call opens a new session."""
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def _record(endpoint, elapsed_ms, ok):
+    with _lock:
+        stats = _metrics.setdefault(endpoint, {
+            'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0,
+        })
+        stats['requests'] += 1
+        stats['errors'] += 0 if ok else 1
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['last_ms'] = elapsed_ms
+
+
+def get_metrics():
+    """
+    Latency stats per endpoint since the process started.
+
+    Returns:
+        dict: endpoint -> {requests, errors, total_ms, max_ms, last_ms, avg_ms}
+    """
+    with _lock:
+        return {
+            endpoint: dict(stats, avg_ms=stats['total_ms'] / stats['requests'])
+            for endpoint, stats in _metrics.items()
+        }
+
+
+def reset_metrics():
+    """Forget the collected latency stats."""
+    with _lock:
+        _metrics.clear()
+
+
+def request(method, resource, version='v3', **kwargs):
+    """
+    Call a Mailjet endpoint through the shared session.
+
+    Args:
+        method: HTTP method
+        resource: path below the version, e.g. ``'send'`` or ``'REST/sender'``
+        version: API version (``'v3'`` or ``'v3.1'``)
+        **kwargs: passed on to ``requests`` (``json``, ``params``, ...)
+
+    Returns:
+        requests.Response
+
+    Raises:
+        requests.RequestException: the request could not be completed
+    """
+    endpoint = f'{version}/{resource}'
+    kwargs.setdefault('timeout', (CONNECT_TIMEOUT, READ_TIMEOUT))
+    started = time.perf_counter()
+    response = None
+    try:
+        response = get_session().request(method, API_URL + endpoint, **kwargs)
+        return response
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = response is not None and response.status_code < 400
+        _record(endpoint, elapsed_ms, ok)
+        logger.info(
+            'Mailjet %s %s -> %s in %.0fms', method, endpoint,
+            response.status_code if response is not None else 'error', elapsed_ms,
+        )
+
+
+def send(messages):
+    """POST ``messages`` (Send API v3.1 format) in a single request."""
+    return request('POST', 'send', version='v3.1', json={'Messages': messages})
@@ -0,0 +1,37 @@
+"""
+Management command to delete old sent emails from the outbox.
+
+Usage:
+    python manage.py purge_sent_emails
+    python manage.py purge_sent_emails --days 7 --batch-size 500
+    python manage.py purge_sent_emails --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from mailer.retention import PURGE_BATCH_SIZE, RETENTION_DAYS, expired_emails, purge_sent_emails
+
+
+class Command(BaseCommand):
+    help = 'Delete outbox emails sent longer ago than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=RETENTION_DAYS,
+            help='Delete emails sent more than this many days ago'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE,
+            help='Emails deleted per statement'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many emails would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = expired_emails(options['days']).count()
+            self.stdout.write(f'Would delete {count} sent email(s)')
+            return
+        purged = purge_sent_emails(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {purged} sent email(s)'))
@@ -0,0 +1,39 @@
+"""
+Management command to deliver queued emails from the outbox.
+
+Usage:
+    python manage.py send_queued_emails
+    python manage.py send_queued_emails --loop --interval 10
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from mailer.outbox import SEND_BATCH_SIZE, send_queued
+
+
+class Command(BaseCommand):
+    help = 'Send due emails from the outbox, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=SEND_BATCH_SIZE,
+            help='Emails claimed per round'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once nothing is due'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help='Seconds to wait between polls with --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} email(s), {failed} failed'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
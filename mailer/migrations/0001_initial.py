@@ -0,0 +1,40 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:28
+
+from django.db import migrations, models
+import mailer.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(default=mailer.models.default_idempotency_key, help_text='Queuing the same key twice only sends once', max_length=150, unique=True)),
+                ('from_email', models.EmailField(max_length=254)),
+                ('from_name', models.CharField(blank=True, max_length=100)),
+                ('to_email', models.EmailField(max_length=254)),
+                ('to_name', models.CharField(blank=True, max_length=150)),
+                ('subject', models.CharField(max_length=255)),
+                ('text_part', models.TextField(blank=True)),
+                ('html_part', models.TextField(blank=True)),
+                ('custom_id', models.CharField(blank=True, help_text='Mailjet CustomID for tracking', max_length=150)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(help_text='Not sent before this time (backoff and claim lease)')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='mailer_outb_status_34923c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='Marked failed instead of being sent after this time (e.g. OTP codes)', null=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+import uuid
+
+from django.db import models
+
+
+def default_idempotency_key():
+    return uuid.uuid4().hex
+
+
+class OutboundEmail(models.Model):
+    """
+    An email waiting in the outbox (see ``mailer.outbox``).
+    
+    Requests only insert rows; ``send_queued_emails`` delivers them through
+    the configured transport, batching several messages per API call and
+    retrying failures with exponential backoff.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    idempotency_key = models.CharField(
+        max_length=150,
+        unique=True,
+        default=default_idempotency_key,
+        help_text="Queuing the same key twice only sends once"
+    )
+    from_email = models.EmailField()
+    from_name = models.CharField(max_length=100, blank=True)
+    to_email = models.EmailField()
+    to_name = models.CharField(max_length=150, blank=True)
+    subject = models.CharField(max_length=255)
+    text_part = models.TextField(blank=True)
+    html_part = models.TextField(blank=True)
+    custom_id = models.CharField(max_length=150, blank=True, help_text="Mailjet CustomID for tracking")
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(help_text="Not sent before this time (backoff and claim lease)")
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Marked failed instead of being sent after this time (e.g. OTP codes)"
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.subject} -> {self.to_email} ({self.status})'
+    
+    def as_message(self):
+        """The message in Mailjet's Send API v3.1 format"""
+        return {
+            "From": {"Email": self.from_email, "Name": self.from_name},
+            "To": [{"Email": self.to_email, "Name": self.to_name}],
+            "Subject": self.subject,
+            "TextPart": self.text_part,
+            "HTMLPart": self.html_part,
+            "CustomID": self.custom_id or self.to_email,
+        }
@@ -0,0 +1,152 @@
+"""
+Email outbox.
+
+``queue_email`` stores the message in ``OutboundEmail`` with one INSERT and
+returns, so requests never wait on Mailjet. The ``send_queued_emails
+--loop`` worker (deployed next to the web pods) delivers the queue and
+picks up retries.
+
+``send_queued`` claims due rows with ``SELECT ... FOR UPDATE SKIP LOCKED``
+and leases them for ``CLAIM_TIMEOUT`` seconds, so concurrent senders never
+deliver a message twice and a crashed sender's rows become due again. Up to
+``MESSAGES_PER_REQUEST`` messages go in one Send API call. Failed messages
+are retried with exponential backoff and marked failed after
+``MAX_ATTEMPTS``. Emails queued with ``expires_in`` (OTP codes) retry every
+``EXPIRING_RETRY_DELAY`` seconds instead, and are marked failed rather than
+delivered once they expire. An ``idempotency_key`` makes queuing the same
+email twice (e.g. a double-submitted form) a no-op.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .transports import get_transport
+
+logger = logging.getLogger(__name__)
+
+MESSAGES_PER_REQUEST = 50  # Mailjet Send API v3.1 limit
+SEND_BATCH_SIZE = 200
+CLAIM_TIMEOUT = 5 * 60
+MAX_ATTEMPTS = getattr(settings, 'MAILER_MAX_ATTEMPTS', 6)
+RETRY_BASE_DELAY = getattr(settings, 'MAILER_RETRY_BASE_DELAY', 30)
+RETRY_MAX_DELAY = 60 * 60
+EXPIRING_RETRY_DELAY = getattr(settings, 'MAILER_EXPIRING_RETRY_DELAY', 5)
+
+
+def queue_email(to_email, subject, text_part='', html_part='', to_name='',
+                from_email=None, from_name='arpansahu.space', custom_id='', idempotency_key=None,
+                expires_in=None):
+    """
+    Add an email to the outbox.
+
+    Args:
+        to_email, to_name: recipient
+        subject, text_part, html_part: content
+        from_email, from_name: sender (defaults to ``MAIL_JET_EMAIL_ADDRESS``)
+        custom_id: Mailjet CustomID for tracking (defaults to ``to_email``)
+        idempotency_key: emails queued with a key already in the outbox are dropped
+        expires_in: seconds after which the email is no longer worth sending
+
+    Returns:
+        OutboundEmail: the queued (unsaved if it was a duplicate) email
+    """
+    now = timezone.now()
+    email = OutboundEmail(
+        from_email=from_email or settings.MAIL_JET_EMAIL_ADDRESS,
+        from_name=from_name,
+        to_email=to_email,
+        to_name=to_name or '',
+        subject=subject,
+        text_part=text_part or '',
+        html_part=html_part or '',
+        custom_id=custom_id or '',
+        next_attempt_at=now,
+    )
+    if expires_in is not None:
+        email.expires_at = now + timedelta(seconds=expires_in)
+    if idempotency_key:
+        email.idempotency_key = idempotency_key[:150]
+    OutboundEmail.objects.bulk_create([email], ignore_conflicts=True)
+    return email
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after ``attempts`` tries."""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+def _expire(now):
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_PENDING, expires_at__lte=now
+    ).update(status=OutboundEmail.STATUS_FAILED, last_error='Expired before delivery')
+
+
+def _claim(batch_size):
+    now = timezone.now()
+    _expire(now)
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=CLAIM_TIMEOUT),
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def _record(emails, results):
+    now = timezone.now()
+    sent_ids = [email.pk for email, (sent, _error) in zip(emails, results) if sent]
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(
+            status=OutboundEmail.STATUS_SENT, sent_at=now, last_error=''
+        )
+
+    failures = []
+    for email, (sent, error) in zip(emails, results):
+        if sent:
+            continue
+        email.last_error = error or 'Unknown error'
+        delay = EXPIRING_RETRY_DELAY if email.expires_at else retry_delay(email.attempts)
+        next_attempt_at = now + timedelta(seconds=delay)
+        if email.attempts >= MAX_ATTEMPTS or (email.expires_at and next_attempt_at >= email.expires_at):
+            email.status = OutboundEmail.STATUS_FAILED
+            logger.error('Giving up on email %s to %s: %s', email.pk, email.to_email, email.last_error)
+        else:
+            email.next_attempt_at = next_attempt_at
+        failures.append(email)
+    if failures:
+        OutboundEmail.objects.bulk_update(failures, ['status', 'next_attempt_at', 'last_error'])
+    return len(sent_ids), len(failures)
+
+
+def send_queued(batch_size=SEND_BATCH_SIZE, transport=None):
+    """
+    Deliver every email that is due.
+
+    Returns:
+        tuple: (emails sent, emails that failed this round)
+    """
+    transport = transport or get_transport()
+    sent = failed = 0
+    while True:
+        emails = _claim(batch_size)
+        for start in range(0, len(emails), MESSAGES_PER_REQUEST):
+            chunk = emails[start:start + MESSAGES_PER_REQUEST]
+            results = transport.send_messages([email.as_message() for email in chunk])
+            chunk_sent, chunk_failed = _record(chunk, results)
+            sent += chunk_sent
+            failed += chunk_failed
+        if len(emails) < batch_size:
+            return sent, failed
@@ -0,0 +1,43 @@
+"""
+Retention for the email outbox.
+
+Sent ``OutboundEmail`` rows are only kept for troubleshooting and for their
+``idempotency_key``, which has long since done its job. The
+``purge_sent_emails`` command deletes rows sent more than
+``MAILER_RETENTION_DAYS`` ago in primary-key batches, each in its own short
+statement, so the outbox table (and the ``status``/``next_attempt_at``
+index the sender polls) stays small. Pending and failed rows are left
+alone.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+RETENTION_DAYS = getattr(settings, 'MAILER_RETENTION_DAYS', 30)
+PURGE_BATCH_SIZE = 1000
+
+
+def expired_emails(days=RETENTION_DAYS):
+    """Emails sent more than ``days`` days ago."""
+    from .models import OutboundEmail
+
+    cutoff = timezone.now() - timedelta(days=days)
+    return OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENT, sent_at__lt=cutoff)
+
+
+def purge_sent_emails(days=RETENTION_DAYS, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete expired sent emails.
+
+    Returns:
+        int: number of emails deleted
+    """
+    from .models import OutboundEmail
+
+    purged = 0
+    while True:
+        pks = list(expired_emails(days).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return purged
+        purged += OutboundEmail.objects.filter(pk__in=pks).delete()[0]
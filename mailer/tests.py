@@ -0,0 +1,245 @@
+"""
+Tests for the email outbox.
+"""
+from datetime import timedelta
+
+import pytest
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from mailer import mailjet
+
+from mailer.models import OutboundEmail
+from mailer.outbox import EXPIRING_RETRY_DELAY, MAX_ATTEMPTS, queue_email, retry_delay, send_queued
+from mailer.transports import LocmemTransport, MailjetTransport
+
+
+class RecordingTransport:
+    """Transport that records each API call and fails chosen recipients."""
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def send_messages(self, messages):
+        self.calls.append(messages)
+        return [
+            (False, 'rejected') if message['To'][0]['Email'] in self.failing else (True, None)
+            for message in messages
+        ]
+
+
+def _queue(count, **kwargs):
+    for number in range(count):
+        queue_email(f'user{number}@example.com', f'Subject {number}', text_part='Hi', **kwargs)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    """Tests for queuing and delivering emails."""
+
+    def test_queue_only_inserts(self):
+        """Test queuing writes a pending row without sending anything."""
+        LocmemTransport.outbox.clear()
+        _queue(1)
+        email = OutboundEmail.objects.get()
+        assert email.status == OutboundEmail.STATUS_PENDING
+        assert LocmemTransport.outbox == []
+
+    def test_idempotency_key(self):
+        """Test the same key is only queued once."""
+        queue_email('a@example.com', 'Hello', idempotency_key='otp:a@example.com:123456')
+        queue_email('a@example.com', 'Hello', idempotency_key='otp:a@example.com:123456')
+        assert OutboundEmail.objects.count() == 1
+
+    def test_batches_messages_per_request(self):
+        """Test up to 50 messages share one API call."""
+        _queue(60)
+        transport = RecordingTransport()
+        assert send_queued(transport=transport) == (60, 0)
+        assert [len(call) for call in transport.calls] == [50, 10]
+        assert not OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists()
+        assert send_queued(transport=transport) == (0, 0)
+
+    def test_failures_back_off_then_give_up(self):
+        """Test a failing message is retried later and eventually marked failed."""
+        _queue(2)
+        transport = RecordingTransport(failing={'user1@example.com'})
+        assert send_queued(transport=transport) == (1, 1)
+        failed = OutboundEmail.objects.get(to_email='user1@example.com')
+        assert failed.status == OutboundEmail.STATUS_PENDING
+        assert failed.attempts == 1
+        assert failed.next_attempt_at > timezone.now() + timedelta(seconds=retry_delay(1) - 5)
+        assert send_queued(transport=transport) == (0, 0)  # Not due yet
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            OutboundEmail.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now())
+            send_queued(transport=transport)
+        failed.refresh_from_db()
+        assert failed.status == OutboundEmail.STATUS_FAILED
+        assert failed.attempts == MAX_ATTEMPTS
+        assert failed.last_error == 'rejected'
+
+    def test_expiring_email_retries_quickly_until_it_expires(self):
+        """Test an OTP-style email retries within its lifetime and is then dropped."""
+        queue_email('otp@example.com', 'Your code', expires_in=EXPIRING_RETRY_DELAY * 3)
+        transport = RecordingTransport(failing={'otp@example.com'})
+        assert send_queued(transport=transport) == (0, 1)
+        email = OutboundEmail.objects.get()
+        assert email.status == OutboundEmail.STATUS_PENDING
+        assert email.next_attempt_at <= timezone.now() + timedelta(seconds=EXPIRING_RETRY_DELAY)
+
+        # Close to expiry, another retry would land too late
+        OutboundEmail.objects.update(
+            next_attempt_at=timezone.now(),
+            expires_at=timezone.now() + timedelta(seconds=EXPIRING_RETRY_DELAY / 2),
+        )
+        send_queued(transport=transport)
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.STATUS_FAILED
+
+    def test_expired_email_is_not_sent(self):
+        """Test an email still queued when it expires is marked failed unsent."""
+        queue_email('late@example.com', 'Your code', expires_in=60)
+        OutboundEmail.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        transport = RecordingTransport()
+        assert send_queued(transport=transport) == (0, 0)
+        assert transport.calls == []
+        email = OutboundEmail.objects.get()
+        assert email.status == OutboundEmail.STATUS_FAILED
+        assert email.last_error == 'Expired before delivery'
+
+    def test_retry_delay_is_exponential_and_capped(self):
+        """Test backoff doubles per attempt up to an hour."""
+        assert retry_delay(2) == 2 * retry_delay(1)
+        assert retry_delay(50) == 60 * 60
+
+    def test_command_uses_configured_transport(self):
+        """Test the worker command delivers through the locmem test transport."""
+        from io import StringIO
+        from django.core.management import call_command
+        LocmemTransport.outbox.clear()
+        _queue(3)
+        out = StringIO()
+        call_command('send_queued_emails', stdout=out)
+        assert 'Sent 3 email(s), 0 failed' in out.getvalue()
+        assert len(LocmemTransport.outbox) == 3
+
+
+@pytest.mark.django_db
+class TestRetention:
+    """Tests for purging old sent emails."""
+
+    def _aged(self, status, days):
+        _queue(1)
+        email = OutboundEmail.objects.latest('pk')
+        sent_at = timezone.now() - timedelta(days=days) if status == OutboundEmail.STATUS_SENT else None
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status=status, sent_at=sent_at, created_at=timezone.now() - timedelta(days=days),
+        )
+        return email
+
+    def test_purges_only_old_sent_emails(self):
+        """Test sent emails past retention go in batches; recent, pending and failed ones stay."""
+        from mailer.retention import purge_sent_emails
+        old = [self._aged(OutboundEmail.STATUS_SENT, 40) for _ in range(3)]
+        recent = self._aged(OutboundEmail.STATUS_SENT, 5)
+        failed = self._aged(OutboundEmail.STATUS_FAILED, 40)
+        pending = self._aged(OutboundEmail.STATUS_PENDING, 40)
+        assert purge_sent_emails(days=30, batch_size=2) == 3
+        assert not OutboundEmail.objects.filter(pk__in=[email.pk for email in old]).exists()
+        assert set(OutboundEmail.objects.values_list('pk', flat=True)) == {recent.pk, failed.pk, pending.pk}
+
+    def test_command_dry_run(self):
+        """Test --dry-run reports without deleting."""
+        from io import StringIO
+        from django.core.management import call_command
+        self._aged(OutboundEmail.STATUS_SENT, 40)
+        out = StringIO()
+        call_command('purge_sent_emails', '--dry-run', stdout=out)
+        assert 'Would delete 1 sent email(s)' in out.getvalue()
+        assert OutboundEmail.objects.count() == 1
+        call_command('purge_sent_emails', stdout=out)
+        assert 'Deleted 1 sent email(s)' in out.getvalue()
+        assert not OutboundEmail.objects.exists()
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class TestMailjetTransport:
+    """Tests for mapping Mailjet responses to per-message results."""
+
+    def _transport(self, mocker, response=None, error=None):
+        mocker.patch('mailer.mailjet.send', return_value=response, side_effect=error)
+        return MailjetTransport()
+
+    def test_per_message_statuses(self, mocker):
+        """Test each message gets its own status from the response."""
+        response = FakeResponse(400, {'Messages': [
+            {'Status': 'success'},
+            {'Status': 'error', 'Errors': [{'ErrorMessage': 'bad address'}]},
+        ]})
+        results = self._transport(mocker, response).send_messages([{}, {}])
+        assert results[0] == (True, None)
+        assert results[1][0] is False and 'bad address' in results[1][1]
+
+    def test_network_error_fails_whole_batch(self, mocker):
+        """Test a connection error marks every message for retry."""
+        results = self._transport(mocker, error=ConnectionError('down')).send_messages([{}, {}])
+        assert [sent for sent, _error in results] == [False, False]
+
+
+class TestMailjetClient:
+    """Tests for the shared Mailjet session."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_client(self):
+        mailjet.close_session()
+        mailjet.reset_metrics()
+        yield
+        mailjet.close_session()
+        mailjet.reset_metrics()
+
+    def test_session_is_lazy_and_shared(self):
+        """Test the session is built on first use and then reused."""
+        assert mailjet._session is None
+        session = mailjet.get_session()
+        assert mailjet.get_session() is session
+        assert session.auth == (settings.MAIL_JET_API_KEY, settings.MAIL_JET_API_SECRET)
+
+    def test_adapter_pools_and_never_retries_sends(self):
+        """Test the adapter keeps a pool and only retries idempotent methods."""
+        adapter = mailjet.get_session().get_adapter(mailjet.API_URL)
+        assert adapter._pool_maxsize == mailjet.POOL_SIZE
+        assert 'POST' not in adapter.max_retries.allowed_methods
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_send_uses_timeouts_and_records_latency(self, mocker):
+        """Test a send posts the batch with timeouts and is measured."""
+        session = mocker.patch.object(mailjet, 'get_session').return_value
+        session.request.return_value = FakeResponse(200, {'Messages': []})
+        mailjet.send([{'Subject': 'Hi'}])
+
+        method, url = session.request.call_args.args
+        assert (method, url) == ('POST', mailjet.API_URL + 'v3.1/send')
+        assert session.request.call_args.kwargs['json'] == {'Messages': [{'Subject': 'Hi'}]}
+        assert session.request.call_args.kwargs['timeout'] == (mailjet.CONNECT_TIMEOUT, mailjet.READ_TIMEOUT)
+        stats = mailjet.get_metrics()['v3.1/send']
+        assert stats['requests'] == 1 and stats['errors'] == 0
+
+    def test_failed_request_counts_as_error(self, mocker):
+        """Test exceptions propagate and are recorded as errors."""
+        session = mocker.patch.object(mailjet, 'get_session').return_value
+        session.request.side_effect = requests.ConnectionError('down')
+        with pytest.raises(requests.ConnectionError):
+            mailjet.request('GET', 'REST/sender')
+        assert mailjet.get_metrics()['v3/REST/sender']['errors'] == 1
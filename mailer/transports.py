@@ -0,0 +1,65 @@
+"""
+Delivery backends for the email outbox.
+
+A transport takes a list of messages in Mailjet's Send API v3.1 format and
+returns one ``(sent, error)`` pair per message, in order. The outbox uses
+whichever class ``settings.MAILER_TRANSPORT`` names, so tests and local
+development can swap Mailjet for ``LocmemTransport``.
+"""
+import json
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import mailjet
+
+DEFAULT_TRANSPORT = 'mailer.transports.MailjetTransport'
+
+
+class BaseTransport:
+    """Interface for outbox transports."""
+
+    def send_messages(self, messages):
+        """Send ``messages``; return a ``(sent, error)`` pair for each one."""
+        raise NotImplementedError
+
+
+class MailjetTransport(BaseTransport):
+    """Send through the Mailjet Send API, all messages in one request."""
+
+    def send_messages(self, messages):
+        try:
+            result = mailjet.send(messages)
+        except Exception as exc:  # Network errors: retry the whole batch
+            return [(False, repr(exc))] * len(messages)
+
+        try:
+            statuses = result.json().get('Messages') or []
+        except (ValueError, AttributeError):
+            statuses = []
+        if len(statuses) != len(messages):
+            if result.status_code == 200:
+                return [(True, None)] * len(messages)
+            return [(False, f'HTTP {result.status_code}: {result.text[:500]}')] * len(messages)
+
+        # Mailjet reports a status per message, in request order
+        return [
+            (True, None) if status.get('Status') == 'success'
+            else (False, json.dumps(status.get('Errors') or status)[:1000])
+            for status in statuses
+        ]
+
+
+class LocmemTransport(BaseTransport):
+    """Keep sent messages in ``LocmemTransport.outbox`` (for tests)."""
+
+    outbox = []
+
+    def send_messages(self, messages):
+        LocmemTransport.outbox.extend(messages)
+        return [(True, None)] * len(messages)
+
+
+def get_transport():
+    """Instantiate the transport configured in ``settings.MAILER_TRANSPORT``."""
+    return import_string(getattr(settings, 'MAILER_TRANSPORT', DEFAULT_TRANSPORT))()
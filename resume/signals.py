@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.urls import reverse
+from arpansahu_dot_me.page_cache import purge_paths
+from .models import Resume
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def purge_resume_pages(sender, **kwargs):
+    """Home and about embed the resume section; drop their cached copies"""
+    purge_paths(reverse('home'), reverse('about'))